@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -80,20 +81,101 @@ WSGI_APPLICATION = "afinpe_project.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
-        "NAME": "afinpe",
-        "USER": "bruno",
-        "PASSWORD": "",
-        "HOST": "localhost",
-        "PORT": "5432",
+        "NAME": os.getenv("DB_NAME", "afinpe"),
+        "USER": os.getenv("DB_USER", "bruno"),
+        "PASSWORD": os.getenv("DB_PASSWORD", ""),
+        "HOST": os.getenv("DB_HOST", "localhost"),
+        "PORT": os.getenv("DB_PORT", "5432"),
+        # Conexões persistentes: cada worker/thread reaproveita a sua entre
+        # requisições; o health check descarta conexões que caíram
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true",
     }
 }
+# DB_ENGINE=sqlite: banco local em arquivo (DB_NAME é o caminho), ex.: para o benchmark
+if os.getenv("DB_ENGINE") == "sqlite":
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("DB_NAME", str(BASE_DIR / "db.sqlite3")),
+    }
+# Pool de conexões do Django (requer psycopg 3 com o extra "pool" no lugar do
+# psycopg2); recomendado com workers ASGI. Substitui as conexões persistentes.
+elif int(os.getenv("DB_POOL_MAX_SIZE", "0")):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        },
+    }
 
 AUTH_USER_MODEL = "core.User"
 
+# Cache local por processo; CACHE_SHARED_URL (ex.: redis://localhost:6379/1) ativa a camada compartilhada
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "afinpe",
+    },
+}
+if os.getenv("CACHE_SHARED_URL"):
+    CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_SHARED_URL"),
+    }
+
+# Cache versionado dos catálogos de referência (core/cache.py)
+CATALOG_CACHE = {
+    "LOCAL": "default",
+    "SHARED": "shared" if "shared" in CACHES else None,
+    "TIMEOUT": int(os.getenv("CATALOG_CACHE_TIMEOUT", "300")),
+}
+
+# Totais das faturas em cache, invalidados a cada gravação de transação (core/invoices.py).
+# Só no cache compartilhado: num cache por processo os outros workers não veriam a
+# invalidação e serviriam totais antigos. Sem ele, cada listagem calcula os totais
+# com uma consulta agrupada.
+INVOICE_TOTALS_CACHE = {
+    "CACHE": "shared" if "shared" in CACHES else None,
+    "TIMEOUT": int(os.getenv("INVOICE_TOTALS_CACHE_TIMEOUT", "3600")),
+}
+
+# Sincronização incremental (core/sync.py)
+SYNC = {
+    "SETTLE_SECONDS": int(os.getenv("SYNC_SETTLE_SECONDS", "5")),
+    "MAX_CHANGES": int(os.getenv("SYNC_MAX_CHANGES", "5000")),
+}
+
+# Compressão gzip/brotli das respostas (core/middleware.py)
+RESPONSE_COMPRESSION = {
+    "ENABLED": os.getenv("RESPONSE_COMPRESSION", "True").lower() == "true",
+    "MIN_LENGTH": int(os.getenv("RESPONSE_COMPRESSION_MIN_LENGTH", "1024")),
+    "ALGORITHMS": ["br", "gzip"],
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,
+}
+
+# Renderer/parser JSON: "fast" (orjson, core/renderers.py) ou "standard" (json da stdlib)
+JSON_BACKEND = os.getenv("JSON_BACKEND", "fast")
+JSON_CLASSES = {
+    "fast": ("core.renderers.FastJSONRenderer", "core.renderers.FastJSONParser"),
+    "standard": ("rest_framework.renderers.JSONRenderer", "rest_framework.parsers.JSONParser"),
+}[JSON_BACKEND]
+
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        JSON_CLASSES[0],
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        JSON_CLASSES[1],
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.StatelessJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -112,12 +194,44 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# Deny-list de tokens revogados da autenticação JWT (core/authentication.py)
+JWT_DENYLIST = {
+    "CACHE": "shared" if "shared" in CACHES else "default",
+    "TIMEOUT": int(os.getenv("JWT_DENYLIST_TIMEOUT", "30")),
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_OBTAIN_SERIALIZER": "core.serializers.RefreshTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.serializers.TokenRefreshSerializer",
+}
+
+# Blacklist dos refresh tokens (core/authentication.py): estado de cada token no cache
+# compartilhado, quando há um, e limpeza em lotes dos tokens expirados
+REFRESH_TOKENS = {
+    "CACHE": "shared" if "shared" in CACHES else None,
+    "PRUNE_INTERVAL": int(os.getenv("REFRESH_TOKENS_PRUNE_INTERVAL", "300")),
+    "PRUNE_BATCH_SIZE": int(os.getenv("REFRESH_TOKENS_PRUNE_BATCH_SIZE", "1000")),
+}
+
+# Login social: validação local dos ID tokens (core/identity.py). A audiência do token
+# precisa ser um dos client ids do provedor; sem client ids configurados o provedor
+# recusa todo login (ImproperlyConfigured, e a view responde 503)
+SOCIAL_AUTH = {
+    "TIMEOUT": (
+        float(os.getenv("SOCIAL_AUTH_CONNECT_TIMEOUT", "1.0")),
+        float(os.getenv("SOCIAL_AUTH_READ_TIMEOUT", "2.0")),
+    ),
+    "TTL": int(os.getenv("SOCIAL_AUTH_JWKS_TTL", "3600")),
+    "MIN_REFRESH_INTERVAL": 60,
+    "PROVIDERS": {
+        "google": {"AUDIENCES": [v for v in os.getenv("GOOGLE_CLIENT_IDS", "").split(",") if v]},
+        "apple": {"AUDIENCES": [v for v in os.getenv("APPLE_CLIENT_IDS", "").split(",") if v]},
+    },
 }
 
 LANGUAGE_CODE = "en-us"
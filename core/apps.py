@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Registra os receivers que invalidam o cache dos catálogos e a deny-list de tokens
+        from . import authentication, cache  # noqa: F401
@@ -0,0 +1,246 @@
+"""
+Autenticação JWT sem consulta ao banco por requisição.
+
+StatelessJWTAuthentication valida o access token como o JWTAuthentication do
+simplejwt, mas em vez de carregar o User monta um LazyUser a partir do claim
+de id. pk/id, is_authenticated e is_anonymous saem do token; qualquer outro
+atributo (email, is_staff, isinstance com User...) carrega o User uma vez.
+
+Revogação e desativação valem por uma deny-list pequena em cache:
+User.tokensRevokedAt marca o instante a partir do qual os tokens anteriores
+(access e refresh) deixam de valer (revoke_tokens() e desativação com
+is_active=False). Só as revogações mais novas que a validade do token mais
+longo podem afetar um token ainda válido, então a deny-list contém apenas
+essas. Ela é reconstruída com uma consulta indexada quando não está no cache
+(settings.JWT_DENYLIST) e descartada a cada revogação.
+
+RefreshToken substitui o do simplejwt na emissão, no refresh e no logout, com a
+mesma blacklist (OutstandingToken/BlacklistedToken), mas mais barata:
+- o estado de cada refresh token fica no cache até ele expirar: True quando
+  entra na blacklist (por blacklist() ou por qualquer gravação de
+  BlacklistedToken) e False quando é emitido ou quando o banco confirma que não
+  está nela. Um refresh comum encontra o False gravado na emissão (ou na
+  rotação anterior) e não consulta o banco. Os False só são gravados no cache
+  compartilhado (REFRESH_TOKENS["CACHE"]): num cache por processo um worker não
+  veria a entrada na blacklist feita por outro. Sem ele, só a marca de
+  blacklist é guardada e os demais tokens consultam o banco a cada refresh;
+- outstand() e blacklist() usam o id do usuário do token em vez de carregá-lo;
+- tokens expirados não servem para nada na blacklist (o exp já os recusa) e
+  são apagados em lotes: no máximo um lote a cada
+  REFRESH_TOKENS["PRUNE_INTERVAL"] segundos, depois de emitir um refresh token
+  (no conjunto dos workers com o cache compartilhado, em cada processo sem ele),
+  e por `manage.py prune_tokens` para atrasos maiores. Assim as tabelas ficam
+  limitadas aos tokens dentro da validade.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import User
+
+DENYLIST_KEY = "auth:denylist"
+BLACKLISTED_KEY = "auth:blacklisted:{jti}"
+PRUNE_KEY = "auth:prune"
+
+def _config():
+    config = {"CACHE": "default", "TIMEOUT": 30}
+    config.update(getattr(settings, "JWT_DENYLIST", {}))
+    return config
+
+def _refresh_config():
+    config = {"CACHE": None, "PRUNE_INTERVAL": 300, "PRUNE_BATCH_SIZE": 1000}
+    config.update(getattr(settings, "REFRESH_TOKENS", {}))
+    return config
+
+def _cache():
+    return caches[_config()["CACHE"]]
+
+def _shared_cache():
+    """Cache compartilhado entre os workers para o estado dos refresh tokens; None sem ele."""
+    alias = _refresh_config()["CACHE"]
+    return caches[alias] if alias else None
+
+def denylist():
+    """{id do usuário: timestamp da revogação} das revogações dentro da validade dos tokens."""
+    entries = _cache().get(DENYLIST_KEY)
+    if entries is None:
+        leeway = api_settings.LEEWAY
+        if not isinstance(leeway, datetime.timedelta):
+            leeway = datetime.timedelta(seconds=leeway)
+        lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+        since = timezone.now() - lifetime - leeway
+        entries = {
+            str(pk): revoked_at.timestamp()
+            for pk, revoked_at in User.objects.filter(tokensRevokedAt__gte=since).values_list("id", "tokensRevokedAt")
+        }
+        _cache().set(DENYLIST_KEY, entries, _config()["TIMEOUT"])
+    return entries
+
+def is_revoked(payload):
+    """True se o token foi emitido antes da última revogação do usuário."""
+    revoked_at = denylist().get(str(payload.get(api_settings.USER_ID_CLAIM)))
+    return revoked_at is not None and payload.get("iat", 0) < revoked_at
+
+def invalidate_denylist():
+    transaction.on_commit(lambda: _cache().delete(DENYLIST_KEY))
+
+def revoke_tokens(user):
+    """Invalida todos os tokens já emitidos para o usuário."""
+    user.tokensRevokedAt = timezone.now()
+    user.save(update_fields=["tokensRevokedAt"])
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if not instance.is_active:
+        # Desativação: tokens emitidos até agora deixam de valer
+        instance.tokensRevokedAt = timezone.now()
+        User.objects.filter(pk=instance.pk).update(tokensRevokedAt=instance.tokensRevokedAt)
+        invalidate_denylist()
+    elif instance.tokensRevokedAt is not None and (update_fields is None or "tokensRevokedAt" in update_fields):
+        invalidate_denylist()
+
+def _load_user(pk):
+    try:
+        return User.objects.get(pk=pk)
+    except User.DoesNotExist:
+        raise AuthenticationFailed("Usuário não encontrado", code="user_not_found")
+
+class LazyUser(SimpleLazyObject):
+    """request.user com o id vindo do token; o User só é carregado se outro atributo for usado."""
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, pk):
+        super().__init__(lambda: _load_user(pk))
+        self.__dict__["_pk"] = pk
+
+    @property
+    def pk(self):
+        return self.__dict__["_pk"]
+
+    id = pk
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return str(self.pk)
+
+    def __eq__(self, other):
+        return getattr(other, "pk", other) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token sem identificação de usuário")
+
+        if is_revoked(validated_token.payload):
+            raise AuthenticationFailed("Token revogado", code="token_revoked")
+
+        return LazyUser(User._meta.pk.to_python(user_id))
+
+def prune_expired_tokens(batch_size=None, max_batches=None):
+    """Apaga em lotes os refresh tokens expirados (e suas entradas na blacklist)."""
+    batch_size = batch_size or _refresh_config()["PRUNE_BATCH_SIZE"]
+    now = timezone.now()
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        deleted += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+        batches += 1
+    return deleted
+
+def _maybe_prune():
+    """
+    Um lote de prune_expired_tokens por PRUNE_INTERVAL. A trava fica no cache
+    compartilhado quando há um (um lote por intervalo no conjunto dos workers);
+    sem ele, cada processo tem a sua.
+    """
+    config = _refresh_config()
+    lock = _shared_cache() or _cache()
+    if config["PRUNE_INTERVAL"] and lock.add(PRUNE_KEY, True, config["PRUNE_INTERVAL"]):
+        transaction.on_commit(lambda: prune_expired_tokens(config["PRUNE_BATCH_SIZE"], max_batches=1))
+
+def _remember(jti, exp, blacklisted):
+    """Guarda o estado do token até ele expirar; os False só no cache compartilhado."""
+    cache = _shared_cache()
+    if cache is None:
+        if not blacklisted:
+            return
+        cache = _cache()
+    timeout = exp - time.time()
+    if timeout > 0:
+        cache.set(BLACKLISTED_KEY.format(jti=jti), blacklisted, timeout)
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, **kwargs):
+    # Também cobre a blacklist feita fora de RefreshToken (admin, simplejwt)
+    _remember(instance.token.jti, instance.token.expires_at.timestamp(), True)
+
+class RefreshToken(BaseRefreshToken):
+    """RefreshToken com a blacklist descrita na docstring do módulo."""
+
+    def _outstanding_defaults(self):
+        return {
+            "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+            "created_at": self.current_time,
+            "token": str(self),
+            "expires_at": datetime_from_epoch(self.payload["exp"]),
+        }
+
+    def check_blacklist(self):
+        if is_revoked(self.payload):
+            raise TokenError("Token revogado")
+        jti = self.payload[api_settings.JTI_CLAIM]
+        blacklisted = (_shared_cache() or _cache()).get(BLACKLISTED_KEY.format(jti=jti))
+        if blacklisted is None:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            _remember(jti, self.payload["exp"], blacklisted)
+        if blacklisted:
+            raise TokenError("Token na blacklist")
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token, _ = OutstandingToken.objects.get_or_create(jti=jti, defaults=self._outstanding_defaults())
+        # O estado no cache é gravado pelo post_save de BlacklistedToken
+        return BlacklistedToken.objects.get_or_create(token=token)
+
+    def outstand(self):
+        # No refresh com rotação o jti acabou de ser gerado: não há linha para procurar
+        token = OutstandingToken.objects.create(jti=self.payload[api_settings.JTI_CLAIM], **self._outstanding_defaults())
+        _remember(token.jti, self.payload["exp"], False)
+        _maybe_prune()
+        return token, True
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        _remember(token[api_settings.JTI_CLAIM], token["exp"], False)
+        _maybe_prune()
+        return token
@@ -0,0 +1,199 @@
+"""
+Saldos das contas bancárias.
+
+Uma transação movimenta o saldo da conta quando tem bankAccount e data, está
+paga (paid=1), não é ignorada (ignore=1) e não é compra de cartão (essas são
+quitadas pelo pagamento da fatura). Receitas somam e despesas subtraem.
+
+BalanceCheckpoint guarda, por conta e mês, o saldo acumulado de movimentações
+até o fim do mês (sem o initialBalance). Cada gravação soma a diferença no
+checkpoint do mês e nos seguintes com um único UPDATE, então:
+- saldo atual = initialBalance + último checkpoint até o mês corrente;
+- saldo em uma data = initialBalance + checkpoint do mês anterior + as
+  movimentações do próprio mês até a data (no máximo um mês de linhas).
+
+Os checkpoints podem ser reconstruídos com `manage.py rebuild_balances`.
+"""
+import datetime
+
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import BalanceCheckpoint, Transaction
+from .rollups import day_start, local_date
+
+# Receita (2, nas telas de planejamento; 4, no resumo da listagem de transações)
+CREDIT_TYPES = (2, 4)
+# Despesa e despesa de cartão
+DEBIT_TYPES = (3, 5)
+
+def signed_value(state):
+    """Efeito da transação (snapshot) no saldo, ou None se ela não movimenta a conta."""
+    if (
+        not state
+        or not state["bankAccount_id"]
+        or not state["date"]
+        or state["paid"] != 1
+        or state["ignore"] == 1
+        or state["isCreditCardTransaction"] == 1
+        # Conta excluída junto: os checkpoints saem com ela (ver derived.cascaded)
+        or state.get("accountDeleted")
+    ):
+        return None
+    if state["type"] in CREDIT_TYPES:
+        return state["value"]
+    if state["type"] in DEBIT_TYPES:
+        return -state["value"]
+    return None
+
+def movements(queryset=None):
+    """Transações que movimentam saldo, com a anotação `signedValue`."""
+    queryset = Transaction.objects.all() if queryset is None else queryset
+    return (
+        queryset
+        .filter(bankAccount__isnull=False, date__isnull=False, paid=1, type__in=CREDIT_TYPES + DEBIT_TYPES)
+        .exclude(ignore=1)
+        .exclude(isCreditCardTransaction=1)
+        .annotate(signedValue=Case(
+            When(type__in=CREDIT_TYPES, then=F("value")),
+            default=-F("value"),
+            output_field=IntegerField(),
+        ))
+    )
+
+def _month(date):
+    day = local_date(date)
+    return day.year, day.month
+
+def _until(year, month):
+    return Q(year__lt=year) | Q(year=year, month__lte=month)
+
+def _from(year, month):
+    return Q(year__gt=year) | Q(year=year, month__gte=month)
+
+def _apply(account_id, year, month, delta):
+    checkpoints = BalanceCheckpoint.objects.filter(bankAccount_id=account_id)
+    if not checkpoints.filter(year=year, month=month).exists():
+        # Primeiro movimento do mês: parte do saldo acumulado do mês anterior
+        previous = (
+            checkpoints.filter(Q(year__lt=year) | Q(year=year, month__lt=month))
+            .order_by("-year", "-month")
+            .values_list("closing", flat=True)
+            .first()
+        )
+        BalanceCheckpoint.objects.bulk_create(
+            [BalanceCheckpoint(bankAccount_id=account_id, year=year, month=month, closing=previous or 0)],
+            ignore_conflicts=True,
+        )
+    checkpoints.filter(_from(year, month)).update(closing=F("closing") + delta)
+
+def apply_changes(changes):
+    """Soma as diferenças de saldo das mudanças (old, new) por conta e mês e as aplica."""
+    deltas = {}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            value = signed_value(state)
+            if value is None:
+                continue
+            key = (state["bankAccount_id"], *_month(state["date"]))
+            deltas[key] = deltas.get(key, 0) + sign * value
+    for (account_id, year, month), delta in sorted(deltas.items(), key=lambda item: (str(item[0][0]), item[0][1:])):
+        if delta:
+            _apply(account_id, year, month, delta)
+
+def _closing_until(year, month):
+    """Subquery do último checkpoint da conta (OuterRef pk) até o mês informado."""
+    return Subquery(
+        BalanceCheckpoint.objects
+        .filter(bankAccount_id=OuterRef("pk"))
+        .filter(_until(year, month))
+        .order_by("-year", "-month")
+        .values("closing")[:1]
+    )
+
+def annotate_current_balance(queryset):
+    """
+    Anota `balanceClosing` (movimentações acumuladas até o mês corrente) nas
+    contas, na mesma consulta da listagem. BankAccount.currentBalance soma o
+    initialBalance na leitura, então a anotação continua válida se ele mudar.
+    """
+    today = timezone.localdate()
+    return queryset.annotate(balanceClosing=Coalesce(_closing_until(today.year, today.month), Value(0)))
+
+def current_balance(account):
+    today = timezone.localdate()
+    closing = (
+        BalanceCheckpoint.objects
+        .filter(bankAccount=account)
+        .filter(_until(today.year, today.month))
+        .order_by("-year", "-month")
+        .values_list("closing", flat=True)
+        .first()
+    )
+    return account.initialBalance + (closing or 0)
+
+def balance_as_of(account, date):
+    """Saldo ao fim do dia `date`: checkpoint do mês anterior mais o delta do próprio mês."""
+    month_start = date.replace(day=1)
+    previous_month = month_start - datetime.timedelta(days=1)
+    closing = (
+        BalanceCheckpoint.objects
+        .filter(bankAccount=account)
+        .filter(_until(previous_month.year, previous_month.month))
+        .order_by("-year", "-month")
+        .values_list("closing", flat=True)
+        .first()
+    )
+    delta = (
+        movements(Transaction.objects.filter(
+            bankAccount=account, date__gte=day_start(month_start), date__lt=day_start(date + datetime.timedelta(days=1)),
+        ))
+        .aggregate(total=Sum("signedValue"))["total"]
+    )
+    return account.initialBalance + (closing or 0) + (delta or 0)
+
+def running_balance(account, date_from=None, date_to=None):
+    """
+    Movimentações da conta em ordem cronológica com `balance`, o saldo logo
+    após cada uma, calculado no banco com SUM(...) OVER (ORDER BY date, created, id).
+    """
+    queryset = movements(Transaction.objects.filter(bankAccount=account))
+    opening = account.initialBalance
+    if date_from:
+        queryset = queryset.filter(date__gte=day_start(date_from))
+        opening = balance_as_of(account, date_from - datetime.timedelta(days=1))
+    if date_to and date_to < datetime.date.max:
+        queryset = queryset.filter(date__lt=day_start(date_to + datetime.timedelta(days=1)))
+
+    order = [F("date").asc(), F("created").asc(), F("id").asc()]
+    return queryset.annotate(
+        balance=Window(Sum("signedValue"), order_by=order) + Value(opening)
+    ).order_by(*order)
+
+def rebuild(batch_size=1000):
+    """Recalcula todos os checkpoints a partir das transações."""
+    BalanceCheckpoint.objects.all().delete()
+
+    rows = (
+        movements()
+        .annotate(balanceYear=ExtractYear("date"), balanceMonth=ExtractMonth("date"))
+        .values("bankAccount_id", "balanceYear", "balanceMonth")
+        .annotate(delta=Sum("signedValue"))
+        .order_by("bankAccount_id", "balanceYear", "balanceMonth")
+    )
+
+    def checkpoints():
+        account_id, closing = None, 0
+        for row in rows.iterator():
+            if row["bankAccount_id"] != account_id:
+                account_id, closing = row["bankAccount_id"], 0
+            closing += row["delta"] or 0
+            yield BalanceCheckpoint(
+                bankAccount_id=account_id,
+                year=row["balanceYear"],
+                month=row["balanceMonth"],
+                closing=closing,
+            )
+
+    return len(BalanceCheckpoint.objects.bulk_create(checkpoints(), batch_size=batch_size))
@@ -1,22 +1,238 @@
+import hashlib
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 
-class BaseModelViewSet(viewsets.ModelViewSet):
+from .cache import etag_matches, serializer_models
+from .eager import EagerLoadingMixin
+from .models import (
+    Alert, BankAccount, BankAccountLimit, Budget, Category, Color, CreditCard, Goal, GoalTransaction, Invoice,
+    Loan, Person, Planning, Subcategory, Transaction, User,
+)
+from .pagination import KeysetPagination
+from .renderers import dumps
+
+def owner_q(owner_field, user_id, shared=False):
+    """Filtro das linhas do usuário pelo caminho `owner_field`; com `shared`, também as sem dono."""
+    condition = Q(**{owner_field: user_id})
+    if shared:
+        condition |= Q(**{f"{owner_field}__isnull": True})
+    return condition
+
+# Dono das linhas de cada modelo: (caminho até o usuário, inclui as sem dono).
+# Os mesmos caminhos dos viewsets (owner_field/owner_shared), usados onde não há
+# viewset, como os ids de FK recebidos pelos serializers. Modelos fora daqui são
+# catálogos globais.
+OWNERS = {
+    User: ("pk", False),
+    Person: ("users", False),
+    Color: ("user", True),
+    BankAccount: ("user", False),
+    BankAccountLimit: ("bankAccount__user", False),
+    CreditCard: ("user", False),
+    Invoice: ("user", False),
+    Category: ("user", True),
+    Subcategory: ("user", True),
+    Planning: ("user", False),
+    Budget: ("planning__user", False),
+    Loan: ("user", False),
+    Transaction: ("user", False),
+    Goal: ("user", False),
+    GoalTransaction: ("goal__user", False),
+    Alert: ("user", False),
+}
+
+def owned_queryset(queryset, user_id):
+    """Restringe `queryset` às linhas visíveis para o usuário, conforme OWNERS."""
+    owner = OWNERS.get(queryset.model)
+    if owner is None:
+        return queryset
+    if user_id is None:
+        return queryset.none()
+    return queryset.filter(owner_q(owner[0], user_id, owner[1]))
+
+class NotModified(Exception):
+    """Interrompe list/retrieve antes do handler quando o If-None-Match confere."""
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+class BaseModelViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = "__all__"
     ordering_fields = "__all__"
 
+    # Caminho até o usuário dono das linhas (ex.: "planning__user" em Budget);
+    # todo queryset do viewset fica restrito ao request.user. None em catálogos
+    # globais. owner_shared inclui as linhas sem dono (catálogo padrão).
+    owner_field = "user"
+    owner_shared = False
+
+    def scope_queryset(self, queryset):
+        if self.owner_field is None:
+            return queryset
+        user = getattr(getattr(self, "request", None), "user", None)
+        if user is None or not user.is_authenticated:
+            # Geração do schema e requisições anônimas
+            return queryset.none()
+        # Só o id: com StatelessJWTAuthentication o User nem chega a ser carregado
+        return queryset.filter(owner_q(self.owner_field, user.pk, self.owner_shared))
+
+    def get_queryset(self):
+        return self.scope_queryset(super().get_queryset())
+
+    # Ações com ETag fraco derivado do registro de mudanças do usuário
+    # (sync.resource_version), consultado antes do handler.
+    # version_dependencies lista modelos que afetam a resposta sem aparecer no
+    # serializer (ex.: aportes no progresso das metas).
+    conditional_actions = ("list", "retrieve")
+    version_dependencies = ()
+
+    _version_models = {}
+
+    def get_version_models(self):
+        key = (type(self), self.get_serializer_class())
+        models = self._version_models.get(key)
+        if models is None:
+            models = serializer_models(key[1]()) | set(self.version_dependencies)
+            models = sorted(models, key=lambda model: model._meta.label_lower)
+            self._version_models[key] = models
+        return models
+
+    def get_resource_etag(self, request):
+        from .sync import resource_version  # sync importa este módulo
+
+        version = resource_version(self.get_version_models(), request.user.pk)
+        parts = [str(request.user.pk), request.get_full_path(), request.accepted_renderer.format, version]
+        return 'W/"%s"' % hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.resource_etag = None
+        if request.method in ("GET", "HEAD") and self.action in self.conditional_actions:
+            self.resource_etag = self.get_resource_etag(request)
+            if etag_matches(request, self.resource_etag):
+                raise NotModified(self.resource_etag)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            response = Response(status=304)
+            response["ETag"] = exc.etag
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "resource_etag", None)
+        if etag and response.status_code == 200 and not response.has_header("ETag"):
+            response["ETag"] = etag
+        return response
+
+    # Campo para paginação por cursor (?cursor=), em ordem decrescente de (campo, id).
+    # None desabilita o modo cursor no viewset.
+    keyset_pagination_field = None
+
+    def use_keyset_pagination(self):
+        request = getattr(self, "request", None)
+        return bool(
+            self.keyset_pagination_field
+            and request is not None
+            and KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    # ?stream=1 em listagens sem paginação: JSON gerado linha a linha
+    stream_query_param = "stream"
+    stream_chunk_size = 500
+
+    def use_streaming(self):
+        return self.request.query_params.get(self.stream_query_param) in ("1", "true")
+
+    def streaming_list_response(self, queryset, extra=None):
+        """
+        Serializa o queryset sob demanda com .iterator(), mantendo a memória
+        limitada independentemente do tamanho do resultado.
+
+        Sem `extra` o corpo é um array JSON. Com `extra` (callable que retorna um
+        dict) o corpo é {"results": [...], ...extra()}; as chaves extras são
+        calculadas e emitidas depois da última linha.
+        """
+        serializer = self.get_serializer()
+
+        def generate():
+            yield b"[" if extra is None else b'{"results":['
+            for index, instance in enumerate(queryset.iterator(chunk_size=self.stream_chunk_size)):
+                yield (b"," if index else b"") + dumps(serializer.to_representation(instance))
+            if extra is None:
+                yield b"]"
+            else:
+                tail = dumps(extra())
+                yield b"]" + (b"," + tail[1:] if tail != b"{}" else b"}")
+
+        return StreamingHttpResponse(generate(), content_type="application/json")
+
+    # CompiledSerializer (core/fastpath.py) usado nas listagens GET no lugar do
+    # serializer do DRF; None mantém o caminho padrão
+    fast_serializer = None
+
+    def use_fast_serializer(self):
+        params = self.request.query_params
+        return (
+            self.fast_serializer is not None
+            and self.request.method == "GET"
+            and "fields" not in params
+            and "expand" not in params
+        )
+
+    def get_page_queryset(self, queryset):
+        """
+        No caminho rápido a página só precisa das chaves; as colunas vêm depois
+        em uma única projeção via values_list.
+        """
+        if not self.use_fast_serializer():
+            return queryset
+        fields = ["pk"]
+        if self.use_keyset_pagination():
+            fields.append(self.keyset_pagination_field)
+        return queryset.select_related(None).prefetch_related(None).only(*fields)
+
+    def serialize_list(self, objects):
+        if self.use_fast_serializer():
+            return self.fast_serializer.serialize(objects)
+        return self.get_serializer(objects, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(self.get_page_queryset(queryset))
+        if page is not None:
+            return self.get_paginated_response(self.serialize_list(page))
+
+        return Response(self.serialize_list(queryset))
+
+    @property
+    def paginator(self):
+        if self.use_keyset_pagination():
+            if not isinstance(getattr(self, "_paginator", None), KeysetPagination):
+                self._paginator = KeysetPagination(self.keyset_pagination_field)
+            return self._paginator
+        return super().paginator
+
 class OptionalPaginationViewSet(BaseModelViewSet):
     """
     ViewSet que retorna todos os registros se 'page' não estiver na query string,
-    caso contrário aplica a paginação configurada.
+    caso contrário aplica a paginação configurada. Com 'cursor' (e
+    keyset_pagination_field definido) usa a paginação por cursor, e com
+    'stream=1' a lista completa é enviada em streaming.
     """
     def list(self, request, *args, **kwargs):
-        if 'page' not in request.query_params:
+        if 'page' not in request.query_params and not self.use_keyset_pagination():
             queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
-        return super().list(request, *args, **kwargs)
\ No newline at end of file
+            if self.use_streaming():
+                return self.streaming_list_response(queryset)
+            return Response(self.serialize_list(queryset))
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,331 @@
+"""
+Benchmark dos endpoints da API.
+
+seed() gera com bulk_create uma base sintética determinística (a mesma
+semente produz os mesmos dados): N usuários com contas, cartão de crédito,
+faturas mensais, categorias, planejamentos com orçamentos, empréstimo, metas,
+alertas e `years` anos de transações até o mês corrente. Como em qualquer
+carga feita fora do save(), o documento de busca é montado na carga e
+rollups e saldos são reconstruídos no fim.
+
+measure() chama cada endpoint de endpoints() pelo cliente de testes do DRF,
+autenticado com um access token real, e mede percentis de latência, número de
+consultas e pico de memória alocada. A memória é medida com tracemalloc em uma
+passada à parte, para não distorcer a latência.
+
+check() compara as medições com os limites de BUDGETS_PATH. Status,
+consultas e memória dependem só da base e do código, valem para qualquer banco
+e são regressões. A latência depende da máquina e da carga dela: latency_warnings()
+aponta as medianas acima do limite do vendor do banco (sqlite, postgresql) como
+avisos, e um vendor sem limites no arquivo não tem latência verificada. O limite
+de latência vale para a mediana: com poucas repetições, p95/p99 oscilam demais
+entre execuções para servir de critério (eles continuam no relatório).
+"""
+import calendar
+import datetime
+import json
+import math
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import balances, rollups, search
+from .models import (
+    Alert, Bank, BankAccount, BankAccountLimit, Budget, Category, Color, CreditCard, CreditCardFlag,
+    Currency, Goal, GoalTransaction, Icon, Invoice, Loan, Person, Planning, Subcategory, Transaction,
+    User,
+)
+from .urls import router
+
+BUDGETS_PATH = Path(__file__).with_name("benchmark_budgets.json")
+
+# Folga mínima da latência: endpoints de ~1 ms variam mais que o dobro
+MIN_LATENCY_SLACK_MS = 5
+
+USERNAME_PREFIX = "bench-"
+PASSWORD = "benchmark"
+
+# Rotas do router sem listagem (ações de autenticação)
+SKIPPED_PREFIXES = ("auth/social", "auth/jwt/login")
+
+EXPENSE_CATEGORIES = ("Mercado", "Moradia", "Transporte", "Saúde", "Lazer", "Educação")
+INCOME_CATEGORIES = ("Salário", "Rendimentos")
+DESCRIPTIONS = (
+    "supermercado", "farmácia", "restaurante", "posto de gasolina", "padaria", "aluguel",
+    "conta de luz", "internet", "cinema", "academia", "livraria", "uber",
+)
+
+def _months(years):
+    today = timezone.localdate()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(years * 12):
+        months.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months[::-1]
+
+def _catalog(queryset, count, **fields):
+    """Registros existentes do catálogo, completando até `count`."""
+    rows = list(queryset[:count])
+    missing = [
+        queryset.model(**{name: f"{value} {index}" for name, value in fields.items()})
+        for index in range(len(rows), count)
+    ]
+    return rows + queryset.model.objects.bulk_create(missing)
+
+def _insert(rows, transactions, goal_links, batch_size):
+    for model, items in rows.items():
+        model.objects.bulk_create(items, batch_size=batch_size)
+    for start in range(0, len(transactions), batch_size):
+        search.index_transactions(
+            Transaction.objects.bulk_create(transactions[start:start + batch_size]), created=True,
+        )
+    GoalTransaction.objects.bulk_create(goal_links, batch_size=batch_size)
+
+def seed(users=5, years=2, per_month=60, random_seed=0, batch_size=1000):
+    """Cria a base sintética e retorna os usuários criados."""
+    if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+        raise ValueError("A base já tem usuários de benchmark; use um banco novo")
+
+    rng = random.Random(random_seed)
+    now = timezone.now().isoformat()
+    today = timezone.localdate()
+    months = _months(years)
+
+    currency, _ = Currency.objects.get_or_create(image="brl.png", defaults={"code": "BRL", "symbol": "R$"})
+    icons = _catalog(Icon.objects.all(), 10, name="icon", set="benchmark")
+    colors = _catalog(Color.objects.filter(user__isnull=True), 10, description="cor")
+    banks = _catalog(Bank.objects.all(), 5, name="Banco")
+    flags = _catalog(CreditCardFlag.objects.all(), 3, name="Bandeira")
+
+    password = make_password(PASSWORD)
+    with transaction.atomic():
+        people = Person.objects.bulk_create([Person(fullName=f"Usuário {index}") for index in range(users)])
+        created_users = User.objects.bulk_create([
+            User(
+                username=f"{USERNAME_PREFIX}{index}", email=f"{USERNAME_PREFIX}{index}@example.com",
+                password=password, person=person, created=now, modified=now,
+            )
+            for index, person in enumerate(people)
+        ])
+
+        # Um lote de inserções por usuário, para a memória não crescer com N
+        for user in created_users:
+            rows = {model: [] for model in (
+                BankAccount, BankAccountLimit, CreditCard, Invoice, Category, Subcategory, Planning, Budget,
+                Loan, Goal, Alert,
+            )}
+            transactions, goal_links = [], []
+            accounts = [
+                BankAccount(
+                    name=f"Conta {index}", type=1, initialBalance=rng.randint(0, 500_000), created=now,
+                    modified=now, bank=rng.choice(banks), color=rng.choice(colors), user=user, currency=currency,
+                )
+                for index in range(2)
+            ]
+            rows[BankAccount] += accounts
+            rows[BankAccountLimit] += [
+                BankAccountLimit(translationKey="overdraft", type=1, value=100_000, bankAccount=account)
+                for account in accounts
+            ]
+            card = CreditCard(
+                created=now, modified=now, name="Cartão", limitValue=500_000, closingDay=5, dueDate=12,
+                bankAccount=accounts[0], creditCardFlag=rng.choice(flags), user=user,
+            )
+            rows[CreditCard].append(card)
+
+            expense_categories = [
+                Category(description=name, type=1, icon=rng.choice(icons), color=rng.choice(colors), user=user)
+                for name in EXPENSE_CATEGORIES
+            ]
+            income_categories = [
+                Category(description=name, type=2, icon=rng.choice(icons), color=rng.choice(colors), user=user)
+                for name in INCOME_CATEGORIES
+            ]
+            rows[Category] += expense_categories + income_categories
+            subcategories = {
+                category: [
+                    Subcategory(
+                        description=f"{category.description} {index}", category=category,
+                        icon=category.icon, color=category.color, user=user,
+                    )
+                    for index in range(2)
+                ]
+                for category in expense_categories
+            }
+            for items in subcategories.values():
+                rows[Subcategory] += items
+
+            rows[Loan].append(Loan(
+                created=now, modified=now, description="Financiamento", principalAmount=1_000_000,
+                totalAmount=1_300_000, dueDate=today + datetime.timedelta(days=365), type=1,
+                bankAccount=accounts[0], color=rng.choice(colors), icon=rng.choice(icons), user=user,
+            ))
+            goals = [
+                Goal(
+                    completionDate=(today + datetime.timedelta(days=365 * (index + 1))).isoformat(), type=1,
+                    description=f"Meta {index}", aimValue=2_000_000, bankAccount=accounts[1],
+                    color=rng.choice(colors), icon=rng.choice(icons), user=user,
+                )
+                for index in range(2)
+            ]
+            rows[Goal] += goals
+            rows[Alert] += [Alert(description=f"Alerta {index}", created=now, user=user) for index in range(5)]
+
+            for year, month in months:
+                last_day = calendar.monthrange(year, month)[1]
+                past = (year, month) < (today.year, today.month)
+                invoice = Invoice(
+                    created=now, modified=now, status=2 if past else 1,
+                    closingDate=datetime.date(year, month, 5), dueDate=datetime.date(year, month, 12),
+                    creditCard=card, user=user,
+                )
+                rows[Invoice].append(invoice)
+                planning = Planning(month=month, year=year, monthlyIncome=800_000, user=user, currency=currency)
+                rows[Planning].append(planning)
+                rows[Budget] += [
+                    Budget(plannedValue=rng.randint(20_000, 150_000), category=category, planning=planning)
+                    for category in expense_categories
+                ]
+
+                for index in range(per_month):
+                    day = datetime.date(year, month, rng.randint(1, last_day if past else today.day))
+                    income = index < 2
+                    card_purchase = not income and rng.random() < 0.4
+                    category = income_categories[index] if income else rng.choice(expense_categories)
+                    subcategory = None if income else rng.choice(subcategories[category] + [None])
+                    description = category.description if income else rng.choice(DESCRIPTIONS)
+                    item = Transaction(
+                        created=now, modified=now, date=timezone.make_aware(datetime.datetime.combine(day, datetime.time(12))),
+                        description=description,
+                        value=rng.randint(300_000, 900_000) if income else rng.randint(500, 60_000),
+                        isTransfer=0, isCreditCardTransaction=1 if card_purchase else 0,
+                        paid=1 if past or day <= today else 0,
+                        type=(2 if index == 0 else 4) if income else (5 if card_purchase else 3),
+                        invoice=invoice if card_purchase else None, bankAccount=accounts[0], user=user,
+                        category=category, subcategory=subcategory,
+                    )
+                    item.searchDocument = search.build_document(
+                        description, None, category.description, subcategory.description if subcategory else None,
+                    )
+                    transactions.append(item)
+                    # Parte dos rendimentos vira aporte nas metas
+                    if index == 1 and month % 2 == 0:
+                        goal_links.append(GoalTransaction(transaction=item, goal=goals[month // 2 % 2]))
+
+            _insert(rows, transactions, goal_links, batch_size)
+
+        rollups.rebuild(batch_size=batch_size)
+        balances.rebuild(batch_size=batch_size)
+    return created_users
+
+def endpoints(year, month):
+    """(nome, caminho, parâmetros) de cada endpoint medido."""
+    items = [
+        (prefix, f"/api/v1/{prefix}/", {})
+        for prefix, viewset, _ in router.registry
+        if prefix not in SKIPPED_PREFIXES and hasattr(viewset, "list")
+    ]
+    period = {"month": month, "year": year}
+    items += [
+        ("transactions:month", "/api/v1/transactions/", {"date__month": month, "date__year": year}),
+        ("transactions:search", "/api/v1/transactions/", {"search": "mercado"}),
+        ("plannings/summary", "/api/v1/plannings/summary/", period),
+        ("plannings/categories", "/api/v1/plannings/categories/", period),
+    ]
+    return items
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, math.ceil(len(values) * percent / 100) - 1)]
+
+def measure(user, repeat=20, warmup=2, only=None):
+    """Mede os endpoints como `user`; retorna {nome: medições}."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    today = timezone.localdate()
+
+    results = {}
+    for name, path, params in endpoints(today.year, today.month):
+        if only and name not in only:
+            continue
+        for _ in range(warmup):
+            response = client.get(path, params)
+
+        # Uma captura por requisição: o request_started do Django zera o log de consultas
+        timings, query_counts = [], []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(path, params)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+
+        tracemalloc.start()
+        client.get(path, params)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            "status": response.status_code,
+            "queries": max(query_counts),
+            "p50Ms": round(percentile(timings, 50), 2),
+            "p95Ms": round(percentile(timings, 95), 2),
+            "p99Ms": round(percentile(timings, 99), 2),
+            "memoryKb": round(peak / 1024),
+        }
+    return results
+
+def load_budgets(path=BUDGETS_PATH):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {"endpoints": {}}
+
+def check(results, budgets):
+    """Regressões (texto) das medições em relação aos limites: status, consultas e memória."""
+    failures = []
+    for name, result in results.items():
+        budget = budgets["endpoints"].get(name)
+        if budget is None:
+            failures.append(f"{name}: sem limites em {BUDGETS_PATH.name}")
+            continue
+        if result["status"] != 200:
+            failures.append(f"{name}: resposta {result['status']}")
+        if result["queries"] > budget["queries"]:
+            failures.append(f"{name}: {result['queries']} consultas (limite {budget['queries']})")
+        memory = budget.get("memoryKb")
+        if memory is not None and result["memoryKb"] > memory:
+            failures.append(f"{name}: {result['memoryKb']} KB alocados (limite {memory} KB)")
+    return failures
+
+def latency_warnings(results, budgets, vendor):
+    """Medianas acima do limite de latência do `vendor` (texto)."""
+    warnings = []
+    for name, result in results.items():
+        latency = budgets["endpoints"].get(name, {}).get("p50Ms", {}).get(vendor)
+        if latency is not None and result["p50Ms"] > latency:
+            warnings.append(f"{name}: p50 {result['p50Ms']} ms (limite {latency} ms)")
+    return warnings
+
+def updated_budgets(results, budgets, vendor, headroom=2.0):
+    """
+    Limites a partir das medições: consultas exatas; latência e memória com
+    folga (`headroom`, e ao menos MIN_LATENCY_SLACK_MS na latência) para a
+    variação entre execuções e máquinas.
+    """
+    endpoints_budgets = dict(budgets["endpoints"])
+    for name, result in results.items():
+        budget = dict(endpoints_budgets.get(name, {}))
+        budget["queries"] = result["queries"]
+        latency = max(result["p50Ms"] * headroom, result["p50Ms"] + MIN_LATENCY_SLACK_MS)
+        budget["p50Ms"] = {**budget.get("p50Ms", {}), vendor: math.ceil(latency)}
+        budget["memoryKb"] = math.ceil(result["memoryKb"] * headroom)
+        endpoints_budgets[name] = budget
+    return {**budgets, "endpoints": dict(sorted(endpoints_budgets.items()))}
@@ -0,0 +1,207 @@
+"""
+Gravação de transações em lote (POST /transactions/bulk/).
+
+Cada lote pode criar, atualizar e excluir transações de uma vez:
+- os ids de FK de todos os itens (userId, invoiceId, bankAccountId, ...) são
+  resolvidos com uma consulta IN por modelo antes da validação, restrita às
+  linhas do usuário, e os campos PreloadedPrimaryKeyRelatedField do serializer
+  leem desses mapas;
+- update e delete só alcançam as transações do queryset do viewset; ids de
+  outros usuários voltam como não encontrados, e um id repetido no lote (em
+  update ou em update e delete) é recusado em todas as posições;
+- cada item é validado pelo TransactionSerializer, e os erros voltam por item,
+  na mesma posição do item enviado;
+- sem erros, tudo é gravado numa única transação de banco com bulk_create /
+  bulk_update / delete, e os dados derivados (rollup, saldos, faturas) e o
+  índice de busca são atualizados em lote, com o mesmo resultado de gravar
+  item a item com save().
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import derived, rollups, search
+from .models import Transaction
+from .serializers import PreloadedPrimaryKeyRelatedField
+
+MAX_ITEMS = 1000
+
+DUPLICATED_ID = "Id duplicado no lote."
+
+def preload_related(serializer, items):
+    """
+    Carrega, com uma consulta por campo, os objetos referenciados pelos campos
+    PreloadedPrimaryKeyRelatedField de `serializer` em todos os itens.
+    """
+    related = {}
+    for name, field in serializer.fields.items():
+        if not isinstance(field, PreloadedPrimaryKeyRelatedField):
+            continue
+        queryset = field.get_queryset()
+        to_python = queryset.model._meta.pk.to_python
+        pks = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            if value is None or isinstance(value, bool):
+                continue
+            try:
+                pks.add(to_python(value))
+            except Exception:
+                # Id mal formado: o campo devolve o erro na validação do item
+                continue
+        related[name] = queryset.in_bulk(pks) if pks else {}
+    return related
+
+def insert_transactions(instances):
+    """
+    bulk_create de transações mantendo o que Transaction.save faria: datas de
+    criação/modificação, documento de busca, índice FTS e dados derivados.
+    Deve rodar dentro de transaction.atomic().
+    """
+    timestamp = timezone.now().isoformat()
+    for instance in instances:
+        instance.created = instance.modified = timestamp
+        instance.searchDocument = search.document_for(instance)
+    Transaction.objects.bulk_create(instances)
+    search.index_transactions(instances, created=True)
+    changes = [(None, rollups.snapshot(instance)) for instance in instances]
+    derived.apply_changes(changes)
+    for instance in instances:
+        instance._state.adding = False
+        instance._rollupState = rollups.snapshot(instance)
+    return instances
+
+def update_transactions(instances, fields):
+    """bulk_update equivalente a save() em cada instância (ver insert_transactions)."""
+    timestamp = timezone.now().isoformat()
+    changes = []
+    for instance in instances:
+        instance.modified = timestamp
+        instance.searchDocument = search.document_for(instance)
+        changes.append((getattr(instance, "_rollupState", None), rollups.snapshot(instance)))
+    fields = sorted(set(fields) | {"modified", "searchDocument"})
+    Transaction.objects.bulk_update(instances, fields)
+    search.index_transactions(instances)
+    derived.apply_changes(changes)
+    for instance, (_, current) in zip(instances, changes):
+        instance._rollupState = current
+    return instances
+
+class BulkTransactionWriter:
+    """
+    Valida e grava um lote {"create": [...], "update": [...], "delete": [...]}.
+    Itens de update trazem "id" e são parciais, como um PATCH. `queryset` limita
+    as transações alteradas e excluídas (o get_queryset() do viewset).
+    """
+    def __init__(self, serializer_class, context, queryset):
+        self.serializer_class = serializer_class
+        self.context = context
+        self.queryset = queryset
+        self.errors = {}
+
+    def _items(self, data, name):
+        items = data.get(name) or []
+        if not isinstance(items, list):
+            raise serializers.ValidationError({name: ["Esperada uma lista de itens."]})
+        return items
+
+    def validate(self, data):
+        if not isinstance(data, dict):
+            raise serializers.ValidationError({"non_field_errors": ["Esperado um objeto com create, update e delete."]})
+
+        create = self._items(data, "create")
+        update = self._items(data, "update")
+        delete = self._items(data, "delete")
+        if len(create) + len(update) + len(delete) > MAX_ITEMS:
+            raise serializers.ValidationError({"non_field_errors": [f"No máximo {MAX_ITEMS} itens por lote."]})
+
+        context = dict(self.context)
+        context["related_objects"] = preload_related(self.serializer_class(context=context), create + update)
+
+        to_python = Transaction._meta.pk.to_python
+        update_ids, delete_ids = [], []
+        for item in update:
+            try:
+                update_ids.append(to_python(item.get("id")) if isinstance(item, dict) else None)
+            except Exception:
+                update_ids.append(None)
+        for pk in delete:
+            try:
+                delete_ids.append(to_python(pk))
+            except Exception:
+                delete_ids.append(None)
+
+        # O mesmo id duas vezes (em update ou em update e delete) aplicaria a mudança duas vezes
+        counts = Counter(pk for pk in update_ids + delete_ids if pk is not None)
+        duplicated = {pk for pk, count in counts.items() if count > 1}
+
+        # category/subcategory entram no documento de busca recalculado na gravação
+        existing = (
+            self.queryset
+            .select_related("category", "subcategory")
+            .order_by()
+            .in_bulk([pk for pk in update_ids + delete_ids if pk is not None])
+        )
+
+        self.to_create, create_errors = [], []
+        for item in create:
+            serializer = self.serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                self.to_create.append(serializer.validated_data)
+                create_errors.append({})
+            else:
+                create_errors.append(serializer.errors)
+
+        self.to_update, update_errors = [], []
+        for item, pk in zip(update, update_ids):
+            instance = existing.get(pk) if pk else None
+            if instance is None:
+                update_errors.append({"id": ["Transação não encontrada."]})
+                continue
+            if pk in duplicated:
+                update_errors.append({"id": [DUPLICATED_ID]})
+                continue
+            serializer = self.serializer_class(instance, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                self.to_update.append((instance, serializer.validated_data))
+                update_errors.append({})
+            else:
+                update_errors.append(serializer.errors)
+
+        self.to_delete, delete_errors = [], []
+        for pk in delete_ids:
+            if pk is None or pk not in existing:
+                delete_errors.append({"id": ["Transação não encontrada."]})
+            elif pk in duplicated:
+                delete_errors.append({"id": [DUPLICATED_ID]})
+            else:
+                self.to_delete.append(pk)
+                delete_errors.append({})
+
+        for name, errors in (("create", create_errors), ("update", update_errors), ("delete", delete_errors)):
+            if any(errors):
+                self.errors[name] = errors
+        return not self.errors
+
+    def save(self):
+        with transaction.atomic():
+            created = insert_transactions([Transaction(**data) for data in self.to_create])
+
+            fields = set()
+            updated = []
+            for instance, data in self.to_update:
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+                updated.append(instance)
+            if updated:
+                update_transactions(updated, fields)
+
+            if self.to_delete:
+                # O post_delete de cada linha registra a mudança; os dados derivados são aplicados em lote
+                with derived.batch():
+                    Transaction.objects.filter(pk__in=self.to_delete).delete()
+
+        return created, updated, self.to_delete
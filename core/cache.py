@@ -0,0 +1,163 @@
+"""
+Cache versionado para os catálogos de referência (cores, ícones, bancos,
+moedas e bandeiras de cartão).
+
+As respostas JSON já renderizadas ficam guardadas sob uma chave que inclui a
+versão do catálogo. Qualquer gravação no modelo (viewsets, admin ou ORM via
+save/delete) troca a versão, o que invalida todas as entradas de uma vez.
+Catálogos com registros por usuário (cores) têm também uma versão por usuário:
+a gravação de um registro do usuário troca só a dele, e a de um registro sem
+usuário (catálogo padrão, visível para todos) troca a do catálogo.
+
+Camadas (settings.CATALOG_CACHE):
+- LOCAL: cache em memória do processo, consultado primeiro;
+- SHARED: cache compartilhado opcional (ex.: Redis), que também guarda as
+  versões para que todos os processos enxerguem as invalidações. Sem ele, a
+  versão fica no cache local e entradas de outros processos expiram após TIMEOUT.
+
+Os ETags dos demais recursos vêm do registro de mudanças, no banco (ver
+sync.resource_version), e valem igualmente para todos os processos.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework import serializers
+
+from .models import Bank, Color, CreditCardFlag, Currency, Icon
+
+def _config():
+    config = {"LOCAL": "default", "SHARED": None, "TIMEOUT": 300}
+    config.update(getattr(settings, "CATALOG_CACHE", {}))
+    return config
+
+def _tiers():
+    config = _config()
+    tiers = [caches[config["LOCAL"]]]
+    if config["SHARED"]:
+        tiers.append(caches[config["SHARED"]])
+    return tiers
+
+def _version_cache():
+    config = _config()
+    return caches[config["SHARED"] or config["LOCAL"]]
+
+def _version_key(model, owner=None):
+    key = f"catalog:{model._meta.label_lower}:version"
+    return key if owner is None else f"{key}:{owner}"
+
+def get_version(model, owner=None):
+    cache = _version_cache()
+    key = _version_key(model, owner)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+def bump_version(model, owner=None):
+    _version_cache().set(_version_key(model, owner), uuid.uuid4().hex, None)
+
+def serializer_models(serializer):
+    """Modelos cujas linhas aparecem na saída do serializer, incluindo os aninhados."""
+    found = {serializer.Meta.model}
+    for field in serializer.fields.values():
+        child = getattr(field, "child", field)
+        if not field.write_only and isinstance(child, serializers.ModelSerializer):
+            found |= serializer_models(child)
+    return found
+
+def cache_get(key):
+    tiers = _tiers()
+    for index, cache in enumerate(tiers):
+        entry = cache.get(key)
+        if entry is not None:
+            # Promove para as camadas mais próximas
+            for closer in tiers[:index]:
+                closer.set(key, entry, _config()["TIMEOUT"])
+            return entry
+    return None
+
+def cache_set(key, entry):
+    for cache in _tiers():
+        cache.set(key, entry, _config()["TIMEOUT"])
+
+def _opaque(etag):
+    # If-None-Match usa comparação fraca: W/"x" equivale a "x"
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [_opaque(value.strip()) for value in header.split(",")]
+    return "*" in candidates or _opaque(etag) in candidates
+
+@receiver(post_save, sender=Color)
+@receiver(post_save, sender=Icon)
+@receiver(post_save, sender=Bank)
+@receiver(post_save, sender=Currency)
+@receiver(post_save, sender=CreditCardFlag)
+@receiver(post_delete, sender=Color)
+@receiver(post_delete, sender=Icon)
+@receiver(post_delete, sender=Bank)
+@receiver(post_delete, sender=Currency)
+@receiver(post_delete, sender=CreditCardFlag)
+def bump_catalog_version(sender, instance, **kwargs):
+    bump_version(sender, getattr(instance, "user_id", None))
+
+class CatalogCacheMixin:
+    """
+    Read-through cache com ETag forte para list/retrieve de viewsets de catálogo.
+    Só respostas JSON 200 não-streaming são guardadas.
+    """
+    # O ETag vem do conteúdo em cache, não do registro de mudanças
+    conditional_actions = ()
+
+    def get_catalog_cache_key(self, request):
+        model = self.queryset.model
+        fingerprint = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+        version = get_version(model)
+        # Catálogos com registros por usuário (ex.: cores) têm uma entrada e uma versão por usuário
+        scope = "all"
+        if getattr(self, "owner_field", None):
+            scope = f"{request.user.pk}:{get_version(model, request.user.pk)}"
+        return f"catalog:{model._meta.label_lower}:{version}:{scope}:{fingerprint}"
+
+    def cached_response(self, request, render):
+        if request.accepted_renderer.format != "json":
+            return render()
+
+        key = self.get_catalog_cache_key(request)
+        entry = cache_get(key)
+        if entry is None:
+            response = render()
+            if response.status_code != 200 or response.streaming:
+                return response
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            entry = {
+                "etag": '"%s"' % hashlib.sha1(response.content).hexdigest(),
+                "content": response.content,
+                "contentType": response["Content-Type"],
+            }
+            cache_set(key, entry)
+
+        if etag_matches(request, entry["etag"]):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(entry["content"], content_type=entry["contentType"])
+        response["ETag"] = entry["etag"]
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,94 @@
+"""
+Ponto único de atualização dos dados derivados das transações.
+
+Toda gravação de transação (save, exclusão, endpoints em lote, séries) chega
+aqui como mudanças (old, new) entre snapshots (ver rollups.snapshot), que são
+repassadas para:
+- o rollup mensal (core/rollups.py);
+- os checkpoints de saldo das contas (core/balances.py);
+- o cache de totais das faturas (core/invoices.py);
+- o registro de mudanças da sincronização (core/sync.py).
+
+Dentro de `batch()` as mudanças são acumuladas e aplicadas juntas no fim do
+bloco, com uma atualização por chave em vez de uma por transação.
+
+Na exclusão de um usuário ou de uma conta, o Collector do Django apaga antes,
+sem sinais, os checkpoints, rollups e registros de sincronização deles e só
+depois manda o post_delete das transações em cascata. `deleting()` registra
+esses donos no pre_delete e `cascaded()` ajusta as mudanças das transações
+excluídas pelo mesmo delete() para não recriar linhas de quem está saindo.
+"""
+import threading
+from contextlib import contextmanager
+
+from . import balances, invoices, rollups, sync
+from .models import BankAccount
+
+_pending = threading.local()
+_deleting = threading.local()
+
+def deleting(instance, origin):
+    """Registra, no pre_delete, um usuário ou conta excluído pelo delete() de `origin`."""
+    if getattr(_deleting, "origin", None) is not origin:
+        # Só vale para os sinais do mesmo delete(); o anterior já terminou
+        _deleting.origin, _deleting.users, _deleting.accounts = origin, set(), {}
+    if isinstance(instance, BankAccount):
+        _deleting.accounts[instance.pk] = instance.currency_id
+    else:
+        _deleting.users.add(instance.pk)
+
+def user_deleted(user_id, origin):
+    """Se o usuário sai no delete() de `origin`, junto com seus dados derivados."""
+    return origin is not None and getattr(_deleting, "origin", None) is origin and user_id in _deleting.users
+
+def cascaded(state, origin):
+    """
+    Snapshot de uma transação excluída pelo delete() de `origin`: None se o
+    usuário sai junto e, se a conta sai junto, marcado para não mexer no saldo
+    e com a moeda dela para o rollup (a conta já não está no banco).
+    """
+    if not state or origin is None or getattr(_deleting, "origin", None) is not origin:
+        return state
+    if state["user_id"] in _deleting.users:
+        return None
+    if state["bankAccount_id"] in _deleting.accounts:
+        return {**state, "accountDeleted": True, "currency_id": _deleting.accounts[state["bankAccount_id"]]}
+    return state
+
+def apply_changes(changes):
+    """Aplica uma lista de mudanças (old, new); old=None é criação e new=None é exclusão."""
+    changes = [change for change in changes if change[0] or change[1]]
+    if not changes:
+        return
+    rollups.apply_changes(changes)
+    balances.apply_changes(changes)
+    invoices.invalidate_changes(changes)
+    sync.record_transaction_changes(changes)
+
+def apply_change(old, new):
+    pending = getattr(_pending, "changes", None)
+    if pending is not None:
+        pending.append((old, new))
+        return
+    apply_changes([(old, new)])
+
+@contextmanager
+def batch():
+    """
+    Acumula as chamadas de apply_change do bloco e as aplica ao sair. Deve ser
+    usado dentro de transaction.atomic() para que os dados derivados e as
+    linhas sejam gravados juntos.
+    """
+    if getattr(_pending, "changes", None) is not None:
+        # Bloco aninhado: o mais externo aplica
+        yield
+        return
+
+    _pending.changes = []
+    with sync.batch():
+        try:
+            yield
+            changes = _pending.changes
+        finally:
+            _pending.changes = None
+        apply_changes(changes)
@@ -0,0 +1,98 @@
+"""
+Planejamento automático de select_related/prefetch_related a partir da árvore
+de serializers aninhados.
+
+O planner percorre os campos de leitura do serializer: relações diretas (FK e
+one-to-one) viram select_related e relações "muitos" (many=True, reversas e
+M2M) viram um Prefetch com o seu próprio queryset já otimizado. Assim cada
+listagem executa um número constante de consultas por página.
+"""
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+def _is_forward(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except Exception:
+        return None
+    if not field.is_relation:
+        return None
+    return bool((field.many_to_one or field.one_to_one) and field.concrete)
+
+def plan(serializer, model, prefix=""):
+    """
+    Retorna (select, prefetch) para o serializer sobre `model`. `prefix` é o
+    caminho ORM até este nível, usado para montar os lookups aninhados.
+    """
+    select, prefetch = [], []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        attrs = field.source_attrs
+        name = attrs[0]
+        forward = _is_forward(model, name)
+        if forward is None:
+            continue
+        path = prefix + name
+
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+            related_model = child.Meta.model
+            child_select, child_prefetch = plan(child, related_model)
+            queryset = apply(related_model._default_manager.all(), child_select, child_prefetch)
+            prefetch.append(Prefetch(path, queryset=queryset))
+        elif isinstance(field, serializers.BaseSerializer):
+            if forward:
+                select.append(path)
+                child_select, child_prefetch = plan(field, field.Meta.model, path + "__")
+                select.extend(child_select)
+                prefetch.extend(child_prefetch)
+            else:
+                prefetch.append(path)
+        elif len(attrs) > 1 and forward:
+            # Fonte pontilhada (ex.: source="person.id") lê atributos da relação
+            select.append(path)
+        elif isinstance(field, serializers.ManyRelatedField) or not forward:
+            prefetch.append(path)
+
+    return select, prefetch
+
+def apply(queryset, select, prefetch):
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+class EagerLoadingMixin:
+    """
+    Aplica ao queryset do viewset o select_related/prefetch_related derivado do
+    serializer. O plano é calculado uma vez por classe de serializer.
+    """
+    # Ações que não serializam a resposta não precisam das relações
+    skip_eager_loading_actions = ("destroy",)
+
+    _eager_plans = {}
+
+    def get_eager_plan(self):
+        serializer_class = self.get_serializer_class()
+        params = self.request.query_params if getattr(self, "request", None) else {}
+        if "fields" in params or "expand" in params:
+            # Com ?fields=/?expand= o plano carrega só as relações pedidas
+            serializer = serializer_class(context=self.get_serializer_context())
+            return plan(serializer, serializer_class.Meta.model)
+
+        plan_ = self._eager_plans.get(serializer_class)
+        if plan_ is None:
+            serializer = serializer_class(context=self.get_serializer_context())
+            plan_ = plan(serializer, serializer_class.Meta.model)
+            self._eager_plans[serializer_class] = plan_
+        return plan_
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, "action", None) in self.skip_eager_loading_actions:
+            return queryset
+        return apply(queryset, *self.get_eager_plan())
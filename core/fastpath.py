@@ -0,0 +1,141 @@
+"""
+Serialização somente-leitura compilada a partir de um ModelSerializer.
+
+Em vez de passar cada instância pela maquinaria genérica do DRF (get_attribute,
+serializers aninhados, um dict por nível), o serializer é "compilado" uma vez em:
+- uma projeção plana de colunas para .values_list(), que inclui as relações
+  diretas aninhadas (FK/one-to-one) via joins;
+- uma função gerada com exec que converte cada tupla no mesmo dict que o DRF
+  produziria, na mesma ordem de chaves e com o to_representation de cada campo;
+- uma consulta extra por relação many=True (ex.: subcategorias da categoria).
+
+A saída é idêntica à do serializer original. Serializers que sobrescrevem
+to_representation precisam declarar em `fast_extra_fields` as chaves que o
+override acrescenta ({"chave": "atributo"}); caso contrário a compilação falha.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+def _tree(serializer, model, prefix=""):
+    """
+    Percorre os campos de leitura e devolve a lista (chave, tipo, dados) na
+    ordem de saída do DRF.
+    """
+    serializer_class = type(serializer)
+    extra = getattr(serializer_class, "fast_extra_fields", None)
+    overrides = serializer_class.to_representation is not serializers.ModelSerializer.to_representation
+    if overrides and extra is None:
+        raise ImproperlyConfigured(
+            f"{serializer_class.__name__} sobrescreve to_representation; "
+            "declare fast_extra_fields para usar o caminho compilado."
+        )
+
+    items = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        path = prefix + "__".join(field.source_attrs)
+        if isinstance(field, serializers.ListSerializer):
+            relation = model._meta.get_field(field.source_attrs[0])
+            child_model = field.child.Meta.model
+            items.append((name, "many", (prefix, relation.field.name, CompiledSerializer(field.child, child_model))))
+        elif isinstance(field, serializers.BaseSerializer):
+            items.append((name, "one", (path + "__", _tree(field, field.Meta.model, path + "__"))))
+        elif isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            # values_list devolve o id da FK, o mesmo valor que o DRF emite
+            items.append((name, "raw", path))
+        elif isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField)):
+            raise ImproperlyConfigured(f"Campo relacional de leitura não suportado: {name}")
+        else:
+            items.append((name, "value", (path, field.to_representation)))
+    for key, attr in (extra or {}).items():
+        items.append((key, "raw", prefix + attr))
+    return items
+
+class CompiledSerializer:
+    def __init__(self, serializer, model):
+        self.model = model
+        self.columns = []
+        self.many = []   # (índice da pk do pai, fk no modelo filho, CompiledSerializer do filho)
+        self.convert = self._build(_tree(serializer, model))
+
+    def _column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return self.columns.index(path)
+
+    def _expr(self, items, env):
+        parts = []
+        for key, kind, data in items:
+            if kind == "value":
+                path, to_representation = data
+                index = self._column(path)
+                env[f"_f{index}"] = to_representation
+                parts.append(f"{key!r}: (None if row[{index}] is None else _f{index}(row[{index}]))")
+            elif kind == "raw":
+                parts.append(f"{key!r}: row[{self._column(data)}]")
+            elif kind == "one":
+                prefix, children = data
+                pk_index = self._column(prefix + "pk")
+                parts.append(f"{key!r}: (None if row[{pk_index}] is None else {self._expr(children, env)})")
+            else:
+                prefix, fk_name, child = data
+                pk_index = self._column(prefix + "pk")
+                slot = len(self.many)
+                self.many.append((pk_index, fk_name, child))
+                parts.append(f"{key!r}: many[{slot}].get(row[{pk_index}], [])")
+        return "{" + ", ".join(parts) + "}"
+
+    def _build(self, items):
+        env = {}
+        body = self._expr(items, env)
+        args = "".join(f", {name}={name}" for name in env)
+        source = f"def convert(row, many{args}):\n    return {body}\n"
+        namespace = dict(env)
+        exec(source, namespace)
+        return namespace["convert"]
+
+    def _load_many(self, rows):
+        loaded = []
+        for pk_index, fk_name, child in self.many:
+            parent_ids = {row[pk_index] for row in rows if row[pk_index] is not None}
+            grouped = {}
+            if parent_ids:
+                queryset = child.model._default_manager.filter(**{f"{fk_name}__in": parent_ids})
+                for parent_id, item in child.keyed(queryset, fk_name):
+                    grouped.setdefault(parent_id, []).append(item)
+            loaded.append(grouped)
+        return loaded
+
+    def _convert_rows(self, rows, key_width):
+        body = [row[key_width:] for row in rows]
+        many = self._load_many(body)
+        return [(row[0], self.convert(values, many)) for row, values in zip(rows, body)]
+
+    def keyed(self, queryset, key):
+        """Lista de (valor de `key`, dict) para o queryset."""
+        return self._convert_rows(list(queryset.values_list(key, *self.columns)), 1)
+
+    def serialize(self, objects):
+        """
+        `objects` pode ser um queryset (ordem e filtros preservados) ou uma lista
+        de instâncias, como a página devolvida pelo paginador.
+        """
+        if isinstance(objects, (list, tuple)):
+            pks = [obj.pk for obj in objects]
+            by_pk = dict(self.keyed(self.model._default_manager.filter(pk__in=pks), "pk"))
+            return [by_pk[pk] for pk in pks if pk in by_pk]
+
+        rows = list(objects.select_related(None).prefetch_related(None).values_list(*self.columns))
+        many = self._load_many(rows)
+        return [self.convert(values, many) for values in rows]
+
+_compiled = {}
+
+def compile_serializer(serializer_class):
+    """Compila (uma vez por classe) o caminho rápido do serializer."""
+    compiled = _compiled.get(serializer_class)
+    if compiled is None:
+        compiled = CompiledSerializer(serializer_class(context={}), serializer_class.Meta.model)
+        _compiled[serializer_class] = compiled
+    return compiled
@@ -0,0 +1,82 @@
+"""
+Progresso das metas.
+
+O valor acumulado de uma meta é o initialValue mais a soma dos valores das
+transações ligadas por GoalTransaction. A listagem anota, na mesma consulta das
+metas (um GROUP BY pela meta), o total aportado e a data do primeiro aporte; a
+partir deles, sem consultas extras:
+- accumulatedValue: initialValue + aportes;
+- progressPercent: accumulatedValue em relação ao aimValue;
+- projectedCompletionDate: mantido o ritmo médio diário de aportes desde o
+  primeiro, a data em que o aimValue seria atingido;
+- onTrack: se a projeção chega até o completionDate (metas já atingidas
+  contam como em dia).
+
+Com um ritmo ínfimo a projeção passaria do maior `date` representável; nesse
+caso projectedCompletionDate fica nulo e a meta não está em dia.
+"""
+import datetime
+import math
+
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .models import GoalTransaction
+from .rollups import local_date
+
+def annotate_progress(queryset):
+    return queryset.annotate(
+        goalContributed=Sum("goaltransaction__transaction__value"),
+        goalFirstContribution=Min("goaltransaction__transaction__date"),
+    )
+
+def _parse_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat((value or "")[:10])
+    except ValueError:
+        return None
+
+def progress(goal):
+    """Progresso da meta; consulta os aportes só se a instância não veio anotada."""
+    if "goalContributed" not in goal.__dict__:
+        totals = GoalTransaction.objects.filter(goal=goal).aggregate(
+            contributed=Sum("transaction__value"),
+            first=Min("transaction__date"),
+        )
+        goal.goalContributed, goal.goalFirstContribution = totals["contributed"], totals["first"]
+
+    contributed = goal.goalContributed or 0
+    accumulated = (goal.initialValue or 0) + contributed
+    percent = round(accumulated * 100 / goal.aimValue, 2) if goal.aimValue else None
+
+    today = timezone.localdate()
+    reached = bool(goal.aimValue) and accumulated >= goal.aimValue
+    projected = None
+    unreachable = False
+    if reached:
+        projected = today
+    elif contributed > 0 and goal.goalFirstContribution:
+        elapsed_days = max((today - local_date(goal.goalFirstContribution)).days + 1, 1)
+        daily = contributed / elapsed_days
+        days = math.ceil((goal.aimValue - accumulated) / daily)
+        if days <= (datetime.date.max - today).days:
+            projected = today + datetime.timedelta(days=days)
+        else:
+            unreachable = True
+
+    deadline = _parse_date(goal.completionDate)
+    on_track = None
+    if reached:
+        on_track = True
+    elif unreachable and deadline:
+        on_track = False
+    elif projected and deadline:
+        on_track = projected <= deadline
+    return {
+        "accumulatedValue": accumulated,
+        "progressPercent": percent,
+        "projectedCompletionDate": projected,
+        "onTrack": on_track,
+    }
@@ -0,0 +1,245 @@
+"""
+Verificação dos ID tokens do login social (Google e Apple).
+
+Os tokens são JWT assinados (RS256) e validados localmente contra as chaves
+públicas (JWKS) de cada provedor: assinatura, emissor, audiência e expiração.
+A audiência é sempre exigida: um provedor sem client ids em
+settings.SOCIAL_AUTH (AUDIENCES) não aceita login. O login não depende de uma
+ida ao provedor:
+- as chaves ficam em memória por provedor e são renovadas depois de TTL
+  segundos (ou do max-age informado pelo provedor, o que for menor). A
+  renovação roda em segundo plano enquanto as chaves antigas continuam em uso;
+  só a primeira carga do processo espera a rede;
+- um `kid` desconhecido (rotação de chaves) força uma renovação, no máximo uma
+  a cada MIN_REFRESH_INTERVAL segundos, para que tokens forjados não virem
+  uma enxurrada de requisições ao provedor;
+- as requisições usam uma Session com pool de conexões e TIMEOUT
+  (conexão, leitura) curto; se a renovação falhar, as chaves anteriores
+  continuam valendo.
+
+`verify` é o caminho síncrono usado pelo SocialLoginViewSet; `averify` é o
+equivalente para código assíncrono (ASGI), que só sai do event loop para
+buscar chaves. As URLs de JWKS são configuráveis, o que permite apontar para um
+servidor local de chaves em testes.
+"""
+import logging
+import re
+import threading
+import time
+
+import jwt
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROVIDERS = {
+    "google": {
+        "JWKS_URL": "https://www.googleapis.com/oauth2/v3/certs",
+        "ISSUERS": ["https://accounts.google.com", "accounts.google.com"],
+        "AUDIENCES": [],
+    },
+    "apple": {
+        "JWKS_URL": "https://appleid.apple.com/auth/keys",
+        "ISSUERS": ["https://appleid.apple.com"],
+        "AUDIENCES": [],
+    },
+}
+
+ALGORITHMS = ["RS256"]
+
+class KeysUnavailable(Exception):
+    """Não há chaves do provedor em memória e a busca falhou."""
+
+def _config():
+    config = {"TIMEOUT": (1.0, 2.0), "TTL": 3600, "MIN_REFRESH_INTERVAL": 60, "LEEWAY": 30, "POOL_SIZE": 10}
+    config.update(getattr(settings, "SOCIAL_AUTH", {}))
+    providers = {name: dict(values) for name, values in DEFAULT_PROVIDERS.items()}
+    for name, values in config.get("PROVIDERS", {}).items():
+        providers.setdefault(name, {}).update(values)
+    config["PROVIDERS"] = providers
+    return config
+
+_session = None
+_session_lock = threading.Lock()
+
+def session():
+    """Session compartilhada, com pool de conexões e sem novas tentativas automáticas."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = _config()["POOL_SIZE"]
+                http = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+                http.mount("https://", adapter)
+                http.mount("http://", adapter)
+                _session = http
+    return _session
+
+def _max_age(response):
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    return int(match.group(1)) if match else None
+
+class KeySet:
+    """Chaves JWKS de um provedor, renovadas em segundo plano."""
+
+    def __init__(self, url):
+        self.url = url
+        self.keys = {}
+        self.expires = 0.0
+        self.last_fetch = 0.0
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def fetch(self):
+        config = _config()
+        self.last_fetch = time.monotonic()
+        response = session().get(self.url, timeout=config["TIMEOUT"])
+        response.raise_for_status()
+        keys = {}
+        for data in response.json().get("keys", []):
+            try:
+                key = jwt.PyJWK(data)
+            except jwt.PyJWKError:
+                continue
+            keys[data.get("kid")] = key
+        ttl = config["TTL"]
+        max_age = _max_age(response)
+        if max_age is not None:
+            ttl = min(ttl, max_age)
+        with self.lock:
+            self.keys = keys
+            self.expires = time.monotonic() + ttl
+        return keys
+
+    def _refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        def run():
+            try:
+                self.fetch()
+            except Exception:
+                logger.warning("Falha ao renovar as chaves de %s; mantendo as anteriores", self.url, exc_info=True)
+                # Nova tentativa só depois do intervalo mínimo
+                self.expires = time.monotonic() + _config()["MIN_REFRESH_INTERVAL"]
+            finally:
+                self.refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def needs_fetch(self, kid=None):
+        """True quando não há chaves ou o `kid` é desconhecido e a última busca já passou do intervalo mínimo."""
+        if not self.keys:
+            return True
+        return (
+            kid is not None
+            and kid not in self.keys
+            and time.monotonic() - self.last_fetch >= _config()["MIN_REFRESH_INTERVAL"]
+        )
+
+    def get(self, kid):
+        """Chave do `kid`, buscando as chaves só quando necessário (ver needs_fetch)."""
+        if self.needs_fetch(kid):
+            try:
+                self.fetch()
+            except Exception as exc:
+                if not self.keys:
+                    raise KeysUnavailable(self.url) from exc
+                logger.warning("Falha ao buscar as chaves de %s", self.url, exc_info=True)
+        elif time.monotonic() >= self.expires:
+            self._refresh_in_background()
+        return self.keys.get(kid)
+
+_key_sets = {}
+_key_sets_lock = threading.Lock()
+
+def key_set(provider):
+    url = _config()["PROVIDERS"][provider]["JWKS_URL"]
+    with _key_sets_lock:
+        keys = _key_sets.get(url)
+        if keys is None:
+            keys = _key_sets[url] = KeySet(url)
+    return keys
+
+def _audiences(provider):
+    """Client ids aceitos como audiência; sem eles o provedor não aceita login."""
+    audiences = _config()["PROVIDERS"][provider].get("AUDIENCES")
+    if not audiences:
+        message = f"Login social com {provider} sem client ids em SOCIAL_AUTH (AUDIENCES)"
+        logger.error(message)
+        raise ImproperlyConfigured(message)
+    return list(audiences)
+
+def _claims(provider, token, key):
+    config = _config()
+    provider_config = config["PROVIDERS"][provider]
+    claims = jwt.decode(
+        token,
+        key=key,
+        algorithms=ALGORITHMS,
+        audience=_audiences(provider),
+        issuer=provider_config["ISSUERS"],
+        leeway=config["LEEWAY"],
+        options={"require": ["exp", "iat", "iss", "sub", "aud"]},
+    )
+    if not claims.get("email"):
+        return None
+    if str(claims.get("email_verified", "true")).lower() != "true":
+        return None
+    return {"email": claims["email"], "name": claims.get("name")}
+
+def _kid(token):
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        return None
+    if header.get("alg") not in ALGORITHMS:
+        return None
+    return header.get("kid")
+
+def verify(provider, token):
+    """
+    Valida o ID token do provedor e retorna {"email", "name"}, ou None se o
+    token for inválido. Levanta KeysUnavailable se não houver chaves para
+    validar e ImproperlyConfigured se o provedor não tiver client ids.
+    """
+    if provider not in _config()["PROVIDERS"]:
+        return None
+    _audiences(provider)
+    kid = _kid(token)
+    if kid is None:
+        return None
+    key = key_set(provider).get(kid)
+    if key is None:
+        return None
+    try:
+        return _claims(provider, token, key)
+    except jwt.PyJWTError:
+        return None
+
+async def averify(provider, token):
+    """Versão assíncrona de verify; a busca de chaves roda em uma thread."""
+    if provider not in _config()["PROVIDERS"]:
+        return None
+    _audiences(provider)
+    kid = _kid(token)
+    if kid is None:
+        return None
+    keys = key_set(provider)
+    if keys.needs_fetch(kid):
+        key = await sync_to_async(keys.get, thread_sensitive=False)(kid)
+    else:
+        key = keys.get(kid)
+    if key is None:
+        return None
+    try:
+        return _claims(provider, token, key)
+    except jwt.PyJWTError:
+        return None
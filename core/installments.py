@@ -0,0 +1,185 @@
+"""
+Geração de parcelamentos e recorrências no servidor.
+
+A partir de uma transação modelo e de uma quantidade (ou data final), a série
+inteira é montada aqui e gravada com um único bulk_create:
+- parcelamento: originalValue (ou value) é dividido em centavos inteiros entre
+  as parcelas; o resto da divisão vai um centavo para cada uma das primeiras,
+  então a soma das parcelas é sempre exatamente o valor original;
+- recorrência (fixed=1): o mesmo valor se repete todo mês, no fixedDay quando
+  informado;
+- compras no cartão: cada parcela vai para a fatura do mês correspondente,
+  calculada pelo closingDay/dueDate do cartão. As faturas que faltarem são
+  criadas com um bulk_create.
+
+Todas as linhas da série compartilham o groupingId, e invoiceNumber indica a
+posição (1..n). Edição e exclusão "desta e das próximas" atuam sobre a série a
+partir de um item com uma única instrução UPDATE/DELETE.
+"""
+import calendar
+import uuid
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import bulk, derived, rollups, search, sync
+from .models import Invoice, Transaction
+
+# Status das faturas criadas automaticamente para receber parcelas
+NEW_INVOICE_STATUS = 0
+
+# Campos que identificam a posição do item na série e não podem ser alterados em conjunto
+SERIES_FIELDS = ("date", "paymentDate", "originalDate", "invoice", "invoiceNumber", "groupingId", "user")
+
+# Campos que entram no documento de busca
+SEARCH_FIELDS = ("description", "observation", "category", "subcategory")
+
+def add_months(date, months, day=None):
+    """
+    Soma meses a `date` (date ou datetime, mantendo a hora), limitando o dia
+    (ou `day`) ao último dia do mês.
+    """
+    index = date.month - 1 + months
+    year, month = date.year + index // 12, index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return date.replace(year=year, month=month, day=min(day or date.day, last_day))
+
+def split_value(total, count):
+    """Divide `total` (em centavos) em `count` partes inteiras que somam exatamente `total`."""
+    base, remainder = divmod(abs(total), count)
+    sign = -1 if total < 0 else 1
+    return [sign * (base + (1 if index < remainder else 0)) for index in range(count)]
+
+def invoice_dates(card, purchase_date, count):
+    """
+    (closingDate, dueDate) das faturas das `count` parcelas de uma compra no
+    cartão. Compras a partir do dia de fechamento caem na fatura seguinte, e o
+    vencimento é no mês seguinte ao fechamento quando o dia de vencimento não
+    vem depois do dia de fechamento.
+    """
+    purchase_date = rollups.local_date(purchase_date)
+    first = purchase_date.replace(day=1)
+    if purchase_date.day >= card.closingDay:
+        first = add_months(first, 1)
+
+    dates = []
+    for index in range(count):
+        closing = add_months(first, index, card.closingDay)
+        due = add_months(closing, 0 if card.dueDate > card.closingDay else 1, card.dueDate)
+        dates.append((closing, due))
+    return dates
+
+def card_invoices(card, dates):
+    """
+    Faturas do cartão para cada (closingDate, dueDate): uma consulta pelas
+    existentes e um bulk_create das que faltarem.
+    """
+    closing_dates = {closing for closing, _ in dates}
+    invoices = {
+        invoice.closingDate: invoice
+        for invoice in Invoice.objects.filter(creditCard=card, closingDate__in=closing_dates)
+    }
+    timestamp = timezone.now().isoformat()
+    missing = [
+        Invoice(
+            created=timestamp,
+            modified=timestamp,
+            status=NEW_INVOICE_STATUS,
+            closingDate=closing,
+            dueDate=due,
+            creditCard=card,
+            user_id=card.user_id,
+        )
+        for closing, due in dict(dates).items()
+        if closing not in invoices
+    ]
+    for invoice in Invoice.objects.bulk_create(missing):
+        invoices[invoice.closingDate] = invoice
+    sync.record_instances(missing)
+    return [invoices[closing] for closing, _ in dates]
+
+def build_series(template, count, card=None):
+    """
+    Monta (sem gravar) as transações da série a partir dos dados validados de
+    uma transação (`template`, dict de validated_data).
+    """
+    start = template.get("date") or timezone.now()
+    recurring = bool(template.get("fixed"))
+    original_value = template.get("originalValue")
+    if original_value is None:
+        original_value = template["value"]
+
+    if recurring:
+        values = [template["value"]] * count
+        day = template.get("fixedDay")
+    else:
+        values = split_value(original_value, count)
+        day = None
+
+    invoices = [None] * count
+    if card is not None:
+        invoices = card_invoices(card, invoice_dates(card, start, count))
+
+    grouping_id = template.get("groupingId") or uuid.uuid4()
+    series = []
+    for index in range(count):
+        data = dict(template)
+        data.update(
+            date=add_months(start, index, day),
+            value=values[index],
+            originalValue=original_value,
+            originalDate=start,
+            groupingId=grouping_id,
+            invoiceNumber=index + 1,
+        )
+        if card is not None:
+            data.update(invoice=invoices[index], isCreditCardTransaction=1)
+        series.append(Transaction(**data))
+    return series
+
+def create_series(template, count, card=None):
+    with transaction.atomic():
+        return bulk.insert_transactions(build_series(template, count, card))
+
+def following(instance):
+    """Queryset do item e dos seguintes na mesma série (por invoiceNumber, ou data)."""
+    queryset = Transaction.objects.filter(groupingId=instance.groupingId, user_id=instance.user_id)
+    if instance.invoiceNumber is not None:
+        return queryset.filter(invoiceNumber__gte=instance.invoiceNumber)
+    if instance.date is not None:
+        return queryset.filter(Q(date__gte=instance.date) | Q(pk=instance.pk))
+    return queryset.filter(pk=instance.pk)
+
+def update_following(instance, changes):
+    """
+    Aplica `changes` (validated_data sem campos de posição) ao item e aos
+    seguintes com um único UPDATE, mantendo rollup e busca consistentes.
+    """
+    values = {}
+    for name, value in changes.items():
+        field = Transaction._meta.get_field(name)
+        values[field.attname] = value.pk if field.is_relation and value is not None else value
+
+    queryset = following(instance)
+    with transaction.atomic():
+        previous = list(queryset.select_for_update().values(*rollups.SNAPSHOT_FIELDS))
+        updated = queryset.update(**values, modified=timezone.now().isoformat())
+        derived.apply_changes([
+            ({field: row[field] for field in rollups.SNAPSHOT_FIELDS},
+             {field: values.get(field, row[field]) for field in rollups.SNAPSHOT_FIELDS})
+            for row in previous
+        ])
+        if any(name in SEARCH_FIELDS for name in changes):
+            search.reindex(Transaction.objects.filter(pk__in=[row["id"] for row in previous]))
+    return updated
+
+def delete_following(instance):
+    """
+    Exclui o item e os seguintes; os dados derivados são ajustados em lote pelo
+    post_delete. Retorna só a quantidade de transações: o total do delete()
+    inclui as linhas excluídas em cascata (GoalTransaction).
+    """
+    with transaction.atomic(), derived.batch():
+        _, deleted = following(instance).delete()
+    return deleted.get(Transaction._meta.label, 0)
@@ -0,0 +1,99 @@
+"""
+Totais das faturas de cartão.
+
+Os totais de um conjunto de faturas saem de uma única consulta agrupada por
+Transaction.invoice:
+- purchases: compras (sem isReturn e sem partialPaymentId);
+- returns: estornos (isReturn);
+- payments: pagamentos parciais (partialPaymentId preenchido);
+- amountDue: purchases - returns - payments.
+
+Cada total fica em cache por fatura (settings.INVOICE_TOTALS_CACHE) e é
+invalidado depois do commit de qualquer gravação em uma transação ligada à
+fatura: save(), exclusão, endpoints em lote e edição de séries. A invalidação
+só alcança os outros workers num cache compartilhado, então sem um (CACHE
+None) os totais são sempre calculados pela consulta agrupada.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from .models import Transaction
+
+TOTAL_FIELDS = ("purchases", "returns", "payments", "amountDue")
+
+_IS_RETURN = Q(isReturn__isnull=False) & ~Q(isReturn=0)
+_IS_PAYMENT = Q(partialPaymentId__isnull=False) & ~Q(partialPaymentId="")
+
+def _config():
+    config = {"CACHE": None, "TIMEOUT": 3600}
+    config.update(getattr(settings, "INVOICE_TOTALS_CACHE", {}))
+    return config
+
+def _cache():
+    alias = _config()["CACHE"]
+    return caches[alias] if alias else None
+
+def _key(invoice_id):
+    return f"invoice:{invoice_id}:totals"
+
+def compute(invoice_ids):
+    """Totais das faturas com uma consulta agrupada; faturas sem transações somam zero."""
+    totals = {pk: dict.fromkeys(TOTAL_FIELDS, 0) for pk in invoice_ids}
+    rows = (
+        Transaction.objects
+        .filter(invoice_id__in=invoice_ids)
+        .values("invoice_id")
+        .annotate(
+            purchases=Sum("value", filter=~_IS_RETURN & ~_IS_PAYMENT),
+            returns=Sum("value", filter=_IS_RETURN),
+            payments=Sum("value", filter=_IS_PAYMENT & ~_IS_RETURN),
+        )
+        .order_by()
+    )
+    for row in rows:
+        purchases, returns, payments = row["purchases"] or 0, row["returns"] or 0, row["payments"] or 0
+        totals[row["invoice_id"]] = {
+            "purchases": purchases,
+            "returns": returns,
+            "payments": payments,
+            "amountDue": purchases - returns - payments,
+        }
+    return totals
+
+def totals_for(invoice_ids):
+    """Totais por id de fatura, lendo do cache e calculando só os que faltam."""
+    invoice_ids = list(dict.fromkeys(invoice_ids))
+    if not invoice_ids:
+        return {}
+    cache = _cache()
+    if cache is None:
+        return compute(invoice_ids)
+    cached = cache.get_many([_key(pk) for pk in invoice_ids])
+    totals = {pk: cached[_key(pk)] for pk in invoice_ids if _key(pk) in cached}
+
+    missing = [pk for pk in invoice_ids if pk not in totals]
+    if missing:
+        computed = compute(missing)
+        cache.set_many({_key(pk): value for pk, value in computed.items()}, _config()["TIMEOUT"])
+        totals.update(computed)
+    return totals
+
+def attach(invoices):
+    """Preenche `totals` das instâncias de fatura de uma vez."""
+    invoices = [invoice for invoice in invoices if "_totals" not in invoice.__dict__]
+    totals = totals_for([invoice.pk for invoice in invoices])
+    for invoice in invoices:
+        invoice._totals = totals[invoice.pk]
+
+def invalidate(*invoice_ids):
+    """Descarta os totais em cache das faturas após o commit da transação atual."""
+    cache = _cache()
+    keys = [_key(pk) for pk in set(invoice_ids) if pk is not None]
+    if cache is not None and keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+def invalidate_changes(changes):
+    """Invalida as faturas de antes e depois de cada mudança (old, new) de transação."""
+    invalidate(*(state["invoice_id"] for change in changes for state in change if state))
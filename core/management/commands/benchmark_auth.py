@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import StatelessJWTAuthentication
+from core.models import User
+from core.urls import router
+
+class Command(BaseCommand):
+    help = (
+        "Compara, com um access token real, o JWTAuthentication do simplejwt e o "
+        "StatelessJWTAuthentication: consultas e tempo por requisição autenticada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Usuário do token (padrão: o primeiro)")
+        parser.add_argument("--endpoint", default="bank-accounts", help="Prefixo do router usado na requisição completa")
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(pk=options["user"]).first() if options["user"] else User.objects.first()
+        if user is None:
+            raise CommandError("Nenhum usuário encontrado")
+        viewset = next((viewset for prefix, viewset, _ in router.registry if prefix == options["endpoint"]), None)
+        if viewset is None or not hasattr(viewset, "list"):
+            raise CommandError(f"Endpoint sem listagem: {options['endpoint']}")
+
+        factory = APIRequestFactory()
+        authorization = f"Bearer {AccessToken.for_user(user)}"
+        view = viewset.as_view({"get": "list"})
+
+        self.stdout.write(f"{'autenticação':<22}{'auth q':>8}{'auth ms':>9}{'req q':>7}{'req ms':>9}")
+        for name, authentication in (("simplejwt", JWTAuthentication), ("stateless", StatelessJWTAuthentication)):
+            def request():
+                return factory.get(f"/api/v1/{options['endpoint']}/", HTTP_AUTHORIZATION=authorization)
+
+            # Só a autenticação: validação do token e carga do usuário
+            backend = authentication()
+            backend.authenticate(request())
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    authenticated, _ = backend.authenticate(request())
+                    authenticated.pk
+                auth_ms = (time.perf_counter() - start) * 1000 / options["repeat"]
+            auth_queries = len(queries) / options["repeat"]
+
+            # Requisição completa, com a autenticação escolhida no lugar da configurada
+            viewset.authentication_classes = [authentication]
+            try:
+                view(request())
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for _ in range(options["repeat"]):
+                        response = view(request())
+                    request_ms = (time.perf_counter() - start) * 1000 / options["repeat"]
+            finally:
+                del viewset.authentication_classes
+            if response.status_code not in (200, 304):
+                raise CommandError(f"{name}: resposta {response.status_code}")
+            request_queries = len(queries) / options["repeat"]
+
+            self.stdout.write(
+                f"{name:<22}{auth_queries:>8.1f}{auth_ms:>9.3f}{request_queries:>7.1f}{request_ms:>9.3f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark concluído"))
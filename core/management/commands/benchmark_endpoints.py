@@ -0,0 +1,64 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import benchmarks
+from core.models import User
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p95/p99), consultas e memória alocada de cada endpoint na "
+        "base gerada por seed_benchmark e falha se algum passar dos limites de consultas "
+        "ou memória de core/benchmark_budgets.json. Latência acima do limite é só um "
+        "aviso, a menos que --fail-on-latency seja usado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default=f"{benchmarks.USERNAME_PREFIX}0", help="username autenticado")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--endpoint", action="append", dest="endpoints", help="Mede só este endpoint (repetível)")
+        parser.add_argument("--budgets", default=str(benchmarks.BUDGETS_PATH))
+        parser.add_argument(
+            "--update-budgets", action="store_true",
+            help="Grava as medições como novos limites em vez de verificá-las",
+        )
+        parser.add_argument(
+            "--fail-on-latency", action="store_true",
+            help="Trata latência acima do limite como regressão (máquina dedicada e ociosa)",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Usuário {options['user']} não encontrado; rode seed_benchmark antes")
+
+        vendor = connection.vendor
+        results = benchmarks.measure(user, repeat=options["repeat"], only=options["endpoints"])
+
+        self.stdout.write(f"{'endpoint':<24}{'status':>7}{'q':>4}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KB':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['status']:>7}{result['queries']:>4}{result['p50Ms']:>9.2f}"
+                f"{result['p95Ms']:>9.2f}{result['p99Ms']:>9.2f}{result['memoryKb']:>8}"
+            )
+
+        budgets = benchmarks.load_budgets(options["budgets"])
+        if options["update_budgets"]:
+            budgets = benchmarks.updated_budgets(results, budgets, vendor)
+            with open(options["budgets"], "w") as output:
+                json.dump(budgets, output, indent=2, ensure_ascii=False)
+                output.write("\n")
+            self.stdout.write(self.style.SUCCESS(f"Limites atualizados para {vendor}"))
+            return
+
+        failures = benchmarks.check(results, budgets)
+        slow = benchmarks.latency_warnings(results, budgets, vendor)
+        if options["fail_on_latency"]:
+            failures += slow
+        elif slow:
+            self.stdout.write(self.style.WARNING("Latência acima do limite:\n" + "\n".join(slow)))
+        if failures:
+            raise CommandError("Regressões:\n" + "\n".join(failures))
+        scope = "consultas e memória" if slow else "todos"
+        self.stdout.write(self.style.SUCCESS(f"Endpoints dentro dos limites ({scope}, {vendor})"))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from core.eager import apply, plan
+from core.fastpath import compile_serializer
+from core.models import Transaction
+from core.serializers import TransactionSerializer
+
+class Command(BaseCommand):
+    help = (
+        "Compara linhas/segundo do TransactionSerializer (DRF, com eager loading) "
+        "e da projeção compilada (core/fastpath.py) sobre as transações existentes, "
+        "conferindo que o JSON gerado é idêntico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Quantidade de transações serializadas")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        pks = list(Transaction.objects.order_by("-date", "pk").values_list("pk", flat=True)[:rows])
+        if not pks:
+            raise CommandError("Nenhuma transação para serializar")
+        queryset = Transaction.objects.filter(pk__in=pks).order_by("-date", "pk")
+
+        # Mesmo plano de select_related/prefetch_related que o viewset aplica
+        drf_queryset = apply(queryset, *plan(TransactionSerializer(context={}), Transaction))
+        compiled = compile_serializer(TransactionSerializer)
+
+        def drf():
+            return TransactionSerializer(drf_queryset.all(), many=True).data
+
+        def fast():
+            return compiled.serialize(queryset.all())
+
+        renderer = JSONRenderer()
+        if renderer.render(drf()) != renderer.render(fast()):
+            raise CommandError("Saída do caminho compilado difere do DRF")
+
+        results = {}
+        for name, run in (("drf", drf), ("compiled", fast)):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = len(pks) / best
+            self.stdout.write(f"{name:>9}: {results[name]:10.0f} linhas/s ({best * 1000:.1f} ms para {len(pks)} linhas)")
+
+        self.stdout.write(self.style.SUCCESS(f"Ganho: {results['compiled'] / results['drf']:.1f}x"))
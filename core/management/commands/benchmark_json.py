@@ -0,0 +1,62 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.middleware import brotli
+from core.models import User
+from core.renderers import FastJSONRenderer
+from core.urls import router
+
+class Command(BaseCommand):
+    help = (
+        "Mede, para as listagens do router, o tempo de encode do JSONRenderer padrão "
+        "e do FastJSONRenderer (orjson) e o tamanho da resposta sem compressão, "
+        "com gzip e com brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Usuário autenticado nas requisições (padrão: o primeiro)")
+        parser.add_argument("--page-size", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(pk=options["user"]).first() if options["user"] else User.objects.first()
+        if user is None:
+            raise CommandError("Nenhum usuário encontrado")
+
+        factory = APIRequestFactory()
+        renderers = {"standard": JSONRenderer(), "fast": FastJSONRenderer()}
+
+        header = f"{'endpoint':<22}{'std ms':>9}{'fast ms':>9}{'bytes':>10}{'gzip':>9}{'br':>9}"
+        self.stdout.write(header)
+        for prefix, viewset, basename in router.registry:
+            if not hasattr(viewset, "list"):
+                continue
+            request = factory.get(f"/api/v1/{prefix}/", {"page_size": options["page_size"]})
+            force_authenticate(request, user=user)
+            response = viewset.as_view({"get": "list"})(request)
+            # Catálogos em cache (CatalogCacheMixin) já respondem com o JSON pronto
+            if response.status_code != 200 or not hasattr(response, "data"):
+                continue
+
+            timings = {}
+            for name, renderer in renderers.items():
+                best = None
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    content = renderer.render(response.data)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best * 1000
+
+            gzipped = len(gzip.compress(content, compresslevel=6))
+            brotlied = len(brotli.compress(content, quality=4)) if brotli else "-"
+            self.stdout.write(
+                f"{prefix:<22}{timings['standard']:>9.2f}{timings['fast']:>9.2f}"
+                f"{len(content):>10}{gzipped:>9}{brotlied:>9}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark concluído"))
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import User
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga contra um servidor em execução: requisições GET concorrentes "
+        "autenticadas, com requisições/segundo e latências p50/p90/p99."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000", help="Endereço do servidor")
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="Caminho requisitado, repetível (padrão: /api/v1/bank-accounts/)",
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=20.0, help="Segundos de medição")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Segundos descartados no início")
+        parser.add_argument("--token", help="Access token (padrão: emitido para --user)")
+        parser.add_argument("--user", help="Usuário do token (padrão: o primeiro)")
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if not token:
+            user = User.objects.filter(pk=options["user"]).first() if options["user"] else User.objects.first()
+            if user is None:
+                raise CommandError("Nenhum usuário encontrado; informe --token")
+            token = str(AccessToken.for_user(user))
+
+        paths = options["paths"] or ["/api/v1/bank-accounts/"]
+        urls = [options["url"].rstrip("/") + path for path in paths]
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+
+        start = time.perf_counter()
+        measure_from = start + options["warmup"]
+        stop = measure_from + options["duration"]
+        latencies, errors, lock = [], [0], threading.Lock()
+
+        def worker(offset):
+            http = requests.Session()
+            samples, failed, index = [], 0, offset
+            while True:
+                began = time.perf_counter()
+                if began >= stop:
+                    break
+                try:
+                    response = http.get(urls[index % len(urls)], headers=headers, timeout=30)
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                index += 1
+                if began >= measure_from:
+                    if ok:
+                        samples.append(time.perf_counter() - began)
+                    else:
+                        failed += 1
+            with lock:
+                latencies.extend(samples)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - measure_from
+        self.stdout.write(f"requisições: {len(latencies)}  erros: {errors[0]}")
+        self.stdout.write(f"req/s: {len(latencies) / elapsed:.1f}")
+        self.stdout.write(
+            "latência ms: "
+            + "  ".join(f"p{p}={percentile(latencies, p) * 1000:.1f}" for p in (50, 90, 99))
+        )
+        if errors[0]:
+            raise CommandError(f"{errors[0]} requisições falharam")
+        self.stdout.write(self.style.SUCCESS("Teste de carga concluído"))
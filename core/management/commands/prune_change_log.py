@@ -0,0 +1,19 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import sync
+
+class Command(BaseCommand):
+    help = (
+        "Apaga registros antigos do ChangeLog usado por /sync/. Clientes com cursor "
+        "anterior ao que foi apagado recebem a carga completa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90)
+
+    def handle(self, *args, **options):
+        deleted = sync.prune(timezone.now() - datetime.timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Registros apagados: {deleted}"))
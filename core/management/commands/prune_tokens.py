@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core import authentication
+
+class Command(BaseCommand):
+    help = (
+        "Apaga em lotes os refresh tokens expirados e suas entradas na blacklist. "
+        "Substitui o flushexpiredtokens do simplejwt, que apaga tudo em uma única operação."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        deleted = authentication.prune_expired_tokens(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Tokens apagados: {deleted}"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import balances
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói do zero os checkpoints mensais de saldo das contas (BalanceCheckpoint). "
+        "Use após cargas feitas fora do ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = balances.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Saldos reconstruídos: {total} checkpoints"))
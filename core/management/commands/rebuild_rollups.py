@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import rollups
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói do zero o rollup mensal de transações (TransactionRollup). "
+        "Use após cargas feitas fora do ORM ou mudança de moeda de uma conta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rollups.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rollup reconstruído: {total} linhas"))
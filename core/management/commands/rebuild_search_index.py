@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core import search
+from core.models import Transaction
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o documento de busca das transações (e a tabela FTS5 no SQLite). "
+        "Use após cargas feitas fora do ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Reindexa apenas as transações deste usuário")
+        parser.add_argument("--batch-size", type=int, default=search.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.all()
+        if options["user"]:
+            queryset = queryset.filter(user_id=options["user"])
+        total = search.reindex(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Busca reindexada: {total} transações"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+
+class Command(BaseCommand):
+    help = (
+        "Gera, com inserções em lote, a base sintética do benchmark de endpoints: "
+        "usuários bench-N com contas, cartão, faturas, planejamentos, orçamentos, metas "
+        "e anos de transações. Use um banco dedicado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--years", type=int, default=2)
+        parser.add_argument("--per-month", type=int, default=60, help="Transações por usuário e mês")
+        parser.add_argument("--seed", type=int, default=0, help="Semente do gerador (mesma semente, mesmos dados)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            users = benchmarks.seed(
+                users=options["users"],
+                years=options["years"],
+                per_month=options["per_month"],
+                random_seed=options["seed"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        total = len(users) * options["years"] * 12 * options["per_month"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Base gerada: {len(users)} usuários, {total} transações (senha: {benchmarks.PASSWORD})"
+        ))
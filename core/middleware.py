@@ -0,0 +1,145 @@
+"""
+Compressão de respostas negociada por Accept-Encoding (brotli ou gzip).
+
+Diferente do GZipMiddleware do Django, o limite mínimo de tamanho é
+configurável (respostas pequenas não compensam o custo da compressão) e o
+brotli é usado quando o cliente aceita e o pacote `brotli` está instalado.
+Respostas em streaming são comprimidas pedaço a pedaço, sem limite de tamanho.
+
+Configuração em settings.RESPONSE_COMPRESSION:
+- ENABLED: desliga o middleware por completo quando False;
+- MIN_LENGTH: tamanho mínimo (bytes) do corpo para comprimir;
+- ALGORITHMS: ordem de preferência do servidor entre "br" e "gzip";
+- GZIP_LEVEL / BROTLI_QUALITY: nível de compressão de cada algoritmo.
+"""
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+_accept_re = re.compile(r"\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*", re.IGNORECASE)
+
+def _config():
+    config = {
+        "ENABLED": True,
+        "MIN_LENGTH": 1024,
+        "ALGORITHMS": ["br", "gzip"],
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 4,
+    }
+    config.update(getattr(settings, "RESPONSE_COMPRESSION", {}))
+    return config
+
+def accepted_encodings(header):
+    """Codificações aceitas pelo cliente (q > 0), em minúsculas."""
+    accepted = set()
+    for part in header.split(","):
+        match = _accept_re.fullmatch(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+class _GzipStream:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self.compressor.compress(data)
+
+    def finish(self):
+        return self.compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        return self.compressor.process(data)
+
+    def finish(self):
+        return self.compressor.finish()
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.config = _config()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.algorithms = [
+            name for name in self.config["ALGORITHMS"]
+            if name == "gzip" or (name == "br" and brotli is not None)
+        ]
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def choose(self, request):
+        accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for name in self.algorithms:
+            if name in accepted or "*" in accepted:
+                return name
+        return None
+
+    def compress(self, algorithm, content):
+        if algorithm == "br":
+            return brotli.compress(content, quality=self.config["BROTLI_QUALITY"])
+        return gzip.compress(content, compresslevel=self.config["GZIP_LEVEL"], mtime=0)
+
+    def stream(self, algorithm):
+        if algorithm == "br":
+            return _BrotliStream(self.config["BROTLI_QUALITY"])
+        return _GzipStream(self.config["GZIP_LEVEL"])
+
+    def compress_sequence(self, algorithm, sequence):
+        compressor = self.stream(algorithm)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or response.status_code == 206:
+            return response
+        if not response.streaming and len(response.content) < self.config["MIN_LENGTH"]:
+            return response
+
+        # A resposta varia conforme Accept-Encoding mesmo quando não é comprimida
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        algorithm = self.choose(request)
+        if algorithm is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_sequence(algorithm, response.streaming_content)
+            del response["Content-Length"]
+        else:
+            compressed = self.compress(algorithm, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # O corpo muda por codificação: o ETag deixa de ser forte (RFC 9110 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        response.headers["Content-Encoding"] = algorithm
+        return response
@@ -0,0 +1,335 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:02
+
+import django.contrib.auth.models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bank',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('code', models.TextField(blank=True, null=True)),
+                ('name', models.TextField()),
+                ('image', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CreditCardFlag',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.TextField()),
+                ('image', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Currency',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('symbol', models.TextField(blank=True, null=True)),
+                ('code', models.TextField()),
+                ('number', models.TextField(blank=True, null=True)),
+                ('minorUnit', models.IntegerField(default=2)),
+                ('image', models.TextField(unique=True)),
+                ('type', models.IntegerField(default=1)),
+                ('countryCode', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Icon',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.TextField()),
+                ('set', models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Person',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('firstName', models.TextField(blank=True, null=True)),
+                ('lastName', models.TextField(blank=True, null=True)),
+                ('fullName', models.TextField()),
+                ('image', models.TextField(blank=True, null=True)),
+                ('status', models.IntegerField(default=1)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email address')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=150, unique=True)),
+                ('created', models.TextField(null=True)),
+                ('modified', models.TextField(null=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='users', to='core.person')),
+            ],
+            options={
+                'verbose_name': 'user',
+                'verbose_name_plural': 'users',
+                'abstract': False,
+            },
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField()),
+                ('created', models.TextField()),
+                ('readDateTime', models.TextField(blank=True, null=True)),
+                ('userActionScreen', models.TextField(blank=True, null=True)),
+                ('screenParams', models.TextField(blank=True, null=True)),
+                ('buttonTitle', models.TextField(blank=True, null=True)),
+                ('userActionModal', models.IntegerField(blank=True, null=True)),
+                ('translationKeyMessage', models.TextField(blank=True, null=True)),
+                ('translationKeyButton', models.TextField(blank=True, null=True)),
+                ('translationObj', models.TextField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BankAccount',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.TextField()),
+                ('type', models.IntegerField()),
+                ('operation', models.TextField(blank=True, null=True)),
+                ('accountNumber', models.TextField(blank=True, null=True)),
+                ('accountDigit', models.TextField(blank=True, null=True)),
+                ('agencyNumber', models.TextField(blank=True, null=True)),
+                ('agencyDigit', models.TextField(blank=True, null=True)),
+                ('initialBalance', models.IntegerField()),
+                ('created', models.TextField()),
+                ('modified', models.TextField()),
+                ('bankJson', models.TextField(blank=True, null=True)),
+                ('status', models.IntegerField(blank=True, null=True)),
+                ('bank', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.bank')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BankAccountLimit',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('translationKey', models.TextField()),
+                ('type', models.IntegerField()),
+                ('value', models.IntegerField()),
+                ('bankAccount', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Color',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('hexadecimal', models.TextField(blank=True, null=True)),
+                ('rgba', models.TextField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bankaccount',
+            name='color',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.color'),
+        ),
+        migrations.CreateModel(
+            name='CreditCard',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.TextField()),
+                ('modified', models.TextField()),
+                ('name', models.TextField()),
+                ('limitValue', models.IntegerField()),
+                ('closingDay', models.IntegerField()),
+                ('dueDate', models.IntegerField()),
+                ('status', models.IntegerField(blank=True, null=True)),
+                ('bankAccount', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('creditCardFlag', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.creditcardflag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bankaccount',
+            name='currency',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.currency'),
+        ),
+        migrations.CreateModel(
+            name='Goal',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('completionDate', models.TextField()),
+                ('type', models.IntegerField()),
+                ('description', models.TextField()),
+                ('aimValue', models.IntegerField()),
+                ('image', models.TextField(blank=True, null=True)),
+                ('rememberDay', models.IntegerField(blank=True, null=True)),
+                ('initialValue', models.IntegerField(default=0)),
+                ('bankAccount', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+                ('color', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.color')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('icon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.icon')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField()),
+                ('type', models.IntegerField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('color', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.color')),
+                ('icon', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.icon')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.TextField()),
+                ('modified', models.TextField()),
+                ('status', models.IntegerField()),
+                ('closingDate', models.TextField()),
+                ('dueDate', models.TextField()),
+                ('paymentDate', models.TextField(blank=True, null=True)),
+                ('paymentAmount', models.IntegerField(blank=True, null=True)),
+                ('creditCard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.creditcard')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Loan',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.TextField()),
+                ('modified', models.TextField()),
+                ('description', models.TextField()),
+                ('principalAmount', models.IntegerField()),
+                ('totalAmount', models.IntegerField()),
+                ('dueDate', models.TextField()),
+                ('type', models.IntegerField()),
+                ('bankAccount', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+                ('color', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.color')),
+                ('icon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.icon')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Planning',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('month', models.IntegerField()),
+                ('year', models.IntegerField()),
+                ('monthlyIncome', models.IntegerField()),
+                ('currency', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.currency')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Subcategory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subcategories', to='core.category')),
+                ('color', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.color')),
+                ('icon', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.icon')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Budget',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('plannedValue', models.IntegerField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.category')),
+                ('planning', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budgets', to='core.planning')),
+                ('subcategory', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.subcategory')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.TextField(editable=False)),
+                ('modified', models.TextField(editable=False)),
+                ('date', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('originalValue', models.IntegerField(blank=True, null=True)),
+                ('value', models.IntegerField()),
+                ('observation', models.TextField(blank=True, null=True)),
+                ('ignore', models.IntegerField(blank=True, null=True)),
+                ('isTransfer', models.IntegerField()),
+                ('isCreditCardTransaction', models.IntegerField()),
+                ('paid', models.IntegerField(blank=True, null=True)),
+                ('fixed', models.IntegerField(blank=True, null=True)),
+                ('fixedDay', models.IntegerField(blank=True, null=True)),
+                ('type', models.IntegerField()),
+                ('paymentDate', models.TextField(blank=True, null=True)),
+                ('groupingId', models.UUIDField(blank=True, default=uuid.uuid4, null=True)),
+                ('invoiceNumber', models.IntegerField(blank=True, null=True)),
+                ('isReturn', models.IntegerField(blank=True, null=True)),
+                ('invoiceValue', models.IntegerField(blank=True, null=True)),
+                ('originalDate', models.TextField(blank=True, null=True)),
+                ('partialPaymentId', models.TextField(blank=True, null=True)),
+                ('canEdit', models.IntegerField(blank=True, null=True)),
+                ('bankAccount', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.category')),
+                ('invoice', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.invoice')),
+                ('loan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.loan')),
+                ('subcategory', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.subcategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GoalTransaction',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.goal')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='core.transaction')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TransactionRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('type', models.IntegerField()),
+                ('paid', models.IntegerField(blank=True, null=True)),
+                ('total', models.BigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.category')),
+                ('currency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.currency')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'year', 'month'], name='rollup_user_month_idx')],
+            },
+        ),
+    ]
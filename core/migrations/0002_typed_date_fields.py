@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Primeira etapa da conversão das datas em texto: cria as colunas tipadas
+    ao lado das antigas. As datas das transações guardavam o instante enviado
+    pelos clientes (Date.toISOString()) e viram data-hora; as de faturas e
+    empréstimos são dias de calendário. Os dados são copiados em 0003 e as
+    colunas trocadas em 0004.
+    """
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='dateTyped',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='paymentDateTyped',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='originalDateTyped',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='closingDateTyped',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='dueDateTyped',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='dueDateTyped',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
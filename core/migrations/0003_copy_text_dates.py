@@ -0,0 +1,104 @@
+import datetime
+
+from django.db import migrations, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+BATCH_SIZE = 2000
+
+# modelo -> campos em texto que ganham uma coluna de data-hora (o instante enviado pelo cliente)
+DATETIME_FIELDS = {
+    'Transaction': ['date', 'paymentDate', 'originalDate'],
+}
+
+# modelo -> campos em texto que ganham uma coluna de data (dia de calendário)
+DATE_FIELDS = {
+    'Invoice': ['closingDate', 'dueDate'],
+    'Loan': ['dueDate'],
+}
+
+
+def parse_iso_datetime(value):
+    """
+    Texto ISO 8601 ('YYYY-MM-DD', 'YYYY-MM-DDTHH:MM:SS.sssZ', '...-03:00') como
+    data-hora com fuso. Sem fuso, o valor está no fuso do projeto
+    (settings.TIME_ZONE); uma data sem hora é a meia-noite desse dia.
+    """
+    if not value or not value.strip():
+        return None
+    parsed = parse_datetime(value.strip())
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_iso_date(value):
+    """Dia, no fuso do projeto, do instante em `value` ('2024-10-05T01:00:00-03:00' é 5/10 em UTC)."""
+    parsed = parse_iso_datetime(value)
+    return timezone.localdate(parsed) if parsed else None
+
+
+def format_iso_datetime(value):
+    """Volta ao texto no formato de Date.toISOString(), em UTC."""
+    if not value:
+        return None
+    value = value.astimezone(datetime.timezone.utc)
+    return value.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _copy_in_batches(model, pairs, convert):
+    source_fields = [source for source, _ in pairs]
+    target_fields = [target for _, target in pairs]
+    last_pk = None
+    while True:
+        queryset = model.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset.only('pk', *source_fields)[:BATCH_SIZE])
+        if not batch:
+            break
+        for obj in batch:
+            for source, target in pairs:
+                try:
+                    setattr(obj, target, convert(getattr(obj, source)))
+                except ValueError:
+                    raise ValueError(
+                        f'{model.__name__} {obj.pk}: valor inválido em {source}: {getattr(obj, source)!r}'
+                    )
+        # Cada lote em sua própria transação para não segurar locks na tabela inteira
+        with transaction.atomic():
+            model.objects.bulk_update(batch, target_fields)
+        last_pk = batch[-1].pk
+
+
+def copy_forward(apps, schema_editor):
+    for fields_by_model, convert in ((DATETIME_FIELDS, parse_iso_datetime), (DATE_FIELDS, parse_iso_date)):
+        for model_name, fields in fields_by_model.items():
+            model = apps.get_model('core', model_name)
+            _copy_in_batches(model, [(f, f'{f}Typed') for f in fields], convert)
+
+
+def copy_backward(apps, schema_editor):
+    formats = (
+        (DATETIME_FIELDS, format_iso_datetime),
+        (DATE_FIELDS, lambda value: value.isoformat() if value else None),
+    )
+    for fields_by_model, convert in formats:
+        for model_name, fields in fields_by_model.items():
+            model = apps.get_model('core', model_name)
+            _copy_in_batches(model, [(f'{f}Typed', f) for f in fields], convert)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_typed_date_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_forward, copy_backward),
+    ]
@@ -0,0 +1,88 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Última etapa da conversão: descarta as colunas em texto e assume as tipadas
+    preenchidas em 0003 com os nomes originais.
+    """
+
+    dependencies = [
+        ('core', '0003_copy_text_dates'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='transaction',
+            name='date',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='dateTyped',
+            new_name='date',
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='paymentDate',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='paymentDateTyped',
+            new_name='paymentDate',
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='originalDate',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='originalDateTyped',
+            new_name='originalDate',
+        ),
+        migrations.RemoveField(
+            model_name='invoice',
+            name='closingDate',
+        ),
+        migrations.RenameField(
+            model_name='invoice',
+            old_name='closingDateTyped',
+            new_name='closingDate',
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='closingDate',
+            field=models.DateField(),
+        ),
+        migrations.RemoveField(
+            model_name='invoice',
+            name='dueDate',
+        ),
+        migrations.RenameField(
+            model_name='invoice',
+            old_name='dueDateTyped',
+            new_name='dueDate',
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='dueDate',
+            field=models.DateField(),
+        ),
+        migrations.RemoveField(
+            model_name='loan',
+            name='dueDate',
+        ),
+        migrations.RenameField(
+            model_name='loan',
+            old_name='dueDateTyped',
+            new_name='dueDate',
+        ),
+        migrations.AlterField(
+            model_name='loan',
+            name='dueDate',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date'], name='transaction_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+from core.operations import AddIndexConcurrentlyIfSupported, RemoveIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+    """
+    Índices compostos para os filtros mais frequentes. No PostgreSQL são
+    criados com CONCURRENTLY, sem bloquear escrita nas tabelas.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_swap_typed_date_fields'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date', 'type', 'paid'], name='transaction_user_date_type_idx'),
+        ),
+        # Coberto pelo índice acima (mesmo prefixo user, date)
+        RemoveIndexConcurrentlyIfSupported(
+            model_name='transaction',
+            name='transaction_user_date_idx',
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], name='transaction_user_cat_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='planning',
+            index=models.Index(fields=['user', 'year', 'month'], name='planning_user_month_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='invoice',
+            index=models.Index(fields=['creditCard', 'closingDate'], name='invoice_card_closing_idx'),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name='alert',
+            index=models.Index(fields=['user', 'readDateTime'], name='alert_user_read_idx'),
+        ),
+    ]
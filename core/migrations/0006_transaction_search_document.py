@@ -0,0 +1,85 @@
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 2000
+
+SQLITE_TABLE = 'core_transaction_search'
+
+
+def build_document(*parts):
+    # Mesmo documento de core/search.py no momento desta migração
+    text = unicodedata.normalize('NFKD', ' '.join(filter(None, parts)))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def fill_search_documents(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    queryset = Transaction.objects.select_related('category', 'subcategory').order_by('pk')
+    last_pk = None
+    while True:
+        batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:BATCH_SIZE])
+        if not batch:
+            break
+        for obj in batch:
+            obj.searchDocument = build_document(
+                obj.description,
+                obj.observation,
+                obj.category.description if obj.category_id else None,
+                obj.subcategory.description if obj.subcategory_id else None,
+            )
+        with transaction.atomic():
+            Transaction.objects.bulk_update(batch, ['searchDocument'])
+        last_pk = batch[-1].pk
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS transaction_search_trgm_idx '
+            'ON core_transaction USING gin ("searchDocument" gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+            f"USING fts5(transaction_id UNINDEXED, document, tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SQLITE_TABLE} (transaction_id, document) '
+            f'SELECT id, COALESCE("searchDocument", \'\') FROM core_transaction'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS transaction_search_trgm_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+
+
+class Migration(migrations.Migration):
+    """
+    Documento de busca desnormalizado em Transaction e seu índice textual:
+    GIN com trigramas no PostgreSQL, tabela FTS5 no SQLite (ver core/search.py).
+    """
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='searchDocument',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:24
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+# Receita e despesa, como em core/balances.py no momento desta migração
+CREDIT_TYPES = (2, 4)
+DEBIT_TYPES = (3, 5)
+
+
+def fill_checkpoints(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    BalanceCheckpoint = apps.get_model('core', 'BalanceCheckpoint')
+    rows = (
+        Transaction.objects
+        .filter(bankAccount__isnull=False, date__isnull=False, paid=1, type__in=CREDIT_TYPES + DEBIT_TYPES)
+        .exclude(ignore=1)
+        .exclude(isCreditCardTransaction=1)
+        .annotate(
+            signedValue=Case(
+                When(type__in=CREDIT_TYPES, then=F('value')),
+                default=-F('value'),
+                output_field=IntegerField(),
+            ),
+            balanceYear=ExtractYear('date'),
+            balanceMonth=ExtractMonth('date'),
+        )
+        .values('bankAccount_id', 'balanceYear', 'balanceMonth')
+        .annotate(delta=Sum('signedValue'))
+        .order_by('bankAccount_id', 'balanceYear', 'balanceMonth')
+    )
+
+    def checkpoints():
+        account_id, closing = None, 0
+        for row in rows.iterator():
+            if row['bankAccount_id'] != account_id:
+                account_id, closing = row['bankAccount_id'], 0
+            closing += row['delta'] or 0
+            yield BalanceCheckpoint(
+                bankAccount_id=account_id, year=row['balanceYear'], month=row['balanceMonth'], closing=closing,
+            )
+
+    BalanceCheckpoint.objects.bulk_create(checkpoints(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_transaction_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('closing', models.BigIntegerField(default=0)),
+                ('bankAccount', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.bankaccount')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('bankAccount', 'year', 'month'), name='balance_checkpoint_month_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_checkpoints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tokensRevokedAt',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+SQLITE_TABLE = 'core_transaction_search'
+SQLITE_KEY_TABLE = 'core_transaction_search_key'
+
+
+def key_search_rows(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    schema_editor.execute(
+        f'CREATE TABLE {SQLITE_KEY_TABLE} '
+        f'(id INTEGER PRIMARY KEY, transaction_id char(32) NOT NULL UNIQUE)'
+    )
+    schema_editor.execute(f"CREATE VIRTUAL TABLE {SQLITE_TABLE} USING fts5(document, tokenize='trigram')")
+    schema_editor.execute(f'INSERT INTO {SQLITE_KEY_TABLE} (transaction_id) SELECT id FROM core_transaction')
+    schema_editor.execute(
+        f'INSERT INTO {SQLITE_TABLE} (rowid, document) '
+        f'SELECT k.id, COALESCE(t."searchDocument", \'\') FROM {SQLITE_KEY_TABLE} k '
+        f'JOIN core_transaction t ON t.id = k.transaction_id'
+    )
+
+
+def unkey_search_rows(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_KEY_TABLE}')
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {SQLITE_TABLE} "
+        f"USING fts5(transaction_id UNINDEXED, document, tokenize='trigram')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {SQLITE_TABLE} (transaction_id, document) '
+        f'SELECT id, COALESCE("searchDocument", \'\') FROM core_transaction'
+    )
+
+
+class Migration(migrations.Migration):
+    """
+    SQLite: a linha FTS5 de cada transação passa a ter como rowid a chave
+    inteira de core_transaction_search_key, para que atualizar e remover o
+    espelho não percorra a tabela FTS5 inteira (ver core/search.py).
+    """
+
+    dependencies = [
+        ('core', '0009_user_tokens_revoked_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_search_rows, unkey_search_rows),
+    ]
@@ -1,8 +1,20 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
+def _description_changed(instance):
+    if instance._state.adding:
+        return False
+    return (
+        type(instance).objects
+        .filter(pk=instance.pk)
+        .exclude(description=instance.description)
+        .exists()
+    )
+
 class Person(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     firstName = models.TextField(null=True, blank=True)
@@ -22,6 +34,8 @@ class User(AbstractUser):
     created = models.TextField(null=True, blank=False)
     modified = models.TextField(null=True, blank=False)
     person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name="users")
+    # Tokens JWT emitidos antes deste instante são recusados (ver core/authentication.py)
+    tokensRevokedAt = models.DateTimeField(null=True, blank=True, db_index=True)
 
     EMAIL_FIELD = "email"
     USERNAME_FIELD = "username"
@@ -74,6 +88,13 @@ class BankAccount(models.Model):
     status = models.IntegerField(null=True, blank=True)
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT)
 
+    @property
+    def currentBalance(self):
+        """Saldo atual; usa a anotação da listagem quando presente (ver core/balances.py)."""
+        if "balanceClosing" in self.__dict__:
+            return self.initialBalance + self.balanceClosing
+        return balances.current_balance(self)
+
 class BankAccountLimit(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     translationKey = models.TextField()
@@ -104,13 +125,25 @@ class Invoice(models.Model):
     created = models.TextField()
     modified = models.TextField()
     status = models.IntegerField()
-    closingDate = models.TextField()
-    dueDate = models.TextField()
+    closingDate = models.DateField()
+    dueDate = models.DateField()
     paymentDate = models.TextField(null=True, blank=True)
     paymentAmount = models.IntegerField(null=True, blank=True)
     creditCard = models.ForeignKey(CreditCard, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["creditCard", "closingDate"], name="invoice_card_closing_idx"),
+        ]
+
+    @property
+    def totals(self):
+        """Compras, estornos, pagamentos parciais e valor devido (ver core/invoices.py)."""
+        if "_totals" not in self.__dict__:
+            invoices.attach([self])
+        return self._totals
+
 class Category(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     description = models.TextField()
@@ -119,6 +152,12 @@ class Category(models.Model):
     color = models.ForeignKey(Color, on_delete=models.PROTECT)
     user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
 
+    def save(self, *args, **kwargs):
+        description_changed = _description_changed(self)
+        super().save(*args, **kwargs)
+        if description_changed:
+            search.reindex(Transaction.objects.filter(category=self))
+
 class Subcategory(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     description = models.TextField()
@@ -130,6 +169,12 @@ class Subcategory(models.Model):
         Category, related_name="subcategories", on_delete=models.CASCADE
     )
 
+    def save(self, *args, **kwargs):
+        description_changed = _description_changed(self)
+        super().save(*args, **kwargs)
+        if description_changed:
+            search.reindex(Transaction.objects.filter(subcategory=self))
+
 class Planning(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     month = models.IntegerField()
@@ -138,6 +183,11 @@ class Planning(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "year", "month"], name="planning_user_month_idx"),
+        ]
+
 class Budget(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     plannedValue = models.IntegerField()
@@ -152,7 +202,7 @@ class Loan(models.Model):
     description = models.TextField()
     principalAmount = models.IntegerField()
     totalAmount = models.IntegerField()
-    dueDate = models.TextField()
+    dueDate = models.DateField()
     type = models.IntegerField()
     bankAccount = models.ForeignKey(BankAccount, on_delete=models.CASCADE)
     color = models.ForeignKey(Color, on_delete=models.CASCADE)
@@ -165,7 +215,7 @@ class Transaction(models.Model):
     created = models.TextField(editable=False)
     modified = models.TextField(editable=False)
     
-    date = models.TextField(null=True, blank=True)
+    date = models.DateTimeField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     originalValue = models.IntegerField(null=True, blank=True)
     value = models.IntegerField()
@@ -177,7 +227,7 @@ class Transaction(models.Model):
     fixed = models.IntegerField(null=True, blank=True)
     fixedDay = models.IntegerField(null=True, blank=True)
     type = models.IntegerField()
-    paymentDate = models.TextField(null=True, blank=True)
+    paymentDate = models.DateTimeField(null=True, blank=True)
     
     invoice = models.ForeignKey('Invoice', null=True, blank=True, on_delete=models.CASCADE)
     bankAccount = models.ForeignKey('BankAccount', null=True, blank=True, on_delete=models.CASCADE)
@@ -190,10 +240,27 @@ class Transaction(models.Model):
     invoiceNumber = models.IntegerField(null=True, blank=True)
     isReturn = models.IntegerField(null=True, blank=True)
     invoiceValue = models.IntegerField(null=True, blank=True)
-    originalDate = models.TextField(null=True, blank=True)
+    originalDate = models.DateTimeField(null=True, blank=True)
     partialPaymentId = models.TextField(null=True, blank=True)
     canEdit = models.IntegerField(null=True, blank=True)
 
+    # Documento de busca desnormalizado, mantido em save() (ver core/search.py)
+    searchDocument = models.TextField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Listagem/resumo do mês: filtra por usuário + intervalo de data, depois tipo e pago
+            models.Index(fields=["user", "date", "type", "paid"], name="transaction_user_date_type_idx"),
+            # Transações de uma categoria no período
+            models.Index(fields=["user", "category", "date"], name="transaction_user_cat_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rollupState = rollups.snapshot(instance)
+        return instance
+
     def save(self, *args, **kwargs):
         now = timezone.now()
         timestamp_str = now.isoformat() 
@@ -202,7 +269,76 @@ class Transaction(models.Model):
             self.created = timestamp_str
         
         self.modified = timestamp_str
-        super().save(*args, **kwargs)
+        self.searchDocument = search.document_for(self)
+
+        # Mantém rollup, saldos e totais de fatura consistentes com a linha gravada
+        previous = None
+        if not self._state.adding:
+            previous = getattr(self, "_rollupState", None) or rollups.snapshot_from_db(self.pk)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Instância com campos adiados: o estado gravado vem do banco
+            current = rollups.snapshot(self) or rollups.snapshot_from_db(self.pk)
+            derived.apply_change(previous, current)
+            search.index_transaction(self)
+        self._rollupState = current
+
+class TransactionRollup(models.Model):
+    """
+    Totais mensais de transações por (usuário, ano-mês, categoria, moeda, tipo, pago).
+    Mantido incrementalmente por Transaction.save e pelo post_delete de Transaction;
+    pode ser reconstruído com `manage.py rebuild_rollups`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    type = models.IntegerField()
+    paid = models.IntegerField(null=True, blank=True)
+    total = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.SET_NULL)
+    currency = models.ForeignKey(Currency, null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "year", "month"], name="rollup_user_month_idx"),
+        ]
+
+class BalanceCheckpoint(models.Model):
+    """
+    Saldo acumulado das movimentações de uma conta até o fim de um mês (sem o
+    initialBalance). Mantido incrementalmente a partir das gravações de
+    transações; ver core/balances.py.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    bankAccount = models.ForeignKey(BankAccount, on_delete=models.CASCADE)
+    year = models.IntegerField()
+    month = models.IntegerField()
+    closing = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bankAccount", "year", "month"], name="balance_checkpoint_month_uniq"),
+        ]
+
+@receiver(pre_delete, sender=Transaction)
+def transaction_pre_delete(sender, instance, **kwargs):
+    # Instâncias carregadas com campos adiados precisam do estado antes de sumirem
+    if getattr(instance, "_rollupState", None) is None:
+        instance._rollupState = rollups.snapshot_from_db(instance.pk)
+
+@receiver(post_delete, sender=Transaction)
+def transaction_post_delete(sender, instance, origin=None, **kwargs):
+    # Cobre delete() da instância, QuerySet.delete() e deleções em cascata
+    derived.apply_change(derived.cascaded(getattr(instance, "_rollupState", None), origin), None)
+    search.unindex_transaction(instance.pk)
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=BankAccount)
+def owner_pre_delete(sender, instance, origin=None, **kwargs):
+    # Enviado antes da cascata; ver core/derived.py
+    derived.deleting(instance, origin)
 
 class Goal(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -220,6 +356,13 @@ class Goal(models.Model):
     icon = models.ForeignKey(Icon, null=True, blank=True, on_delete=models.CASCADE)
     initialValue = models.IntegerField(default=0)
 
+    @property
+    def progress(self):
+        """Valor acumulado, percentual e projeção de conclusão (ver core/goals.py)."""
+        if "_progress" not in self.__dict__:
+            self._progress = goals.progress(self)
+        return self._progress
+
 class GoalTransaction(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     transaction = models.OneToOneField(Transaction, on_delete=models.CASCADE)
@@ -239,5 +382,30 @@ class Alert(models.Model):
     translationKeyButton = models.TextField(null=True, blank=True)
     translationObj = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "readDateTime"], name="alert_user_read_idx"),
+        ]
+
     def __str__(self):
         return f"Alert({self.id})"
+
+class ChangeLog(models.Model):
+    """
+    Registro de gravações e exclusões dos modelos sincronizados. O id crescente
+    é o cursor de GET /sync/?since=; ver core/sync.py.
+    """
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE)
+    model = models.TextField()
+    objectId = models.UUIDField()
+    deleted = models.BooleanField(default=False)
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Mudanças de um usuário (ou globais, user nulo) a partir de um cursor
+            models.Index(fields=["user", "id"], name="changelog_user_cursor_idx"),
+        ]
+
+from . import balances, derived, goals, invoices, rollups, search  # noqa: E402  (rollups importa os modelos deste módulo)
@@ -1,6 +1,101 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 200
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) em ordem decrescente de (campo, pk).
+
+    Em vez de OFFSET, cada página continua a partir da última linha da anterior,
+    então o custo não cresce com a profundidade, e não há COUNT(*).
+    O campo de ordenação pode ser nulo; as linhas sem valor vêm por último.
+    """
+    cursor_query_param = "cursor"
+    page_size = StandardResultsSetPagination.page_size
+    page_size_query_param = StandardResultsSetPagination.page_size_query_param
+    max_page_size = StandardResultsSetPagination.max_page_size
+    invalid_cursor_message = "Cursor inválido"
+
+    def __init__(self, field):
+        self.field = field
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def encode_cursor(self, instance):
+        value = getattr(instance, self.field)
+        if isinstance(value, datetime.datetime):
+            # O DjangoJSONEncoder corta os microssegundos; o cursor precisa do valor exato
+            value = value.isoformat()
+        position = {"v": value, "pk": instance.pk}
+        raw = json.dumps(position, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, queryset, token):
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token.encode()))
+            opts = queryset.model._meta
+            value = opts.get_field(self.field).to_python(position["v"])
+            pk = opts.pk.to_python(position["pk"])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(F(self.field).desc(nulls_last=True), "-pk")
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            value, pk = self.decode_cursor(queryset, token)
+            if value is None:
+                queryset = queryset.filter(**{f"{self.field}__isnull": True, "pk__lt": pk})
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{self.field}__lt": value})
+                    | Q(**{self.field: value, "pk__lt": pk})
+                    | Q(**{f"{self.field}__isnull": True})
+                )
+
+        # Uma linha a mais indica se existe próxima página
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
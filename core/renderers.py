@@ -0,0 +1,64 @@
+"""
+Renderer e parser JSON rápidos baseados em orjson.
+
+O orjson serializa nativamente UUID, datetime, date e time, que são a maior
+parte dos valores das listagens, e gera bytes UTF-8 compactos, o mesmo formato
+do JSONRenderer padrão do DRF (COMPACT_JSON e UNICODE_JSON). O que o orjson não
+conhece (Decimal, strings lazy, querysets...) passa pelo encoder do DRF.
+
+Se o orjson não estiver instalado, ou se o cliente pedir indentação, as classes
+caem no comportamento padrão do DRF. A escolha entre este par e o padrão fica
+em settings.JSON_BACKEND.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+_encoder = JSONEncoder()
+
+# OPT_NON_STR_KEYS: dicts com chaves UUID/int, aceitas pelo json da stdlib;
+# OPT_UTC_Z: datetimes em UTC terminam em "Z", como no encoder do DRF
+_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+def _default(obj):
+    return _encoder.default(obj)
+
+def dumps(data):
+    """Serializa `data` em bytes JSON compactos (UTF-8)."""
+    if orjson is not None and getattr(settings, "JSON_BACKEND", "fast") == "fast":
+        return orjson.dumps(data, default=_default, option=_OPTIONS)
+    return JSONRenderer().render(data)
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            content = stream.read() if stream is not None else b""
+            if codecs.lookup(encoding).name != "utf-8":
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,208 @@
+"""
+Manutenção do rollup mensal de transações (TransactionRollup).
+
+Cada linha guarda o total e a quantidade de transações de um usuário em um
+ano-mês, agrupadas por categoria, moeda da conta, tipo e situação de pagamento.
+As telas de planejamento e o resumo da listagem de transações leem daqui em vez
+de somar a tabela de transações a cada requisição.
+
+Linhas repetidas para a mesma chave são toleradas (por exemplo, duas criações
+concorrentes): toda leitura agrega com Sum, então o resultado continua correto.
+
+As gravações chegam aqui por core/derived.py, junto com os demais dados
+derivados das transações.
+"""
+import datetime
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import BankAccount, Transaction, TransactionRollup
+
+# Campos de Transaction que definem a chave e o valor do rollup. Os mesmos
+# snapshots alimentam os demais dados derivados (core/derived.py), daí o id (para
+# o registro de sincronização), a fatura e os campos que decidem se a transação
+# movimenta o saldo da conta.
+SNAPSHOT_FIELDS = (
+    "id", "user_id", "date", "category_id", "bankAccount_id", "type", "paid", "value",
+    "invoice_id", "ignore", "isCreditCardTransaction",
+)
+
+def snapshot(instance):
+    """
+    Captura os campos relevantes da transação. Retorna None se algum deles
+    estiver adiado (.only()/.defer()), para não disparar consultas extras.
+    """
+    data = instance.__dict__
+    if any(field not in data for field in SNAPSHOT_FIELDS):
+        return None
+    return {field: data[field] for field in SNAPSHOT_FIELDS}
+
+def snapshot_from_db(pk):
+    return Transaction.objects.filter(pk=pk).values(*SNAPSHOT_FIELDS).first()
+
+def local_date(value):
+    """
+    Dia de calendário, no fuso do projeto (settings.TIME_ZONE), de um valor de
+    Transaction.date: a data-hora do banco, uma date ou o texto ISO de uma
+    instância ainda não recarregada. None para transações sem data.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = Transaction._meta.get_field("date").to_python(value)
+    if isinstance(value, datetime.datetime):
+        if timezone.is_naive(value):
+            return value.date()
+        return timezone.localdate(value)
+    return value
+
+def day_start(day):
+    """Início do dia `day` no fuso do projeto, para filtrar Transaction.date por dia."""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time()))
+
+def _year_month(date):
+    # Transações sem data ficam fora do rollup; o mês é o de ExtractYear/ExtractMonth no rebuild
+    day = local_date(date)
+    if day is None:
+        return None
+    return day.year, day.month
+
+# Colunas que identificam uma linha do rollup, na ordem das chaves de _key
+KEY_FIELDS = ("user_id", "year", "month", "category_id", "currency_id", "type", "paid")
+
+def _key(state, currencies):
+    year_month = _year_month(state["date"])
+    if year_month is None:
+        return None
+    return {
+        "user_id": state["user_id"],
+        "year": year_month[0],
+        "month": year_month[1],
+        "category_id": state["category_id"],
+        "currency_id": state["currency_id"] if "currency_id" in state else currencies.get(state["bankAccount_id"]),
+        "type": state["type"],
+        "paid": state["paid"],
+    }
+
+def _currencies(*states):
+    account_ids = {s["bankAccount_id"] for s in states if s and s["bankAccount_id"]}
+    if not account_ids:
+        return {}
+    return dict(
+        BankAccount.objects.filter(pk__in=account_ids).values_list("id", "currency_id")
+    )
+
+def _update(key, total, count):
+    return (
+        TransactionRollup.objects
+        .filter(**key)
+        .update(total=F("total") + total, count=F("count") + count)
+    )
+
+def _apply(key, total, count):
+    updated = _update(key, total, count)
+    if count > 0 and not updated:
+        TransactionRollup.objects.create(**key, total=total, count=count)
+    elif count < 0:
+        TransactionRollup.objects.filter(**key, count__lte=0).delete()
+
+def _deltas(old, new, currencies):
+    """(chave, total, quantidade) a somar no rollup para a mudança old -> new."""
+    old_key = _key(old, currencies) if old else None
+    new_key = _key(new, currencies) if new else None
+
+    if old_key is not None and old_key == new_key:
+        if old["value"] != new["value"]:
+            yield new_key, new["value"] - old["value"], 0
+        return
+
+    if old_key is not None:
+        yield old_key, -old["value"], -1
+    if new_key is not None:
+        yield new_key, new["value"], 1
+
+def apply_change(old, new):
+    """
+    Aplica ao rollup a diferença entre dois estados (snapshots) de uma transação.
+    old=None representa uma criação e new=None uma exclusão.
+    """
+    for key, total, count in _deltas(old, new, _currencies(old, new)):
+        _apply(key, total, count)
+
+def apply_changes(changes):
+    """Aplica várias mudanças (old, new), somando as diferenças por chave."""
+    currencies = _currencies(*(state for change in changes for state in change))
+    totals = {}
+    for old, new in changes:
+        for key, total, count in _deltas(old, new, currencies):
+            current = totals.setdefault(tuple(key.items()), [0, 0])
+            current[0] += total
+            current[1] += count
+    totals = {key: value for key, value in totals.items() if value[0] or value[1]}
+    if not totals:
+        return
+
+    # Uma consulta descobre quais chaves já existem; as novas entram num único INSERT
+    keys = [dict(key) for key in totals]
+    scope = TransactionRollup.objects.filter(
+        user_id__in={key["user_id"] for key in keys},
+        year__in={key["year"] for key in keys},
+        month__in={key["month"] for key in keys},
+    )
+    existing = {tuple((field, row[field]) for field in KEY_FIELDS) for row in scope.values(*KEY_FIELDS)}
+    new_rows = []
+    for key, (total, count) in totals.items():
+        if key in existing:
+            _update(dict(key), total, count)
+        elif count > 0:
+            new_rows.append(TransactionRollup(**dict(key), total=total, count=count))
+    TransactionRollup.objects.bulk_create(new_rows)
+    if any(count < 0 for _, count in totals.values()):
+        scope.filter(count__lte=0).delete()
+
+def rollup_queryset(user_id, year, month, currency_id=None):
+    queryset = TransactionRollup.objects.filter(user_id=user_id, year=int(year), month=int(month))
+    if currency_id:
+        queryset = queryset.filter(currency_id=currency_id)
+    return queryset
+
+def rebuild(batch_size=1000):
+    """
+    Recalcula todo o rollup a partir da tabela de transações.
+    Deve rodar dentro de uma transação de banco para não expor o rollup vazio.
+    """
+    TransactionRollup.objects.all().delete()
+
+    rows = (
+        Transaction.objects
+        .exclude(date__isnull=True)
+        .annotate(
+            rollupYear=ExtractYear("date"),
+            rollupMonth=ExtractMonth("date"),
+            rollupCurrency=F("bankAccount__currency_id"),
+        )
+        .values("user_id", "rollupYear", "rollupMonth", "category_id", "rollupCurrency", "type", "paid")
+        .annotate(rollupTotal=Sum("value"), rollupCount=Count("id"))
+        .order_by()
+    )
+
+    created = TransactionRollup.objects.bulk_create(
+        (
+            TransactionRollup(
+                user_id=row["user_id"],
+                year=row["rollupYear"],
+                month=row["rollupMonth"],
+                category_id=row["category_id"],
+                currency_id=row["rollupCurrency"],
+                type=row["type"],
+                paid=row["paid"],
+                total=row["rollupTotal"] or 0,
+                count=row["rollupCount"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=batch_size,
+    )
+    return len(created)
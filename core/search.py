@@ -0,0 +1,141 @@
+"""
+Busca textual de transações.
+
+Cada transação guarda em `searchDocument` um documento desnormalizado
+(descrição, observação, categoria e subcategoria, em minúsculas e sem acentos),
+atualizado em Transaction.save e quando a descrição de uma categoria muda.
+
+- PostgreSQL: índice GIN com gin_trgm_ops sobre searchDocument; o LIKE '%termo%'
+  usa o índice e o resultado é ordenado por similaridade de trigramas.
+- SQLite: tabela virtual FTS5 (tokenizer trigram) espelhando os documentos,
+  ordenada pelo bm25 do próprio FTS5. A linha FTS5 de cada transação usa como
+  rowid a chave inteira de core_transaction_search_key (transaction_id único),
+  então atualizar ou remover o espelho é uma busca por chave, não uma varredura.
+"""
+import unicodedata
+
+from django.db import connection
+from django.db.models import FloatField, Value
+
+SQLITE_TABLE = "core_transaction_search"
+SQLITE_KEY_TABLE = "core_transaction_search_key"
+
+# O tokenizer trigram do FTS5 só encontra termos com pelo menos 3 caracteres
+MIN_FTS_TERM_LENGTH = 3
+
+BATCH_SIZE = 1000
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+def build_document(description, observation, category, subcategory):
+    return normalize(" ".join(filter(None, [description, observation, category, subcategory])))
+
+def document_for(transaction):
+    return build_document(
+        transaction.description,
+        transaction.observation,
+        transaction.category.description if transaction.category_id else None,
+        transaction.subcategory.description if transaction.subcategory_id else None,
+    )
+
+def _uses_fts():
+    return connection.vendor == "sqlite"
+
+def _db_id(pk):
+    # O SQLite guarda UUIDField como hex de 32 caracteres
+    return pk.hex
+
+# rowid da linha FTS5 de uma transação
+_ROWID = f"(SELECT id FROM {SQLITE_KEY_TABLE} WHERE transaction_id = %s)"
+
+def index_transactions(transactions, created=False):
+    """
+    Espelha o documento das transações na tabela FTS5 (apenas SQLite). Com
+    `created`, as transações acabaram de ser inseridas e não há linhas antigas
+    a remover.
+    """
+    if not _uses_fts() or not transactions:
+        return
+    ids = [[_db_id(transaction.pk)] for transaction in transactions]
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.executemany(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = {_ROWID}", ids)
+        cursor.executemany(f"INSERT OR IGNORE INTO {SQLITE_KEY_TABLE} (transaction_id) VALUES (%s)", ids)
+        cursor.executemany(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, document) "
+            f"SELECT id, %s FROM {SQLITE_KEY_TABLE} WHERE transaction_id = %s",
+            [[transaction.searchDocument or "", _db_id(transaction.pk)] for transaction in transactions],
+        )
+
+def index_transaction(transaction):
+    index_transactions([transaction])
+
+def unindex_transaction(pk):
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = {_ROWID}", [_db_id(pk)])
+        cursor.execute(f"DELETE FROM {SQLITE_KEY_TABLE} WHERE transaction_id = %s", [_db_id(pk)])
+
+def reindex(queryset, batch_size=BATCH_SIZE):
+    """Recalcula searchDocument (e o espelho FTS5) das transações do queryset, em lotes."""
+    from .models import Transaction
+
+    queryset = queryset.select_related("category", "subcategory").order_by("pk")
+    last_pk = None
+    total = 0
+    while True:
+        batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:batch_size])
+        if not batch:
+            break
+        for transaction in batch:
+            transaction.searchDocument = document_for(transaction)
+        Transaction.objects.bulk_update(batch, ["searchDocument"])
+        index_transactions(batch)
+        total += len(batch)
+        last_pk = batch[-1].pk
+    return total
+
+def search(queryset, term):
+    """
+    Filtra o queryset pelo termo e anota `searchRank`, onde um valor maior
+    indica um resultado mais relevante.
+    """
+    term = normalize(term)
+    if not term:
+        return queryset
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return (
+            queryset
+            .filter(searchDocument__contains=term)
+            .annotate(searchRank=TrigramWordSimilarity(term, "searchDocument"))
+        )
+
+    if _uses_fts() and len(term) >= MIN_FTS_TERM_LENGTH:
+        match = '"' + term.replace('"', '""') + '"'
+        return queryset.extra(
+            tables=[SQLITE_TABLE, SQLITE_KEY_TABLE],
+            where=[
+                f"{SQLITE_TABLE} MATCH %s",
+                # O "+" impede o uso do rowid como restrição da tabela FTS5: sem ele o
+                # planner pode partir das transações do usuário e rodar o MATCH por linha
+                f"{SQLITE_KEY_TABLE}.id = +{SQLITE_TABLE}.rowid",
+                f"{SQLITE_KEY_TABLE}.transaction_id = core_transaction.id",
+            ],
+            params=[match],
+            # rank do FTS5 é negativo: quanto menor, mais relevante
+            select={"searchRank": f"-{SQLITE_TABLE}.rank"},
+        )
+
+    return (
+        queryset
+        .filter(searchDocument__contains=term)
+        .annotate(searchRank=Value(0.0, output_field=FloatField()))
+    )
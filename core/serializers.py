@@ -1,3 +1,5 @@
+import datetime
+
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from .models import (
@@ -7,15 +9,196 @@ from .models import (
 )
 from django.contrib.auth.hashers import make_password
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils.dateparse import parse_datetime
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer as BaseTokenRefreshSerializer
+from . import invoices
+from .authentication import RefreshToken
+from .base import owned_queryset
+from .rollups import local_date
+
+class ISODateField(serializers.DateField):
+    """
+    Dia de calendário (faturas, empréstimos) que também aceita data-hora ISO 8601.
+    Com fuso ("2024-10-05T01:00:00-03:00") vale o dia do instante no fuso do
+    projeto (settings.TIME_ZONE), e não o que aparece no texto; sem fuso, a
+    data-hora já está nesse fuso.
+    """
+    def to_internal_value(self, value):
+        if isinstance(value, str) and "T" in value:
+            parsed = parse_datetime(value.strip())
+            if parsed is None:
+                self.fail("invalid", format="YYYY-MM-DD")
+            if timezone.is_aware(parsed):
+                return timezone.localdate(parsed)
+            return parsed.date()
+        return super().to_internal_value(value)
+
+class ISODateTimeField(serializers.DateTimeField):
+    """
+    Data-hora das transações no formato que os clientes enviam e sempre
+    receberam (Date.toISOString(): "2024-10-05T10:00:00.000Z"): em UTC, com
+    milissegundos. Entradas com outro fuso são convertidas para o mesmo instante
+    em UTC, e uma data sem hora ("2024-10-05") é a meia-noite desse dia no fuso
+    do projeto.
+    """
+    def to_representation(self, value):
+        if not value:
+            return None
+        value = self.enforce_timezone(value).astimezone(datetime.timezone.utc)
+        return value.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que, quando o contexto traz os objetos já carregados
+    (context["related_objects"][nome do campo] = {pk: objeto}), resolve o id em
+    memória em vez de fazer uma consulta por item. Usado nas gravações em lote.
+    """
+    def to_internal_value(self, data):
+        loaded = self.context.get("related_objects", {}).get(self.field_name)
+        if loaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except Exception:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        obj = loaded.get(pk)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+def parse_field_tree(value):
+    """
+    Converte "id,category.icon,category.description" em
+    {"id": {}, "category": {"icon": {}, "description": {}}}. None se ausente.
+    """
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in filter(None, path.strip().split(".")):
+            node = node.setdefault(name, {})
+    return tree
+
+class DynamicFieldsMixin:
+    """
+    Suporte a ?fields= e ?expand= nas respostas.
+
+    - fields: campos de leitura a incluir (caminhos com ponto para relações
+      aninhadas: "id,value,category.icon"). Ausente = todos.
+    - expand: relações aninhadas a expandir. Quando informado, as relações não
+      listadas são devolvidas apenas como id, sem instanciar o serializer
+      aninhado nem carregar a relação. Ausente = tudo expandido, como antes.
 
-class PersonSerializer(serializers.ModelSerializer):
+    Vale só para leituras (GET/HEAD); campos somente-escrita nunca são filtrados.
+    """
+    def __init__(self, *args, field_spec=None, **kwargs):
+        self._field_spec = field_spec
+        super().__init__(*args, **kwargs)
+
+    def get_field_spec(self):
+        if self._field_spec is not None:
+            return self._field_spec
+        # Só o serializer raiz (ou o filho de um ListSerializer raiz) lê a query string
+        parent = getattr(self, "parent", None)
+        is_root = parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+        request = self.context.get("request")
+        # Em escritas todos os campos continuam disponíveis para validação
+        if not is_root or request is None or request.method not in ("GET", "HEAD"):
+            return None, None
+        params = request.query_params
+        return parse_field_tree(params.get("fields")), parse_field_tree(params.get("expand"))
+
+    def _wanted(self, name, fields):
+        return fields is None or name in fields
+
+    def wants_field(self, name):
+        """Para chaves acrescentadas por to_representation (depois de self.fields): se o ?fields= as inclui."""
+        return self._wanted(name, self.__dict__.get("_requested_fields"))
+
+    def _collapse(self, name, field):
+        if isinstance(field, serializers.ListSerializer):
+            return serializers.PrimaryKeyRelatedField(source=field.source, many=True, read_only=True)
+        return serializers.PrimaryKeyRelatedField(source=field.source, read_only=True)
+
+    def _narrow(self, name, field, fields, expand):
+        if expand is not None and name not in expand:
+            return self._collapse(name, field)
+        sub_fields = fields.get(name) or None if fields is not None else None
+        sub_expand = expand.get(name, {}) if expand is not None else None
+        if sub_fields is None and sub_expand is None:
+            return field
+        many = isinstance(field, serializers.ListSerializer)
+        child = field.child if many else field
+        if not isinstance(child, DynamicFieldsMixin):
+            return field
+        kwargs = dict(child._kwargs, field_spec=(sub_fields, sub_expand))
+        if many:
+            kwargs["many"] = True
+        return child.__class__(*child._args, **kwargs)
+
+    def get_fields(self):
+        fields, expand = self.get_field_spec()
+        self._requested_fields = fields
+        if fields is None and expand is None:
+            return super().get_fields()
+
+        declared = {}
+        for name, field in self._declared_fields.items():
+            if field.write_only:
+                declared[name] = field
+            elif not self._wanted(name, fields):
+                # Marcador barato, removido abaixo; sem ele o DRF tentaria criar o
+                # campo a partir do modelo (e falharia para campos que não são colunas)
+                declared[name] = serializers.ReadOnlyField()
+            elif isinstance(field, serializers.BaseSerializer):
+                declared[name] = self._narrow(name, field, fields, expand)
+            else:
+                declared[name] = field
+
+        # Restringe os campos declarados antes do deepcopy feito pelo DRF
+        self._declared_fields = declared
+        try:
+            result = super().get_fields()
+        finally:
+            del self._declared_fields
+
+        if fields is not None:
+            for name in list(result):
+                if not result[name].write_only and name not in fields:
+                    del result[name]
+        return result
+
+class OwnedRelatedFieldsMixin:
+    """
+    Restringe o queryset de todo campo de FK gravável, declarado ou gerado pelo
+    ModelSerializer, às linhas visíveis para o usuário da requisição (ver
+    base.OWNERS): ids de outros usuários falham como inexistentes. Sem a
+    requisição no contexto (uso interno) os querysets ficam como declarados.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None:
+            return fields
+        user_id = request.user.pk if request.user.is_authenticated else None
+        for field in fields.values():
+            field = getattr(field, "child_relation", field)
+            if isinstance(field, serializers.RelatedField) and field.queryset is not None:
+                field.queryset = owned_queryset(field.queryset, user_id)
+        return fields
+
+class DynamicModelSerializer(OwnedRelatedFieldsMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    pass
+
+class PersonSerializer(DynamicModelSerializer):
     class Meta:
         model = Person
         fields = "__all__"
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicModelSerializer):
     personId = serializers.UUIDField(source="person.id", read_only=True)
 
     class Meta:
@@ -40,27 +223,27 @@ class UserCreateSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class ColorSerializer(serializers.ModelSerializer):
+class ColorSerializer(DynamicModelSerializer):
     class Meta:
         model = Color
         fields = "__all__"
 
-class IconSerializer(serializers.ModelSerializer):
+class IconSerializer(DynamicModelSerializer):
     class Meta:
         model = Icon
         fields = "__all__"
 
-class BankSerializer(serializers.ModelSerializer):
+class BankSerializer(DynamicModelSerializer):
     class Meta:
         model = Bank
         fields = "__all__"
 
-class CurrencySerializer(serializers.ModelSerializer):
+class CurrencySerializer(DynamicModelSerializer):
     class Meta:
         model = Currency
         fields = "__all__"
 
-class BankAccountSerializer(serializers.ModelSerializer):
+class BankAccountSerializer(DynamicModelSerializer):
     colorId = serializers.PrimaryKeyRelatedField(
         source="color", queryset=Color.objects.all(), write_only=True
     )
@@ -117,17 +300,33 @@ class BankAccountSerializer(serializers.ModelSerializer):
             "color", "user", "bank", "currency"
         ).get(pk=instance.pk)
 
-class BankAccountLimitSerializer(serializers.ModelSerializer):
+class BankAccountLimitSerializer(DynamicModelSerializer):
     class Meta:
         model = BankAccountLimit
         fields = "__all__"
 
-class CreditCardFlagSerializer(serializers.ModelSerializer):
+class BankAccountBalanceSerializer(BankAccountSerializer):
+    """Conta com o saldo atual; usado pelo BankAccountViewSet (as contas aninhadas não o trazem)."""
+    currentBalance = serializers.IntegerField(read_only=True)
+
+    class Meta(BankAccountSerializer.Meta):
+        fields = BankAccountSerializer.Meta.fields + ["currentBalance"]
+
+class RunningBalanceSerializer(DynamicModelSerializer):
+    date = ISODateTimeField(read_only=True)
+    signedValue = serializers.IntegerField(read_only=True)
+    balance = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Transaction
+        fields = ["id", "date", "description", "value", "type", "signedValue", "balance"]
+
+class CreditCardFlagSerializer(DynamicModelSerializer):
     class Meta:
         model = CreditCardFlag
         fields = "__all__"
 
-class CreditCardSerializer(serializers.ModelSerializer):
+class CreditCardSerializer(DynamicModelSerializer):
     bankAccountId = serializers.PrimaryKeyRelatedField(
         source="bankAccount", queryset=BankAccount.objects.all(), write_only=True
     )
@@ -159,9 +358,21 @@ class CreditCardSerializer(serializers.ModelSerializer):
             "userId",
         ]
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Totais de todas as faturas da página com uma leitura de cache / uma consulta
+        items = list(data.all() if hasattr(data, "all") else data)
+        if "purchasesTotal" in self.child.fields:
+            invoices.attach(items)
+        return super().to_representation(items)
+
+class InvoiceSerializer(DynamicModelSerializer):
+    TOTAL_FIELDS = ["purchasesTotal", "returnsTotal", "paymentsTotal", "amountDue"]
+
     created = serializers.CharField(required=False, allow_blank=True)
     modified = serializers.CharField(required=False, allow_blank=True)
+    closingDate = ISODateField()
+    dueDate = ISODateField()
 
     userId = serializers.PrimaryKeyRelatedField(
         source="user", queryset=User.objects.all(), write_only=True
@@ -173,8 +384,14 @@ class InvoiceSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     creditCard = CreditCardSerializer(read_only=True)
 
+    purchasesTotal = serializers.IntegerField(source="totals.purchases", read_only=True)
+    returnsTotal = serializers.IntegerField(source="totals.returns", read_only=True)
+    paymentsTotal = serializers.IntegerField(source="totals.payments", read_only=True)
+    amountDue = serializers.IntegerField(source="totals.amountDue", read_only=True)
+
     class Meta:
         model = Invoice
+        list_serializer_class = InvoiceListSerializer
         fields = [
             "id",
             "created",
@@ -184,6 +401,10 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "dueDate",
             "paymentDate",
             "paymentAmount",
+            "purchasesTotal",
+            "returnsTotal",
+            "paymentsTotal",
+            "amountDue",
             "creditCardId",
             "userId",
             "creditCard",
@@ -206,7 +427,12 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
         return Invoice.objects.select_related("creditCard", "user").get(pk=instance.pk)
 
-class SubcategorySerializer(serializers.ModelSerializer):
+class TransactionInvoiceSerializer(InvoiceSerializer):
+    """Fatura aninhada na transação, sem os totais (que exigiriam consultas por linha)."""
+    class Meta(InvoiceSerializer.Meta):
+        fields = [name for name in InvoiceSerializer.Meta.fields if name not in InvoiceSerializer.TOTAL_FIELDS]
+
+class SubcategorySerializer(DynamicModelSerializer):
     categoryId = serializers.PrimaryKeyRelatedField(
         source="category", queryset=Category.objects.all(), write_only=True
     )
@@ -223,6 +449,9 @@ class SubcategorySerializer(serializers.ModelSerializer):
     color = ColorSerializer(read_only=True)
     icon = IconSerializer(read_only=True)
 
+    # Chave acrescentada por to_representation (ver core/fastpath.py)
+    fast_extra_fields = {"categoryId": "category_id"}
+
     class Meta:
         model = Subcategory
         fields = [
@@ -241,11 +470,12 @@ class SubcategorySerializer(serializers.ModelSerializer):
         Customiza a representação do objeto para incluir 'categoryId'.
         """
         representation = super().to_representation(instance)
-        representation['categoryId'] = instance.category.id
+        if self.wants_field('categoryId'):
+            representation['categoryId'] = instance.category_id
         
         return representation
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicModelSerializer):
     iconId = serializers.PrimaryKeyRelatedField(
         source="icon", queryset=Icon.objects.all(), write_only=True
     )
@@ -285,7 +515,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return Category.objects.select_related("color", "icon").prefetch_related("subcategories").get(pk=instance.pk)
 
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(DynamicModelSerializer):
     categoryId = serializers.PrimaryKeyRelatedField(
         source="category", queryset=Category.objects.all(), write_only=True
     )
@@ -322,7 +552,7 @@ class BudgetSerializer(serializers.ModelSerializer):
         return Budget.objects.select_related("category", "subcategory").get(pk=instance.pk)
 
 
-class PlanningSerializer(serializers.ModelSerializer):
+class PlanningSerializer(DynamicModelSerializer):
     userId = serializers.PrimaryKeyRelatedField(
         source="user", queryset=User.objects.all(), write_only=True
     )
@@ -377,19 +607,25 @@ class PlanningCategoryItemSerializer(serializers.Serializer):
     pending = serializers.IntegerField()
     totalSpent = serializers.IntegerField()
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(DynamicModelSerializer):
+    dueDate = ISODateField()
+
     class Meta:
         model = Loan
         fields = "__all__"
 
-class TransactionSerializer(serializers.ModelSerializer):
-    userId = serializers.PrimaryKeyRelatedField(
+class TransactionSerializer(DynamicModelSerializer):
+    date = ISODateTimeField(required=False, allow_null=True)
+    paymentDate = ISODateTimeField(required=False, allow_null=True)
+    originalDate = ISODateTimeField(required=False, allow_null=True)
+
+    userId = PreloadedPrimaryKeyRelatedField(
         source="user",
         queryset=User.objects.all(),
         write_only=True
     )
 
-    invoiceId = serializers.PrimaryKeyRelatedField(
+    invoiceId = PreloadedPrimaryKeyRelatedField(
         source="invoice",
         queryset=Invoice.objects.all(),
         write_only=True,
@@ -397,7 +633,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         allow_null=True
     )
 
-    bankAccountId = serializers.PrimaryKeyRelatedField(
+    bankAccountId = PreloadedPrimaryKeyRelatedField(
         source="bankAccount",
         queryset=BankAccount.objects.all(),
         write_only=True,
@@ -405,7 +641,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         allow_null=True
     )
 
-    categoryId = serializers.PrimaryKeyRelatedField(
+    categoryId = PreloadedPrimaryKeyRelatedField(
         source="category",
         queryset=Category.objects.all(),
         write_only=True,
@@ -413,7 +649,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         allow_null=True
     )
 
-    subcategoryId = serializers.PrimaryKeyRelatedField(
+    subcategoryId = PreloadedPrimaryKeyRelatedField(
         source="subcategory",
         queryset=Subcategory.objects.all(),
         write_only=True,
@@ -421,7 +657,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         allow_null=True
     )
 
-    loanId = serializers.PrimaryKeyRelatedField(
+    loanId = PreloadedPrimaryKeyRelatedField(
         source="loan",
         queryset=Loan.objects.all(),
         write_only=True,
@@ -432,7 +668,7 @@ class TransactionSerializer(serializers.ModelSerializer):
     bankAccount = BankAccountSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     subcategory = SubcategorySerializer(read_only=True)
-    invoice = InvoiceSerializer(read_only=True)
+    invoice = TransactionInvoiceSerializer(read_only=True)
 
     class Meta:
         model = Transaction
@@ -472,7 +708,38 @@ class TransactionSerializer(serializers.ModelSerializer):
             "invoice"
         ]
 
-class GoalSerializer(serializers.ModelSerializer):
+class TransactionSeriesSerializer(OwnedRelatedFieldsMixin, serializers.Serializer):
+    """
+    Pedido de parcelamento/recorrência: a transação modelo e a quantidade de
+    itens (count) ou a data do último item (until). Com creditCardId, cada
+    parcela é lançada na fatura correspondente do cartão.
+    """
+    MAX_ITEMS = 360
+
+    transaction = TransactionSerializer()
+    count = serializers.IntegerField(required=False, min_value=1, max_value=MAX_ITEMS)
+    until = ISODateField(required=False)
+    creditCardId = serializers.PrimaryKeyRelatedField(
+        source="creditCard",
+        queryset=CreditCard.objects.all(),
+        required=False,
+        allow_null=True
+    )
+
+    def validate(self, attrs):
+        if ("count" in attrs) == ("until" in attrs):
+            raise serializers.ValidationError("Informe count ou until.")
+        if "until" in attrs:
+            start = local_date(attrs["transaction"].get("date")) or timezone.localdate()
+            count = (attrs["until"].year - start.year) * 12 + attrs["until"].month - start.month + 1
+            if count < 1:
+                raise serializers.ValidationError({"until": ["Deve ser posterior à data da transação."]})
+            if count > self.MAX_ITEMS:
+                raise serializers.ValidationError({"until": [f"No máximo {self.MAX_ITEMS} itens por série."]})
+            attrs["count"] = count
+        return attrs
+
+class GoalSerializer(DynamicModelSerializer):
     bankAccountId = serializers.PrimaryKeyRelatedField(
         source="bankAccount", queryset=BankAccount.objects.all(), write_only=True
     )
@@ -490,6 +757,11 @@ class GoalSerializer(serializers.ModelSerializer):
     color = ColorSerializer(read_only=True)
     icon = IconSerializer(read_only=True)
 
+    accumulatedValue = serializers.IntegerField(source="progress.accumulatedValue", read_only=True)
+    progressPercent = serializers.FloatField(source="progress.progressPercent", read_only=True)
+    projectedCompletionDate = serializers.DateField(source="progress.projectedCompletionDate", read_only=True)
+    onTrack = serializers.BooleanField(source="progress.onTrack", read_only=True, allow_null=True)
+
     class Meta:
         model = Goal
         fields = [
@@ -503,6 +775,10 @@ class GoalSerializer(serializers.ModelSerializer):
             "image",
             "rememberDay",
             "initialValue",
+            "accumulatedValue",
+            "progressPercent",
+            "projectedCompletionDate",
+            "onTrack",
             "bankAccountId",
             "iconId",
             "colorId",
@@ -522,12 +798,12 @@ class GoalSerializer(serializers.ModelSerializer):
         instance.save()
         return Goal.objects.select_related("bankAccount", "color", "icon").get(pk=instance.pk)
 
-class GoalTransactionSerializer(serializers.ModelSerializer):
+class GoalTransactionSerializer(DynamicModelSerializer):
     class Meta:
         model = GoalTransaction
         fields = "__all__"
 
-class AlertSerializer(serializers.ModelSerializer):
+class AlertSerializer(DynamicModelSerializer):
     class Meta:
         model = Alert
         fields = "__all__"
@@ -580,7 +856,11 @@ class SocialLoginSerializer(serializers.Serializer):
     provider = serializers.ChoiceField(choices=["google", "apple"])
     id_token = serializers.CharField()
 
-class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+class RefreshTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Emissão de access/refresh com o RefreshToken de core/authentication.py (SIMPLE_JWT["TOKEN_OBTAIN_SERIALIZER"])."""
+    token_class = RefreshToken
+
+class MyTokenObtainPairSerializer(RefreshTokenObtainPairSerializer):
     """
     Serializer para retornar access/refresh + dados do usuário
     """
@@ -598,3 +878,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
             "personId": str(user.person.id) if user.person else None,
         })
         return data
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh com rotação usando a blacklist de core/authentication.py (SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"])."""
+    token_class = RefreshToken
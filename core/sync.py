@@ -0,0 +1,341 @@
+"""
+Sincronização incremental para clientes offline (GET /sync/?since=<cursor>).
+
+Toda gravação em um modelo sincronizado registra uma linha em ChangeLog (id
+crescente, dono, modelo, id do objeto e se foi exclusão):
+- save()/delete() dos modelos de SYNCED, pelos receivers abaixo, inclusive
+  exclusões em cascata;
+- gravações de transações (save, exclusão, lote, séries) por core/derived.py,
+  que também marca a conta e a fatura da transação, cujo saldo e totais mudam;
+- faturas criadas em lote para parcelamentos (core/installments.py).
+
+O mesmo registro versiona os ETags de list/retrieve (resource_version): por
+estar no banco, vale para todos os processos.
+
+A leitura filtra (user, id > since) pelo índice changelog_user_cursor_idx, então
+o custo depende só do que mudou desde o cursor. Linhas com user nulo são dos
+catálogos globais e valem para todos. Sem `since`, ou com um cursor anterior ao
+que já foi podado por `manage.py prune_change_log`, a resposta é a carga
+completa (full=true) e o cliente substitui a base local. A carga completa vem
+em páginas de até SYNC["MAX_CHANGES"] linhas: com hasMore, o cliente repete a
+requisição com ?snapshot=<continuação> até o fim e só então passa a usar o
+cursor, que é o do início da carga (o que mudar entre as páginas chega na
+sincronização incremental seguinte).
+
+O cursor devolvido fica atrás das linhas gravadas nos últimos
+SYNC["SETTLE_SECONDS"]: uma transação de banco que reservou um id menor e ainda
+não fez commit aparece na sincronização seguinte em vez de ser pulada. Essas
+linhas recentes podem vir de novo; o cliente aplica as mudanças por id, então
+repetições são inofensivas.
+"""
+import base64
+import datetime
+import json
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import balances, goals
+from .models import (
+    Bank, BankAccount, BankAccountLimit, Budget, Category, ChangeLog, Color, CreditCard,
+    CreditCardFlag, Currency, Goal, GoalTransaction, Icon, Invoice, Loan, Planning, Alert,
+    Subcategory, Transaction,
+)
+from .serializers import (
+    AlertSerializer, BankAccountBalanceSerializer, BankAccountLimitSerializer, BankSerializer,
+    BudgetSerializer, CategorySerializer, ColorSerializer, CreditCardFlagSerializer,
+    CreditCardSerializer, CurrencySerializer, GoalSerializer, GoalTransactionSerializer,
+    IconSerializer, InvoiceSerializer, LoanSerializer, PlanningSerializer, SubcategorySerializer,
+    TransactionSerializer,
+)
+from . import eager
+from .base import owner_q
+
+# owner: caminho ORM até o usuário dono (None nos catálogos sem usuário)
+# shared: owner nulo indica registro global, visível para todos
+# prepare: anotações que o serializer espera no queryset
+Synced = namedtuple("Synced", "key model serializer owner shared prepare", defaults=(None,))
+
+SYNCED = (
+    Synced("colors", Color, ColorSerializer, "user", True),
+    Synced("icons", Icon, IconSerializer, None, True),
+    Synced("banks", Bank, BankSerializer, None, True),
+    Synced("currencies", Currency, CurrencySerializer, None, True),
+    Synced("creditCardFlags", CreditCardFlag, CreditCardFlagSerializer, None, True),
+    Synced("categories", Category, CategorySerializer, "user", True),
+    Synced("subcategories", Subcategory, SubcategorySerializer, "user", True),
+    Synced("bankAccounts", BankAccount, BankAccountBalanceSerializer, "user", False, balances.annotate_current_balance),
+    Synced("bankAccountLimits", BankAccountLimit, BankAccountLimitSerializer, "bankAccount__user", False),
+    Synced("creditCards", CreditCard, CreditCardSerializer, "user", False),
+    Synced("invoices", Invoice, InvoiceSerializer, "user", False),
+    Synced("plannings", Planning, PlanningSerializer, "user", False),
+    Synced("budgets", Budget, BudgetSerializer, "planning__user", False),
+    Synced("loans", Loan, LoanSerializer, "user", False),
+    Synced("transactions", Transaction, TransactionSerializer, "user", False),
+    Synced("goals", Goal, GoalSerializer, "user", False, goals.annotate_progress),
+    Synced("goalTransactions", GoalTransaction, GoalTransactionSerializer, "goal__user", False),
+    Synced("alerts", Alert, AlertSerializer, "user", False),
+)
+
+_by_model = {entry.model._meta.model_name: entry for entry in SYNCED}
+_by_key = {entry.key: entry for entry in SYNCED}
+
+_pending = threading.local()
+
+def _config():
+    config = {"SETTLE_SECONDS": 5, "MAX_CHANGES": 5000}
+    config.update(getattr(settings, "SYNC", {}))
+    return config
+
+def _owner_id(instance, path):
+    parts = path.split("__")
+    target = instance
+    try:
+        for part in parts[:-1]:
+            target = getattr(target, part)
+    except ObjectDoesNotExist:
+        return None
+    return getattr(target, parts[-1] + "_id")
+
+def _flush(rows):
+    if not rows:
+        return
+    ChangeLog.objects.bulk_create(rows)
+
+def resource_version(models, user_id):
+    """
+    Versão do conteúdo de `models` visível para o usuário: o id do último
+    registro de mudança dele (ou global) nesses modelos. Sem registros, ou com
+    todos já podados, vale o id do mais antigo restante, que distingue o estado
+    após uma poda do estado inicial. Uma consulta.
+    """
+    keys = [_by_model[model._meta.model_name].key for model in models if model._meta.model_name in _by_model]
+    latest = (
+        ChangeLog.objects
+        .filter(Q(user=user_id) | Q(user__isnull=True), model__in=keys)
+        .order_by("-id")
+        .values("id")[:1]
+    )
+    row = ChangeLog.objects.order_by("id").annotate(latest=Subquery(latest)).values_list("latest", "id").first()
+    if row is None:
+        return "empty"
+    return str(row[0]) if row[0] is not None else f"none:{row[1]}"
+
+def record(model, entries, deleted=False):
+    """
+    Registra mudanças de `model`; `entries` são pares (id do objeto, id do dono).
+    Registros privados sem dono não são sincronizados.
+    """
+    entry = _by_model.get(model._meta.model_name)
+    if entry is None:
+        return
+    rows = [
+        ChangeLog(user_id=user_id, model=entry.key, objectId=object_id, deleted=deleted)
+        for object_id, user_id in entries
+        if user_id is not None or entry.shared
+    ]
+    pending = getattr(_pending, "rows", None)
+    if pending is not None:
+        pending.extend(rows)
+    else:
+        _flush(rows)
+
+def record_instances(instances, deleted=False):
+    instances = list(instances)
+    if not instances:
+        return
+    entry = _by_model.get(instances[0]._meta.model_name)
+    if entry is None:
+        return
+    record(entry.model, [
+        (instance.pk, _owner_id(instance, entry.owner) if entry.owner else None)
+        for instance in instances
+    ], deleted)
+
+def record_transaction_changes(changes):
+    """Registra as mudanças (old, new) de transações e a conta e a fatura de cada uma."""
+    transactions, deleted, accounts, invoices = [], [], set(), set()
+    for old, new in changes:
+        state = new or old
+        (transactions if new else deleted).append((state["id"], state["user_id"]))
+        for current in (old, new):
+            if current and current["bankAccount_id"]:
+                accounts.add((current["bankAccount_id"], current["user_id"]))
+            if current and current["invoice_id"]:
+                invoices.add((current["invoice_id"], current["user_id"]))
+    with batch():
+        record(Transaction, transactions)
+        record(Transaction, deleted, deleted=True)
+        record(BankAccount, sorted(accounts, key=str))
+        record(Invoice, sorted(invoices, key=str))
+
+@contextmanager
+def batch():
+    """Acumula os registros do bloco e os grava com um único bulk_create ao sair."""
+    if getattr(_pending, "rows", None) is not None:
+        yield
+        return
+
+    _pending.rows = []
+    try:
+        yield
+        rows = _pending.rows
+    finally:
+        _pending.rows = None
+    _flush(rows)
+
+def _saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_instances([instance])
+
+def _deleted(sender, instance, origin=None, **kwargs):
+    from . import derived
+
+    entry = _by_model[sender._meta.model_name]
+    if entry.owner and derived.user_deleted(_owner_id(instance, entry.owner), origin):
+        # O registro do usuário excluído junto já foi apagado
+        return
+    record_instances([instance], deleted=True)
+
+# Transações chegam por core/derived.py, junto com os demais dados derivados
+for _entry in SYNCED:
+    if _entry.model is not Transaction:
+        post_save.connect(_saved, sender=_entry.model, dispatch_uid=f"sync-save-{_entry.key}")
+        post_delete.connect(_deleted, sender=_entry.model, dispatch_uid=f"sync-delete-{_entry.key}")
+
+def _visible(entry, user_id):
+    if entry.owner is None:
+        return Q()
+    return owner_q(entry.owner, user_id, entry.shared)
+
+def _queryset(entry, user_id, context):
+    serializer = entry.serializer(context=context)
+    queryset = eager.apply(entry.model._default_manager.filter(_visible(entry, user_id)), *eager.plan(serializer, entry.model))
+    return entry.prepare(queryset) if entry.prepare else queryset
+
+def _serialize(entry, queryset, context):
+    return entry.serializer(queryset, many=True, context=context).data
+
+def settled_cursor(since=0):
+    """Maior id anterior à janela de acomodação (ver docstring do módulo)."""
+    settle = _config()["SETTLE_SECONDS"]
+    queryset = ChangeLog.objects.all()
+    if settle:
+        queryset = queryset.filter(created__lt=timezone.now() - datetime.timedelta(seconds=settle))
+    return max(queryset.order_by("-id").values_list("id", flat=True).first() or 0, since)
+
+def _pruned(since):
+    oldest = ChangeLog.objects.order_by("id").values_list("id", flat=True).first()
+    return oldest is not None and since < oldest - 1
+
+def encode_snapshot(position):
+    cursor, key, after = position
+    raw = json.dumps({"c": cursor, "m": key, "pk": str(after) if after is not None else None}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_snapshot(token):
+    """(cursor, chave do modelo, último pk) da continuação; ValueError se inválida."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(token.encode()))
+        entry = _by_key[position["m"]]
+        after = position["pk"]
+        return int(position["c"]), entry.key, entry.model._meta.pk.to_python(after) if after is not None else None
+    except Exception as exc:
+        raise ValueError(token) from exc
+
+def full_snapshot(user_id, context, position=None):
+    """
+    Página da carga completa: até MAX_CHANGES linhas, por modelo na ordem de
+    SYNCED e por pk. `position` vem de decode_snapshot; sem ela, a carga começa
+    com o cursor atual.
+    """
+    if position is None:
+        cursor, key, after = settled_cursor(), SYNCED[0].key, None
+    else:
+        cursor, key, after = position
+    remaining = _config()["MAX_CHANGES"]
+    start = next(index for index, entry in enumerate(SYNCED) if entry.key == key)
+    changes, following = {}, None
+    for entry in SYNCED[start:]:
+        if not remaining:
+            following = (cursor, entry.key, None)
+            break
+        queryset = _queryset(entry, user_id, context).order_by("pk")
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+            after = None
+        rows = list(queryset[:remaining + 1])
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            following = (cursor, entry.key, rows[-1].pk)
+        if rows:
+            changes[entry.key] = _serialize(entry, rows, context)
+        remaining -= len(rows)
+        if following:
+            break
+    return {
+        "cursor": cursor,
+        "full": True,
+        "hasMore": following is not None,
+        "snapshot": encode_snapshot(following) if following else None,
+        "changes": changes,
+        "deleted": {},
+    }
+
+def changes_since(user_id, since, context):
+    """
+    Linhas alteradas e tombstones (ids excluídos) visíveis para o usuário desde o
+    cursor `since`, agrupados pela chave do modelo, com o próximo cursor.
+    """
+    if not since or _pruned(since):
+        return full_snapshot(user_id, context)
+
+    cursor = settled_cursor(since)
+    limit = _config()["MAX_CHANGES"]
+    rows = list(
+        ChangeLog.objects
+        .filter(Q(user=user_id) | Q(user__isnull=True), id__gt=since)
+        .order_by("id")
+        .values_list("id", "model", "objectId", "deleted")[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+        cursor = max(min(cursor, rows[-1][0]), since)
+
+    # Vale o último registro de cada objeto
+    latest = {}
+    for _, key, object_id, deleted in rows:
+        latest.setdefault(key, {})[object_id] = deleted
+
+    changes, tombstones = {}, {}
+    for entry in SYNCED:
+        objects = latest.get(entry.key)
+        if not objects:
+            continue
+        gone = {pk for pk, deleted in objects.items() if deleted}
+        changed = [pk for pk, deleted in objects.items() if not deleted]
+        if changed:
+            queryset = list(_queryset(entry, user_id, context).filter(pk__in=changed))
+            # Excluído depois do registro, ou não pertence mais ao usuário
+            gone.update(set(changed) - {instance.pk for instance in queryset})
+            if queryset:
+                changes[entry.key] = _serialize(entry, queryset, context)
+        if gone:
+            tombstones[entry.key] = sorted(str(pk) for pk in gone)
+
+    return {"cursor": cursor, "full": False, "hasMore": has_more, "changes": changes, "deleted": tombstones}
+
+def prune(before):
+    """Apaga os registros anteriores a `before`, mantendo sempre o último (referência do cursor)."""
+    last = ChangeLog.objects.order_by("-id").values_list("id", flat=True).first()
+    if last is None:
+        return 0
+    deleted, _ = ChangeLog.objects.filter(created__lt=before, id__lt=last).delete()
+    return deleted
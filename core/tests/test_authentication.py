@@ -0,0 +1,191 @@
+"""Autenticação JWT sem consulta ao usuário por requisição e blacklist dos refresh tokens (core/authentication.py)."""
+import datetime
+import io
+import uuid
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import authentication
+from core.models import User
+
+from .utils import api_client, create_user
+
+URL = "/api/v1/alerts/"
+REFRESH_URL = "/api/v1/auth/jwt/refresh/"
+
+class StatelessJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get(URL, HTTP_AUTHORIZATION=f"Bearer {token}")
+        return authentication.StatelessJWTAuthentication().authenticate(request)
+
+    def request_queries(self, client):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get(URL).status_code, 200)
+        return len(queries)
+
+    def test_no_user_query(self):
+        token = AccessToken.for_user(self.user)
+        authentication.denylist()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user, self.user)
+            self.assertTrue(user.is_authenticated)
+        # O JWTAuthentication do simplejwt carrega o User em toda requisição
+        request = APIRequestFactory().get(URL, HTTP_AUTHORIZATION=f"Bearer {token}")
+        with self.assertNumQueries(1):
+            JWTAuthentication().authenticate(request)
+        # Outros atributos carregam o User uma única vez
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, self.user.username)
+            self.assertEqual(user.email, self.user.email)
+
+    def test_request_costs_the_same_as_force_authenticate(self):
+        client = api_client(self.user, token=True)
+        client.get(URL)
+        self.assertEqual(self.request_queries(client), self.request_queries(api_client(self.user)))
+
+    def test_revoked_token(self):
+        client = api_client(self.user, token=True)
+        self.assertEqual(client.get(URL).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            authentication.revoke_tokens(self.user)
+        self.assertEqual(client.get(URL).status_code, 401)
+
+    def test_deactivated_user(self):
+        client = api_client(self.user, token=True)
+        self.assertEqual(client.get(URL).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNotNone(User.objects.get(pk=self.user.pk).tokensRevokedAt)
+        self.assertEqual(client.get(URL).status_code, 401)
+
+    def test_deleted_user(self):
+        user = create_user("removed")
+        authenticated, _ = self.authenticate(AccessToken.for_user(user))
+        user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            authenticated.email
+
+SHARED_REFRESH = {"CACHE": "default", "PRUNE_INTERVAL": 300, "PRUNE_BATCH_SIZE": 1000}
+
+class RefreshTokenBlacklistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def setUp(self):
+        caches["default"].clear()
+        authentication.denylist()
+
+    def check(self, token, queries):
+        with self.assertNumQueries(queries):
+            authentication.RefreshToken(str(token))
+
+    def check_blacklisted(self, token, queries):
+        with self.assertNumQueries(queries), self.assertRaises(TokenError):
+            authentication.RefreshToken(str(token))
+
+    def test_without_shared_cache(self):
+        token = authentication.RefreshToken.for_user(self.user)
+        # Sem cache compartilhado um token fora da blacklist sempre consulta o banco
+        self.check(token, 1)
+        self.check(token, 1)
+        token.blacklist()
+        self.check_blacklisted(token, 0)
+        caches["default"].clear()
+        authentication.denylist()
+        self.check_blacklisted(token, 1)
+        self.check_blacklisted(token, 0)
+
+    @override_settings(REFRESH_TOKENS=SHARED_REFRESH)
+    def test_shared_cache_skips_the_query(self):
+        token = authentication.RefreshToken.for_user(self.user)
+        self.check(token, 0)
+        # Estado fora do cache: uma consulta, depois guardado de novo
+        caches["default"].delete(authentication.BLACKLISTED_KEY.format(jti=token["jti"]))
+        self.check(token, 1)
+        self.check(token, 0)
+
+        # Blacklist feita fora do RefreshToken (admin) também chega ao cache
+        outstanding = OutstandingToken.objects.get(jti=token["jti"])
+        BlacklistedToken.objects.create(token=outstanding)
+        self.check_blacklisted(token, 0)
+
+    @override_settings(REFRESH_TOKENS=SHARED_REFRESH)
+    def test_rotation(self):
+        token = authentication.RefreshToken.for_user(self.user)
+        client = api_client()
+        response = client.post(REFRESH_URL, {"refresh": str(token)}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        rotated = response.json()["refresh"]
+
+        self.assertEqual(client.post(REFRESH_URL, {"refresh": str(token)}, format="json").status_code, 401)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.post(REFRESH_URL, {"refresh": rotated}, format="json").status_code, 200)
+        # Só a gravação da blacklist do token rotacionado; nenhuma busca por jti na blacklist
+        checks = [query["sql"] for query in queries if "blacklistedtoken" in query["sql"] and "JOIN" in query["sql"]]
+        self.assertEqual(checks, [])
+
+class PruneTokensTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def outstanding(self, count, expires_at):
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(user=self.user, jti=uuid.uuid4().hex, token="x", expires_at=expires_at)
+            for _ in range(count)
+        )
+        BlacklistedToken.objects.bulk_create(BlacklistedToken(token=token) for token in tokens[::2])
+
+    def test_batches(self):
+        now = timezone.now()
+        self.outstanding(5, now - datetime.timedelta(days=1))
+        self.outstanding(2, now + datetime.timedelta(days=1))
+
+        self.assertEqual(authentication.prune_expired_tokens(batch_size=2, max_batches=1), 2)
+        self.assertEqual(OutstandingToken.objects.count(), 5)
+        self.assertEqual(authentication.prune_expired_tokens(batch_size=2), 3)
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lte=now).exists())
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+    def test_command(self):
+        self.outstanding(3, timezone.now() - datetime.timedelta(days=1))
+        out = io.StringIO()
+        call_command("prune_tokens", "--batch-size", "2", stdout=out)
+        self.assertIn("Tokens apagados: 3", out.getvalue())
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_issuing_prunes_once_per_interval(self):
+        self.outstanding(3, timezone.now() - datetime.timedelta(days=1))
+        with override_settings(REFRESH_TOKENS={"PRUNE_INTERVAL": 300, "PRUNE_BATCH_SIZE": 2}):
+            with self.captureOnCommitCallbacks(execute=True):
+                authentication.RefreshToken.for_user(self.user)
+            self.assertEqual(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).count(), 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                authentication.RefreshToken.for_user(self.user)
+            self.assertEqual(OutstandingToken.objects.filter(expires_at__lte=timezone.now()).count(), 1)
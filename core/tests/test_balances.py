@@ -0,0 +1,41 @@
+"""Checkpoints de saldo mantidos pelas gravações de transações."""
+import datetime
+
+from django.test import TestCase
+
+from core.models import BalanceCheckpoint, ChangeLog, Transaction, TransactionRollup, User
+
+from .utils import create_account, create_catalog, create_category, create_transaction, create_user
+
+class CascadeDeleteTests(TestCase):
+    def setUp(self):
+        catalog = create_catalog()
+        self.user = create_user()
+        self.account = create_account(self.user, catalog)
+        self.other = create_account(self.user, catalog, name="Outra")
+        category = create_category(self.user, catalog)
+        create_transaction(self.user, bankAccount=self.account, category=category, date=datetime.date(2024, 9, 10), type=2)
+        create_transaction(self.user, bankAccount=self.account, category=category)
+        create_transaction(self.user, bankAccount=self.other, category=category)
+        # Mês sem checkpoint próprio: a exclusão da transação teria de criá-lo
+        BalanceCheckpoint.objects.filter(bankAccount=self.account, month=10).delete()
+
+    def test_account_delete_cascades_to_transactions(self):
+        account_id = self.account.pk
+        self.account.delete()
+        self.assertFalse(Transaction.objects.filter(bankAccount_id=account_id).exists())
+        self.assertFalse(BalanceCheckpoint.objects.filter(bankAccount_id=account_id).exists())
+        self.assertEqual(BalanceCheckpoint.objects.get(bankAccount=self.other).closing, -1000)
+        # O rollup do usuário perde as transações da conta
+        self.assertEqual(
+            list(TransactionRollup.objects.values_list("month", "type", "total", "count")), [(10, 3, 1000, 1)],
+        )
+        self.assertTrue(ChangeLog.objects.filter(model="transactions", deleted=True).exists())
+
+    def test_user_delete_cascades_to_accounts(self):
+        user_id = self.user.pk
+        self.user.delete()
+        self.assertFalse(User.objects.filter(pk=user_id).exists())
+        self.assertFalse(BalanceCheckpoint.objects.exists())
+        self.assertFalse(TransactionRollup.objects.exists())
+        self.assertFalse(ChangeLog.objects.filter(user_id=user_id).exists())
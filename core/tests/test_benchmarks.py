@@ -0,0 +1,55 @@
+"""Benchmark dos endpoints (core/benchmarks.py): limites e medição numa base pequena."""
+import datetime
+
+from django.test import TestCase
+
+from core import benchmarks
+
+def result(queries=2, p50=10.0, memory=100, status=200):
+    return {"status": status, "queries": queries, "p50Ms": p50, "memoryKb": memory}
+
+class BudgetTests(TestCase):
+    budgets = {"dataset": {"users": 5}, "endpoints": {"alerts": {"queries": 2, "p50Ms": {"sqlite": 20}, "memoryKb": 200}}}
+
+    def test_within_budget(self):
+        self.assertEqual(benchmarks.check({"alerts": result()}, self.budgets), [])
+        self.assertEqual(benchmarks.latency_warnings({"alerts": result()}, self.budgets, "sqlite"), [])
+        # Sem limite de latência para o banco, nada a avisar
+        self.assertEqual(benchmarks.latency_warnings({"alerts": result(p50=500)}, self.budgets, "postgresql"), [])
+
+    def test_regressions(self):
+        results = {"alerts": result(queries=3, p50=21, memory=201, status=500), "banks": result()}
+        failures = benchmarks.check(results, self.budgets)
+        self.assertEqual(len(failures), 4)
+        self.assertTrue(any(failure.startswith("banks: sem limites") for failure in failures))
+        # Latência não é regressão, só aviso
+        self.assertFalse(any("p50" in failure for failure in failures))
+        self.assertEqual(
+            benchmarks.latency_warnings(results, self.budgets, "sqlite"), ["alerts: p50 21 ms (limite 20 ms)"],
+        )
+
+    def test_updated_budgets(self):
+        updated = benchmarks.updated_budgets(
+            {"alerts": result(queries=1, p50=1.2, memory=50), "banks": result(p50=30)}, self.budgets, "postgresql",
+        )
+        self.assertEqual(updated["dataset"], self.budgets["dataset"])
+        self.assertEqual(updated["endpoints"]["alerts"], {
+            "queries": 1, "p50Ms": {"sqlite": 20, "postgresql": 7}, "memoryKb": 100,
+        })
+        self.assertEqual(updated["endpoints"]["banks"]["p50Ms"], {"postgresql": 60})
+        self.assertEqual(list(updated["endpoints"]), ["alerts", "banks"])
+
+class MeasureTests(TestCase):
+    def test_checked_in_query_budgets(self):
+        budgets = benchmarks.load_budgets()
+        today = datetime.date.today()
+        names = [name for name, _, _ in benchmarks.endpoints(today.year, today.month)]
+        self.assertEqual(sorted(names), sorted(budgets["endpoints"]))
+
+        user = benchmarks.seed(users=1, years=1, per_month=5)[0]
+        results = benchmarks.measure(user, repeat=1, warmup=1)
+        # Latência e memória dependem da máquina e do tamanho da base; as consultas não
+        queries_only = {
+            "endpoints": {name: {"queries": budget["queries"]} for name, budget in budgets["endpoints"].items()},
+        }
+        self.assertEqual(benchmarks.check(results, queries_only), [])
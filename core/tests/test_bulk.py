@@ -0,0 +1,77 @@
+"""POST /transactions/bulk/: lotes restritos às linhas do usuário."""
+from django.test import TestCase
+
+from core.models import Transaction
+
+from .utils import api_client, create_account, create_catalog, create_category, create_transaction, create_user
+
+URL = "/api/v1/transactions/bulk/"
+
+class BulkScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.other = create_user("other")
+        cls.account = create_account(cls.user, catalog)
+        cls.category = create_category(cls.user, catalog)
+        cls.other_account = create_account(cls.other, catalog)
+        cls.other_category = create_category(cls.other, catalog)
+        cls.transaction = create_transaction(cls.user, bankAccount=cls.account)
+        cls.other_transaction = create_transaction(cls.other, bankAccount=cls.other_account)
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def item(self, **fields):
+        return {"userId": str(self.user.pk), "value": 500, "type": 3, "isTransfer": 0, "isCreditCardTransaction": 0, **fields}
+
+    def test_own_rows(self):
+        response = self.client.post(URL, {
+            "create": [self.item(bankAccountId=str(self.account.pk), categoryId=str(self.category.pk))],
+            "update": [{"id": str(self.transaction.pk), "value": 2000}],
+        }, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.value, 2000)
+
+    def test_other_users_transactions_are_not_found(self):
+        response = self.client.post(URL, {
+            "update": [{"id": str(self.other_transaction.pk), "value": 1}],
+            "delete": [str(self.other_transaction.pk)],
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["update"], [{"id": ["Transação não encontrada."]}])
+        self.assertEqual(response.json()["delete"], [{"id": ["Transação não encontrada."]}])
+        self.other_transaction.refresh_from_db()
+        self.assertEqual(self.other_transaction.value, 1000)
+
+    def test_other_users_related_ids_are_rejected(self):
+        response = self.client.post(URL, {
+            "create": [self.item(
+                userId=str(self.other.pk),
+                bankAccountId=str(self.other_account.pk),
+                categoryId=str(self.other_category.pk),
+            )],
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()["create"][0]), {"userId", "bankAccountId", "categoryId"})
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_repeated_ids_are_rejected(self):
+        second = create_transaction(self.user, bankAccount=self.account)
+        pk = str(self.transaction.pk)
+        response = self.client.post(URL, {
+            "update": [{"id": pk, "value": 2000}, {"id": str(second.pk), "value": 3000}, {"id": pk, "value": 4000}],
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["update"], [{"id": ["Id duplicado no lote."]}, {}, {"id": ["Id duplicado no lote."]}])
+
+        response = self.client.post(URL, {"update": [{"id": pk, "value": 2000}], "delete": [pk]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["update"], [{"id": ["Id duplicado no lote."]}])
+        self.assertEqual(response.json()["delete"], [{"id": ["Id duplicado no lote."]}])
+
+        self.transaction.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((self.transaction.value, second.value), (1000, 1000))
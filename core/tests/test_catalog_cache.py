@@ -0,0 +1,87 @@
+"""Cache versionado dos catálogos (CatalogCacheMixin em core/cache.py)."""
+from django.core.cache import caches
+from django.test import TestCase
+
+from core.models import Bank, Color
+
+from .utils import api_client, create_catalog, create_user
+
+BANKS = "/api/v1/banks/"
+COLORS = "/api/v1/colors/"
+
+class CatalogCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        cls.other = create_user("other")
+
+    def setUp(self):
+        caches["default"].clear()
+        self.api = api_client(self.user)
+
+    def ids(self, response):
+        rows = response.json()
+        return {row["id"] for row in (rows["results"] if isinstance(rows, dict) else rows)}
+
+class CatalogETagTests(CatalogCacheTestCase):
+    def test_not_modified(self):
+        response = self.api.get(BANKS)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        # Servido do cache: nenhuma consulta, nem para o 304
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api.get(BANKS, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.api.get(BANKS, HTTP_IF_NONE_MATCH=f"W/{etag}").status_code, 304)
+            cached = self.api.get(BANKS)
+        self.assertEqual((cached.content, cached["ETag"]), (response.content, etag))
+
+        retrieve = f"{BANKS}{self.catalog['bank'].pk}/"
+        etag = self.api.get(retrieve)["ETag"]
+        self.assertEqual(self.api.get(retrieve, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_write_bumps_the_version(self):
+        etag = self.api.get(BANKS)["ETag"]
+        bank = Bank.objects.create(name="Novo banco")
+        response = self.api.get(BANKS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(str(bank.pk), self.ids(response))
+
+        etag = response["ETag"]
+        bank.delete()
+        response = self.api.get(BANKS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(str(bank.pk), self.ids(response))
+
+class PerUserCatalogTests(CatalogCacheTestCase):
+    def create_color(self, client, user):
+        response = client.post(COLORS, {"description": "Minha cor", "hexadecimal": "#123456", "user": str(user.pk)})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["id"]
+
+    def test_own_write_invalidates(self):
+        etag = self.api.get(COLORS)["ETag"]
+        color_id = self.create_color(self.api, self.user)
+        response = self.api.get(COLORS, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(color_id, self.ids(response))
+
+    def test_other_users_write_neither_invalidates_nor_leaks(self):
+        response = self.api.get(COLORS)
+        etag = response["ETag"]
+        other = api_client(self.other)
+        other_color = self.create_color(other, self.other)
+        self.assertIn(other_color, self.ids(other.get(COLORS)))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.api.get(COLORS, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotIn(other_color, self.ids(self.api.get(COLORS)))
+
+    def test_shared_record_write_invalidates_everyone(self):
+        etags = {client: client.get(COLORS)["ETag"] for client in (self.api, api_client(self.other))}
+        color = Color.objects.create(description="Padrão", hexadecimal="#000000")
+        for client, etag in etags.items():
+            response = client.get(COLORS, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(str(color.pk), self.ids(response))
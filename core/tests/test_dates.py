@@ -0,0 +1,107 @@
+"""Datas tipadas (0002-0004): conversão do texto e formato na API."""
+import datetime
+import importlib
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from core.models import Transaction
+from core.serializers import ISODateField, ISODateTimeField
+
+from .utils import api_client, create_user
+
+copy_text_dates = importlib.import_module("core.migrations.0003_copy_text_dates")
+
+UTC = datetime.timezone.utc
+
+class TextDateMigrationTests(TransactionTestCase):
+    before = [("core", "0002_typed_date_fields")]
+    after = [("core", "0004_swap_typed_date_fields")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_text_dates_keep_the_instant(self):
+        apps = self.migrate(self.before)
+        person = apps.get_model("core", "Person").objects.create(fullName="Pessoa")
+        user = apps.get_model("core", "User").objects.create(username="migracao", person=person)
+        Text = apps.get_model("core", "Transaction")
+        values = {
+            "2024-10-05T10:00:00.000Z": datetime.datetime(2024, 10, 5, 10, tzinfo=UTC),
+            "2024-10-05T01:00:00-03:00": datetime.datetime(2024, 10, 5, 4, tzinfo=UTC),
+            "2024-10-05T23:30:00-03:00": datetime.datetime(2024, 10, 6, 2, 30, tzinfo=UTC),
+            "2024-10-05": datetime.datetime(2024, 10, 5, tzinfo=UTC),
+            "": None,
+        }
+        ids = {
+            text: Text.objects.create(
+                user=user, created="x", modified="x", value=1, isTransfer=0, isCreditCardTransaction=0, type=3,
+                date=text, paymentDate=text, originalDate=text,
+            ).pk
+            for text in values
+        }
+
+        self.migrate(self.after)
+        for text, expected in values.items():
+            with self.subTest(text):
+                row = Transaction.objects.filter(pk=ids[text]).values("date", "paymentDate", "originalDate").get()
+                self.assertEqual(row, dict.fromkeys(row, expected))
+
+class ParseIsoDateTests(TestCase):
+    def test_calendar_day_of_the_instant(self):
+        # Faturas e empréstimos: o dia do instante no fuso do projeto (UTC), não o do texto
+        for text, expected in (
+            ("2024-10-05", datetime.date(2024, 10, 5)),
+            ("2024-10-05T10:00:00.000Z", datetime.date(2024, 10, 5)),
+            ("2024-10-05T01:00:00-03:00", datetime.date(2024, 10, 5)),
+            ("2024-10-05T23:30:00-03:00", datetime.date(2024, 10, 6)),
+            ("2024-10-05T01:00:00+03:00", datetime.date(2024, 10, 4)),
+            (" ", None),
+        ):
+            with self.subTest(text):
+                self.assertEqual(copy_text_dates.parse_iso_date(text), expected)
+                self.assertEqual(ISODateField().run_validation(text) if text.strip() else None, expected)
+
+        with self.assertRaises(ValueError):
+            copy_text_dates.parse_iso_date("05/10/2024")
+
+    def test_backward_format(self):
+        value = datetime.datetime(2024, 10, 5, 10, 0, 0, 123000, tzinfo=UTC)
+        self.assertEqual(copy_text_dates.format_iso_datetime(value), "2024-10-05T10:00:00.123Z")
+
+class TransactionDateFormatTests(TestCase):
+    def test_round_trip(self):
+        field = ISODateTimeField()
+        for text, expected in (
+            ("2024-10-05T10:00:00.000Z", "2024-10-05T10:00:00.000Z"),
+            ("2024-10-05T10:00:00.123Z", "2024-10-05T10:00:00.123Z"),
+            ("2024-10-05T01:00:00-03:00", "2024-10-05T04:00:00.000Z"),
+            ("2024-10-05", "2024-10-05T00:00:00.000Z"),
+        ):
+            with self.subTest(text):
+                self.assertEqual(field.to_representation(field.run_validation(text)), expected)
+
+    def test_api(self):
+        user = create_user()
+        client = api_client(user)
+        response = client.post("/api/v1/transactions/", {
+            "userId": str(user.pk), "date": "2024-10-05T01:00:00-03:00", "paymentDate": "2024-10-05T10:00:00.000Z",
+            "value": 1000, "isTransfer": 0, "isCreditCardTransaction": 0, "type": 3, "paid": 1,
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(
+            Transaction.objects.values_list("date", flat=True).get(),
+            datetime.datetime(2024, 10, 5, 4, tzinfo=UTC),
+        )
+        row = client.get(f"/api/v1/transactions/{response.json()['id']}/").json()
+        self.assertEqual((row["date"], row["paymentDate"]), ("2024-10-05T04:00:00.000Z", "2024-10-05T10:00:00.000Z"))
+        # O mês é o do instante em UTC
+        listed = client.get("/api/v1/transactions/", {"date__year": 2024, "date__month": 10}).json()
+        self.assertEqual([row["id"] for row in listed["results"]], [response.json()["id"]])
@@ -0,0 +1,73 @@
+"""?fields= e ?expand= nas listagens (DynamicFieldsMixin em core/serializers.py)."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .utils import (
+    api_client, create_account, create_catalog, create_category, create_subcategory, create_transaction, create_user,
+)
+
+class DynamicFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, cls.catalog)
+        cls.category = create_category(cls.user, cls.catalog)
+        create_subcategory(cls.category, description="Feira")
+
+    def setUp(self):
+        self.api = api_client(self.user)
+
+    def categories(self, **params):
+        response = self.api.get("/api/v1/categories/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        rows = response.json()
+        return rows["results"] if isinstance(rows, dict) else rows
+
+    def test_fields_trim_the_output(self):
+        [row] = self.categories(fields="id,description")
+        self.assertEqual(row, {"id": str(self.category.pk), "description": "Mercado"})
+
+        [row] = self.categories(fields="id,icon.name,subcategories.description")
+        self.assertEqual(set(row), {"id", "icon", "subcategories"})
+        self.assertEqual(row["icon"], {"name": self.catalog["icon"].name})
+        self.assertEqual(row["subcategories"], [{"description": "Feira"}])
+
+    def test_expand_nests_only_the_listed_relations(self):
+        [full] = self.categories()
+        [row] = self.categories(expand="icon")
+        self.assertEqual(row["icon"], full["icon"])
+        self.assertEqual(row["color"], str(self.catalog["color"].pk))
+        self.assertEqual(row["subcategories"], [subcategory["id"] for subcategory in full["subcategories"]])
+        self.assertEqual(set(row), set(full))
+
+    def test_unknown_names_are_ignored(self):
+        [row] = self.categories(fields="id,nope")
+        self.assertEqual(row, {"id": str(self.category.pk)})
+        # Relação pedida só com subcampos desconhecidos: objeto vazio
+        [row] = self.categories(fields="id,icon.nope")
+        self.assertEqual(row, {"id": str(self.category.pk), "icon": {}})
+        [full] = self.categories()
+        [row] = self.categories(expand="nope")
+        self.assertEqual(row["icon"], str(self.catalog["icon"].pk))
+        self.assertEqual(set(row), set(full))
+
+    def test_expand_keeps_queries_constant(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.api.get("/api/v1/transactions/", {"expand": "category.icon,bankAccount.currency"})
+            self.assertEqual(response.status_code, 200)
+            row = response.json()["results"][0]
+            self.assertEqual(row["category"]["icon"]["id"], str(self.catalog["icon"].pk))
+            self.assertEqual(row["bankAccount"]["currency"]["id"], str(self.catalog["currency"].pk))
+            return len(queries)
+
+        create_transaction(self.user, bankAccount=self.account, category=self.category)
+        queries = list_queries()
+        for _ in range(5):
+            create_transaction(
+                self.user, bankAccount=create_account(self.user, self.catalog),
+                category=create_category(self.user, self.catalog),
+            )
+        self.assertEqual(list_queries(), queries)
@@ -0,0 +1,41 @@
+"""ETags de list/retrieve derivados do registro de mudanças."""
+from django.core.cache import caches
+from django.test import TestCase
+
+from .utils import api_client, create_account, create_catalog, create_user
+
+URL = "/api/v1/bank-accounts/"
+
+class ResourceETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        cls.other = create_user("other")
+        cls.account = create_account(cls.user, cls.catalog)
+
+    def setUp(self):
+        self.client = api_client(self.user)
+        self.etag = self.client.get(URL)["ETag"]
+
+    def get(self):
+        return self.client.get(URL, HTTP_IF_NONE_MATCH=self.etag)
+
+    def test_not_modified(self):
+        self.assertEqual(self.get().status_code, 304)
+
+    def test_independent_of_the_process_cache(self):
+        # Outro worker, com o cache local vazio, chega ao mesmo ETag
+        caches["default"].clear()
+        self.assertEqual(self.get().status_code, 304)
+
+    def test_own_write_changes_etag(self):
+        self.account.name = "Renomeada"
+        self.account.save()
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], self.etag)
+
+    def test_other_users_write_keeps_etag(self):
+        create_account(self.other, self.catalog)
+        self.assertEqual(self.get().status_code, 304)
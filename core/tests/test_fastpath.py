@@ -0,0 +1,58 @@
+"""Serializer compilado (core/fastpath.py): mesma saída do serializer do DRF."""
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from rest_framework import serializers
+
+from core.fastpath import CompiledSerializer, compile_serializer
+from core.models import Transaction
+from core.renderers import FastJSONRenderer
+from core.serializers import TransactionSerializer
+
+from .utils import (
+    create_account, create_card, create_catalog, create_category, create_invoice, create_subcategory,
+    create_transaction, create_user,
+)
+
+class CompiledSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        account = create_account(cls.user, catalog)
+        category = create_category(cls.user, catalog)
+        create_subcategory(category, description="Feira")
+        subcategory = create_subcategory(category, description="Açougue")
+        invoice = create_invoice(create_card(cls.user, account, catalog))
+        create_transaction(
+            cls.user, bankAccount=account, category=category, subcategory=subcategory, invoice=invoice,
+            description="Compra", observation="Parcela", invoiceNumber=1, originalDate=datetime.date(2024, 10, 1),
+        )
+        # Relações nulas e sem data
+        create_transaction(cls.user, date=None, value=-250, paid=0)
+
+    def test_output_matches_drf(self):
+        queryset = Transaction.objects.order_by("value")
+        expected = TransactionSerializer(queryset, many=True).data
+        compiled = compile_serializer(TransactionSerializer)
+
+        for objects in (queryset, list(queryset)):
+            with self.subTest(type(objects).__name__):
+                result = compiled.serialize(objects)
+                self.assertEqual(result, expected)
+                self.assertEqual([list(row) for row in result], [list(row) for row in expected])
+                renderer = FastJSONRenderer()
+                self.assertEqual(renderer.render(result), renderer.render(expected))
+
+    def test_to_representation_override_requires_extra_fields(self):
+        class OverridingSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = Transaction
+                fields = ["id", "value"]
+
+            def to_representation(self, instance):
+                return super().to_representation(instance)
+
+        with self.assertRaises(ImproperlyConfigured):
+            CompiledSerializer(OverridingSerializer(), Transaction)
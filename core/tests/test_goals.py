@@ -0,0 +1,51 @@
+"""Progresso das metas (core/goals.py) e a listagem anotada."""
+import datetime
+
+from django.test import TestCase
+
+from core import goals
+from core.models import GoalTransaction
+
+from .utils import api_client, create_account, create_catalog, create_goal, create_transaction, create_user
+
+class ProgressTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, catalog)
+
+    def contribute(self, goal, value, date):
+        transaction = create_transaction(self.user, bankAccount=self.account, value=value, date=date, type=2)
+        GoalTransaction.objects.create(goal=goal, transaction=transaction)
+
+    def test_projection(self):
+        goal = create_goal(self.user, self.account, aimValue=3000, completionDate="2999-01-01")
+        self.contribute(goal, 1000, datetime.date(2024, 1, 1))
+        result = goals.progress(goal)
+        self.assertEqual(result["accumulatedValue"], 1000)
+        self.assertGreater(result["projectedCompletionDate"], datetime.date(2024, 1, 1))
+        self.assertTrue(result["onTrack"])
+
+    def test_tiny_pace_does_not_overflow(self):
+        goal = create_goal(self.user, self.account, aimValue=2_000_000_000, completionDate="2030-01-01")
+        self.contribute(goal, 1, datetime.date(2000, 1, 1))
+        result = goals.progress(goal)
+        self.assertIsNone(result["projectedCompletionDate"])
+        self.assertFalse(result["onTrack"])
+
+    def test_list_queries_do_not_grow_with_goals(self):
+        client = api_client(self.user)
+
+        def list_queries():
+            # Versão do ETag e as metas com os aportes somados
+            with self.assertNumQueries(2):
+                response = client.get("/api/v1/goals/")
+            self.assertEqual(response.status_code, 200)
+            return response.json()
+
+        for index in range(3):
+            goal = create_goal(self.user, self.account, description=f"Meta {index}")
+            self.contribute(goal, 1000 * (index + 1), datetime.date(2024, 1, 1))
+            rows = list_queries()
+        self.assertEqual(sorted(row["accumulatedValue"] for row in rows), [1000, 2000, 3000])
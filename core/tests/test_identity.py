@@ -0,0 +1,61 @@
+"""Validação dos ID tokens do login social (core/identity.py)."""
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import identity
+
+from .utils import api_client, create_user
+
+KID = "test-key"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+JWKS_URL = "https://keys.example.com/google"
+
+def social_auth(audiences):
+    return {"PROVIDERS": {"google": {"JWKS_URL": JWKS_URL, "AUDIENCES": audiences}}}
+
+def id_token(**claims):
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com", "sub": "1", "iat": now, "exp": now + 300,
+        "email": "user@example.com", "email_verified": True, **claims,
+    }
+    return jwt.encode({key: value for key, value in claims.items() if value is not None}, PRIVATE_KEY, "RS256", headers={"kid": KID})
+
+class IdentityTestMixin:
+    def setUp(self):
+        # Chaves já em memória: nenhuma ida à rede
+        keys = identity.key_set("google")
+        keys.keys = {KID: jwt.PyJWK.from_dict({**jwt.algorithms.RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key(), as_dict=True), "kid": KID})}
+        keys.expires = keys.last_fetch = time.monotonic() + 3600
+
+    def tearDown(self):
+        identity._key_sets.pop(JWKS_URL, None)
+
+@override_settings(SOCIAL_AUTH=social_auth(["client-id"]))
+class AudienceTests(IdentityTestMixin, SimpleTestCase):
+    def test_configured_audience(self):
+        self.assertEqual(identity.verify("google", id_token(aud="client-id"))["email"], "user@example.com")
+
+    def test_other_audience(self):
+        self.assertIsNone(identity.verify("google", id_token(aud="other-client")))
+
+    def test_missing_audience(self):
+        self.assertIsNone(identity.verify("google", id_token(aud=None)))
+
+@override_settings(SOCIAL_AUTH=social_auth([]))
+class UnconfiguredProviderTests(IdentityTestMixin, TestCase):
+    def test_verify_fails_closed(self):
+        with self.assertLogs("core.identity", "ERROR"), self.assertRaises(ImproperlyConfigured):
+            identity.verify("google", id_token(aud="any-client"))
+
+    def test_login_is_rejected(self):
+        create_user()
+        with self.assertLogs("core.identity", "ERROR"):
+            response = api_client().post(
+                "/api/v1/auth/social/", {"provider": "google", "id_token": id_token(aud="any-client")}, format="json",
+            )
+        self.assertEqual(response.status_code, 503)
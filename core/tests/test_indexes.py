@@ -0,0 +1,57 @@
+"""Planos de consulta: as consultas quentes usam os índices compostos (0005)."""
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Alert, Invoice, Planning, Transaction
+from core.rollups import day_start
+
+from .utils import create_account, create_card, create_catalog, create_category, create_transaction, create_user
+
+OCTOBER, NOVEMBER = day_start(datetime.date(2024, 10, 1)), day_start(datetime.date(2024, 11, 1))
+
+class HotQueryIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, catalog)
+        cls.category = create_category(cls.user, catalog)
+        cls.card = create_card(cls.user, cls.account, catalog)
+        for day in range(1, 21):
+            create_transaction(cls.user, date=datetime.date(2024, 10, day), category=cls.category, bankAccount=cls.account)
+
+    def assertUsesIndex(self, queryset, index):
+        if connection.vendor == "postgresql":
+            # Tabelas pequenas levariam o planner a um seq scan
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+
+    def test_transactions_of_month(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(
+                user=self.user, date__gte=OCTOBER, date__lt=NOVEMBER,
+            ),
+            "transaction_user_date_type_idx",
+        )
+
+    def test_transactions_of_category(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(user=self.user, category=self.category, date__gte=OCTOBER),
+            "transaction_user_cat_idx",
+        )
+
+    def test_planning_of_month(self):
+        self.assertUsesIndex(Planning.objects.filter(user=self.user, year=2024, month=10), "planning_user_month_idx")
+
+    def test_invoices_of_card(self):
+        self.assertUsesIndex(
+            Invoice.objects.filter(creditCard=self.card, closingDate__gte=datetime.date(2024, 1, 1)),
+            "invoice_card_closing_idx",
+        )
+
+    def test_unread_alerts(self):
+        self.assertUsesIndex(Alert.objects.filter(user=self.user, readDateTime__isnull=True), "alert_user_read_idx")
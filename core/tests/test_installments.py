@@ -0,0 +1,118 @@
+"""Séries de parcelas (core/installments.py)."""
+import datetime
+import types
+import uuid
+
+from django.test import TestCase
+
+from core import installments
+from core.models import GoalTransaction, Transaction
+
+from .utils import api_client, create_account, create_catalog, create_goal, create_transaction, create_user
+
+UTC = datetime.timezone.utc
+
+class SplitValueTests(TestCase):
+    def test_remainder_goes_to_the_first_items(self):
+        self.assertEqual(installments.split_value(1000, 3), [334, 333, 333])
+        self.assertEqual(installments.split_value(1001, 3), [334, 334, 333])
+        self.assertEqual(installments.split_value(-1000, 3), [-334, -333, -333])
+        self.assertEqual(installments.split_value(2, 4), [1, 1, 0, 0])
+        for total, count in ((1000, 3), (99_999, 7), (-5, 2), (0, 3)):
+            self.assertEqual(sum(installments.split_value(total, count)), total)
+
+class InvoiceDatesTests(TestCase):
+    def dates(self, closing_day, due_day, purchase, count):
+        card = types.SimpleNamespace(closingDay=closing_day, dueDate=due_day)
+        return installments.invoice_dates(card, purchase, count)
+
+    def test_due_in_the_closing_month(self):
+        # Antes do fechamento: fatura do próprio mês; no dia do fechamento ou depois: a seguinte, virando o ano
+        self.assertEqual(self.dates(5, 12, datetime.date(2024, 12, 4), 2), [
+            (datetime.date(2024, 12, 5), datetime.date(2024, 12, 12)),
+            (datetime.date(2025, 1, 5), datetime.date(2025, 1, 12)),
+        ])
+        self.assertEqual(self.dates(5, 12, datetime.date(2024, 12, 5), 1), [
+            (datetime.date(2025, 1, 5), datetime.date(2025, 1, 12)),
+        ])
+
+    def test_due_in_the_following_month(self):
+        self.assertEqual(self.dates(28, 5, datetime.date(2024, 11, 30), 2), [
+            (datetime.date(2024, 12, 28), datetime.date(2025, 1, 5)),
+            (datetime.date(2025, 1, 28), datetime.date(2025, 2, 5)),
+        ])
+        # Vencimento no mesmo dia do fechamento também vai para o mês seguinte
+        self.assertEqual(self.dates(10, 10, datetime.date(2024, 10, 1), 1), [
+            (datetime.date(2024, 10, 10), datetime.date(2024, 11, 10)),
+        ])
+
+    def test_days_past_the_end_of_the_month(self):
+        self.assertEqual(self.dates(31, 31, datetime.date(2024, 1, 31), 3), [
+            (datetime.date(2024, 2, 29), datetime.date(2024, 3, 31)),
+            (datetime.date(2024, 3, 31), datetime.date(2024, 4, 30)),
+            (datetime.date(2024, 4, 30), datetime.date(2024, 5, 31)),
+        ])
+
+    def test_purchase_instant_in_the_project_time_zone(self):
+        # 4/12 às 23:30 em -03:00 já é 5/12 em UTC: dia do fechamento
+        purchase = datetime.datetime(2024, 12, 4, 23, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=-3)))
+        self.assertEqual(self.dates(5, 12, purchase, 1)[0][0], datetime.date(2025, 1, 5))
+
+class FixedSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def series_dates(self, start, **template):
+        series = installments.build_series(
+            {"user": self.user, "value": 1000, "type": 3, "isTransfer": 0, "isCreditCardTransaction": 0,
+             "fixed": 1, "date": start, **template},
+            5,
+        )
+        self.assertEqual([item.value for item in series], [1000] * 5)
+        return [item.date for item in series]
+
+    def test_day_31_is_clamped_each_month(self):
+        start = datetime.datetime(2024, 1, 31, 10, tzinfo=UTC)
+        self.assertEqual(self.series_dates(start), [
+            datetime.datetime(2024, month, day, 10, tzinfo=UTC)
+            for month, day in ((1, 31), (2, 29), (3, 31), (4, 30), (5, 31))
+        ])
+
+    def test_fixed_day(self):
+        start = datetime.datetime(2023, 11, 15, tzinfo=UTC)
+        self.assertEqual(self.series_dates(start, fixedDay=31), [
+            datetime.datetime(year, month, day, tzinfo=UTC)
+            for year, month, day in ((2023, 11, 30), (2023, 12, 31), (2024, 1, 31), (2024, 2, 29), (2024, 3, 31))
+        ])
+
+class DeleteFollowingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, catalog)
+        cls.goal = create_goal(cls.user, cls.account)
+
+    def setUp(self):
+        grouping_id = uuid.uuid4()
+        self.series = [
+            create_transaction(
+                self.user, bankAccount=self.account, groupingId=grouping_id, invoiceNumber=number,
+                date=datetime.date(2024, number, 10),
+            )
+            for number in range(1, 5)
+        ]
+        # Linhas ligadas por OneToOne em cascata não entram na contagem
+        for transaction in self.series:
+            GoalTransaction.objects.create(goal=self.goal, transaction=transaction)
+
+    def test_counts_only_transactions(self):
+        self.assertEqual(installments.delete_following(self.series[1]), 3)
+        self.assertEqual(list(Transaction.objects.filter(user=self.user)), [self.series[0]])
+        self.assertEqual(GoalTransaction.objects.count(), 1)
+
+    def test_endpoint(self):
+        response = api_client(self.user).delete(f"/api/v1/transactions/{self.series[2].pk}/following/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"deleted": 2})
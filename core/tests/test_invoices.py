@@ -0,0 +1,115 @@
+"""Totais das faturas (core/invoices.py)."""
+import datetime
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import invoices
+from core.models import Transaction
+
+from .utils import api_client, create_account, create_card, create_catalog, create_invoice, create_transaction, create_user
+
+SHARED_TOTALS = {"CACHE": "default", "TIMEOUT": 60}
+
+class InvoiceTotalsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, catalog)
+        cls.card = create_card(cls.user, cls.account, catalog)
+        cls.invoice = create_invoice(cls.card)
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def charge(self, value, invoice=None, **fields):
+        return create_transaction(
+            self.user, value=value, invoice=invoice or self.invoice, isCreditCardTransaction=1, **fields,
+        )
+
+class TotalsTests(InvoiceTotalsTestCase):
+    def test_totals(self):
+        self.charge(10_000)
+        self.charge(2_500)
+        self.charge(1_000, isReturn=1)
+        self.charge(3_000, partialPaymentId="pagamento-1")
+        self.charge(500, isReturn=0, partialPaymentId="")
+        empty = create_invoice(self.card, datetime.date(2024, 11, 5))
+
+        totals = invoices.totals_for([self.invoice.pk, empty.pk])
+        self.assertEqual(totals[self.invoice.pk], {
+            "purchases": 13_000, "returns": 1_000, "payments": 3_000, "amountDue": 9_000,
+        })
+        self.assertEqual(totals[empty.pk], dict.fromkeys(invoices.TOTAL_FIELDS, 0))
+
+        response = api_client(self.user).get(f"/api/v1/invoices/{self.invoice.pk}/")
+        self.assertEqual(
+            {name: response.json()[name] for name in ("purchasesTotal", "returnsTotal", "paymentsTotal", "amountDue")},
+            {"purchasesTotal": 13_000, "returnsTotal": 1_000, "paymentsTotal": 3_000, "amountDue": 9_000},
+        )
+
+    def test_list_queries_do_not_grow_with_invoices(self):
+        client = api_client(self.user)
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get("/api/v1/invoices/", {"creditCard": self.card.pk})
+            self.assertEqual(response.status_code, 200)
+            return len(queries), len(response.json())
+
+        self.charge(1_000)
+        queries, count = list_queries()
+        for month in (11, 12):
+            self.charge(1_000, invoice=create_invoice(self.card, datetime.date(2024, month, 5)))
+        self.assertEqual(list_queries(), (queries, count + 2))
+
+    def test_without_shared_cache_totals_are_not_cached(self):
+        transaction = self.charge(1_000)
+        self.assertEqual(invoices.totals_for([self.invoice.pk])[self.invoice.pk]["purchases"], 1_000)
+        # Mesmo uma escrita que não passa pela invalidação (outro worker, UPDATE direto) aparece
+        Transaction.objects.filter(pk=transaction.pk).update(value=4_000)
+        self.assertEqual(invoices.totals_for([self.invoice.pk])[self.invoice.pk]["purchases"], 4_000)
+
+@override_settings(INVOICE_TOTALS_CACHE=SHARED_TOTALS)
+class CachedTotalsTests(InvoiceTotalsTestCase):
+    def purchases(self):
+        return invoices.totals_for([self.invoice.pk])[self.invoice.pk]["purchases"]
+
+    def test_cached_until_a_linked_transaction_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = self.charge(1_000)
+        self.assertEqual(self.purchases(), 1_000)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.purchases(), 1_000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.value = 2_000
+            transaction.save()
+        self.assertEqual(self.purchases(), 2_000)
+
+        # Mudar de fatura invalida a antiga e a nova
+        other = create_invoice(self.card, datetime.date(2024, 11, 5))
+        self.assertEqual(invoices.totals_for([other.pk])[other.pk]["purchases"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.invoice = other
+            transaction.save()
+        self.assertEqual(self.purchases(), 0)
+        self.assertEqual(invoices.totals_for([other.pk])[other.pk]["purchases"], 2_000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.delete()
+        self.assertEqual(invoices.totals_for([other.pk])[other.pk]["purchases"], 0)
+
+    def test_bulk_endpoint_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = self.charge(1_000)
+        self.assertEqual(self.purchases(), 1_000)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api_client(self.user).post(
+                "/api/v1/transactions/bulk/", {"update": [{"id": str(transaction.pk), "value": 3_000}]}, format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.purchases(), 3_000)
@@ -0,0 +1,33 @@
+"""Parâmetros de mês/ano inválidos respondem 400."""
+from django.test import TestCase
+
+from .utils import api_client, create_catalog, create_planning, create_user
+
+class MonthParamsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+        create_planning(cls.user, create_catalog(), year=2024, month=12)
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def test_transactions(self):
+        response = self.client.get("/api/v1/transactions/", {"date__month": 13, "date__year": 2024})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"date__month"})
+
+        response = self.client.get("/api/v1/transactions/", {"date__month": 1, "date__year": "abc"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"date__year"})
+
+        response = self.client.get("/api/v1/transactions/", {"date__month": 12, "date__year": 2024})
+        self.assertEqual(response.status_code, 200)
+
+    def test_plannings(self):
+        for path in ("/api/v1/plannings/summary/", "/api/v1/plannings/categories/"):
+            with self.subTest(path):
+                self.assertEqual(self.client.get(path, {"month": 13, "year": 2024}).status_code, 400)
+                self.assertEqual(self.client.get(path, {"month": 1, "year": "abc"}).status_code, 400)
+                self.assertEqual(self.client.get(path, {"month": 12, "year": 9999}).status_code, 400)
+                self.assertEqual(self.client.get(path, {"month": 12, "year": 2024}).status_code, 200)
@@ -0,0 +1,70 @@
+"""Listagens: paginação por cursor, streaming e lista completa devolvem as mesmas linhas."""
+import datetime
+import json
+
+from django.test import TestCase
+
+from .utils import api_client, create_account, create_catalog, create_transaction, create_user
+
+class ListingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        account = create_account(cls.user, catalog)
+        # Datas repetidas e uma transação sem data exercitam o desempate por id
+        for index in range(11):
+            create_transaction(
+                cls.user, date=datetime.date(2024, 10, 1 + index // 3), bankAccount=account,
+                value=100 * (index + 1), type=3 if index % 2 else 4,
+            )
+        create_transaction(cls.user, date=None, value=50)
+
+    def setUp(self):
+        self.api = api_client(self.user)
+
+    def full_list(self):
+        response = self.api.get("/api/v1/transactions/?page_size=200")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertSameRows(self, rows, expected):
+        self.assertEqual(len(rows), len({row["id"] for row in rows}))
+        self.assertEqual(sorted(rows, key=lambda row: row["id"]), sorted(expected, key=lambda row: row["id"]))
+
+class KeysetPaginationTests(ListingTestCase):
+    def test_cursor_pages_cover_the_full_list(self):
+        full = self.full_list()
+        rows, url = [], "/api/v1/transactions/?cursor=&page_size=4"
+        while url:
+            page = self.api.get(url).json()
+            self.assertLessEqual(len(page["results"]), 4)
+            self.assertEqual(page["summary"], full["summary"])
+            rows.extend(page["results"])
+            url = page["next"]
+
+        self.assertSameRows(rows, full["results"])
+        # Ordem decrescente de (date, id), sem data por último
+        keys = [(row["date"] is not None, row["date"] or "", row["id"]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.api.get("/api/v1/transactions/?cursor=abc").status_code, 404)
+
+class StreamingTests(ListingTestCase):
+    def streamed(self, url):
+        response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_transactions_stream_matches_full_list(self):
+        full = self.full_list()
+        streamed = self.streamed("/api/v1/transactions/?stream=1")
+        self.assertEqual(list(streamed), ["results", "summary"])
+        self.assertSameRows(streamed["results"], full["results"])
+        self.assertEqual(streamed["summary"], full["summary"])
+
+    def test_plain_array_stream(self):
+        full = self.api.get("/api/v1/bank-accounts/").json()
+        self.assertEqual(self.streamed("/api/v1/bank-accounts/?stream=1"), full)
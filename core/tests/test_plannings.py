@@ -0,0 +1,87 @@
+"""Detalhamento do planejamento por categoria (PlanningCategoriesView)."""
+import datetime
+
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import rollups
+from core.models import Budget, Currency
+
+from .utils import (
+    api_client, create_account, create_catalog, create_category, create_planning, create_subcategory,
+    create_transaction, create_user,
+)
+
+URL = "/api/v1/plannings/categories/"
+
+def per_category_loop(planning, currency_id=None):
+    """Cálculo anterior ao GROUP BY: dois aggregates no rollup por budget."""
+    budgets = Budget.objects.filter(planning=planning)
+    if currency_id:
+        budgets = budgets.filter(planning__currency_id=currency_id)
+    rollup = rollups.rollup_queryset(planning.user_id, planning.year, planning.month, currency_id).filter(type__in=[3, 5])
+    result = {}
+    for budget in budgets:
+        executed = rollup.filter(category_id=budget.category_id, paid=1).aggregate(total=Sum("total"))["total"] or 0
+        pending = rollup.filter(category_id=budget.category_id, paid=0).aggregate(total=Sum("total"))["total"] or 0
+        result[str(budget.pk)] = (executed, pending, executed + pending)
+    return result
+
+class PlanningCategoriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        other = create_user("other")
+        cls.account = create_account(cls.user, cls.catalog)
+        cls.dollar = Currency.objects.create(image="usd.png", code="USD", symbol="US$")
+        dollar_account = create_account(cls.user, {**cls.catalog, "currency": cls.dollar}, name="Conta em dólar")
+        cls.planning = create_planning(cls.user, cls.catalog)
+        market, rent, empty = (
+            create_category(cls.user, cls.catalog, description=description) for description in ("Mercado", "Aluguel", "Lazer")
+        )
+        create_subcategory(market, description="Feira")
+        for category, planned in ((market, 50_000), (rent, 150_000), (empty, 10_000)):
+            Budget.objects.create(planning=cls.planning, category=category, plannedValue=planned)
+
+        create_transaction(cls.user, bankAccount=cls.account, category=market, value=1_000)
+        create_transaction(cls.user, bankAccount=cls.account, category=market, value=250, type=5, paid=0)
+        create_transaction(cls.user, bankAccount=dollar_account, category=market, value=70)
+        create_transaction(cls.user, bankAccount=cls.account, category=rent, value=120_000)
+        create_transaction(cls.user, bankAccount=cls.account, category=rent, value=30_000, paid=0)
+        # Fora do detalhamento: receita, outro mês, sem conta, outro usuário
+        create_transaction(cls.user, bankAccount=cls.account, category=market, value=9_999, type=4)
+        create_transaction(cls.user, bankAccount=cls.account, category=market, value=9_999, date=datetime.date(2024, 11, 1))
+        create_transaction(other, category=create_category(other, cls.catalog), value=9_999)
+
+    def setUp(self):
+        self.api = api_client(self.user)
+
+    def totals(self, **params):
+        response = self.api.get(URL, {"year": 2024, "month": 10, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return {row["id"]: (row["executed"], row["pending"], row["totalSpent"]) for row in response.json()}
+
+    def test_matches_the_per_category_loop(self):
+        for currency in (None, self.catalog["currency"].pk, self.dollar.pk):
+            with self.subTest(currency=currency):
+                params = {"currency": str(currency)} if currency else {}
+                self.assertEqual(self.totals(**params), per_category_loop(self.planning, currency))
+
+        self.assertEqual(sorted(self.totals().values()), [(0, 0, 0), (1_070, 250, 1_320), (120_000, 30_000, 150_000)])
+
+    def test_query_count_does_not_grow_with_budgets(self):
+        def queries():
+            with CaptureQueriesContext(connection) as captured:
+                rows = self.totals()
+            return len(captured), len(rows)
+
+        count, budgets = queries()
+        for index in range(4):
+            category = create_category(self.user, self.catalog, description=f"Extra {index}")
+            create_subcategory(category)
+            Budget.objects.create(planning=self.planning, category=category, plannedValue=1_000)
+            create_transaction(self.user, bankAccount=self.account, category=category, value=100, paid=index % 2)
+        self.assertEqual(queries(), (count, budgets + 4))
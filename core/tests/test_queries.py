@@ -0,0 +1,84 @@
+"""Consultas por listagem: o eager loading (core/eager.py) mantém o número fixo."""
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Alert, BankAccountLimit, Budget, GoalTransaction, Loan
+from core.urls import router
+
+from .utils import (
+    api_client, create_account, create_card, create_catalog, create_category, create_goal, create_invoice,
+    create_planning, create_subcategory, create_transaction, create_user,
+)
+
+# Listagens com relações aninhadas: consultas esperadas com o cache de catálogos aquecido,
+# as mesmas de core/benchmark_budgets.json (inclui a versão do ETag; ver sync.resource_version)
+LIST_QUERIES = {
+    "transactions": 7,
+    "credit-cards": 2,
+    "invoices": 3,
+    "goals": 2,
+    "budgets": 3,
+    "plannings": 4,
+}
+
+class ListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        cls.add_rows(0)
+
+    @classmethod
+    def add_rows(cls, index):
+        """Um registro de cada recurso do usuário, todos relacionados entre si."""
+        user, catalog = cls.user, cls.catalog
+        account = create_account(user, catalog, name=f"Conta {index}")
+        BankAccountLimit.objects.create(translationKey="limit", type=1, value=100, bankAccount=account)
+        category = create_category(user, catalog, description=f"Categoria {index}")
+        subcategory = create_subcategory(category, description=f"Sub {index}")
+        card = create_card(user, account, catalog)
+        invoice = create_invoice(card, datetime.date(2024, 1 + index, 5))
+        planning = create_planning(user, catalog, month=1 + index)
+        Budget.objects.create(plannedValue=1000, category=category, subcategory=subcategory, planning=planning)
+        Loan.objects.create(
+            created="x", modified="x", description="Empréstimo", principalAmount=100, totalAmount=120,
+            dueDate=datetime.date(2025, 1, 1), type=1, bankAccount=account, color=catalog["color"],
+            icon=catalog["icon"], user=user,
+        )
+        goal = create_goal(user, account)
+        for day in (1, 2):
+            transaction = create_transaction(
+                user, date=datetime.date(2024, 1 + index, day), bankAccount=account, category=category,
+                subcategory=subcategory, invoice=invoice,
+            )
+        GoalTransaction.objects.create(goal=goal, transaction=transaction)
+        Alert.objects.create(description="Alerta", created="x", user=user)
+
+    def list_queries(self, prefix):
+        client = api_client(self.user)
+        url = f"/api/v1/{prefix}/"
+        # A primeira requisição aquece os caches de catálogo
+        self.assertEqual(client.get(url).status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def list_prefixes(self):
+        return [prefix for prefix, viewset, _ in router.registry if hasattr(viewset, "list")]
+
+    def test_nested_lists(self):
+        for prefix, expected in LIST_QUERIES.items():
+            with self.subTest(prefix):
+                self.assertEqual(self.list_queries(prefix), expected)
+
+    def test_queries_do_not_grow_with_rows(self):
+        before = {prefix: self.list_queries(prefix) for prefix in self.list_prefixes()}
+        for index in (1, 2):
+            self.add_rows(index)
+        for prefix in self.list_prefixes():
+            with self.subTest(prefix):
+                self.assertEqual(self.list_queries(prefix), before[prefix])
@@ -0,0 +1,52 @@
+"""Renderer e parser orjson (core/renderers.py) equivalentes aos do DRF."""
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONParser, FastJSONRenderer, dumps
+
+DATA = {
+    "id": uuid.UUID("6f1c1a52-3f39-4c53-9d5e-2f0f7d1b8f10"),
+    "date": datetime.date(2024, 10, 10),
+    "modified": datetime.datetime(2024, 10, 10, 12, 30, tzinfo=datetime.timezone.utc),
+    "time": datetime.time(8, 15),
+    "value": 1000,
+    "rate": 1.5,
+    "amount": decimal.Decimal("10.50"),
+    "label": gettext_lazy("Mercado"),
+    "description": "Pão de açúcar ✓",
+    "empty": None,
+    "flags": [True, False],
+    "totals": {2024: 3, "10": 4},
+    "results": [{"id": 1, "tags": []}],
+}
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(DATA), JSONRenderer().render(DATA))
+        self.assertEqual(dumps(DATA), JSONRenderer().render(DATA))
+
+    def test_indent_falls_back_to_drf(self):
+        media_type = "application/json; indent=2"
+        self.assertEqual(
+            FastJSONRenderer().render({"a": [1]}, media_type), JSONRenderer().render({"a": [1]}, media_type),
+        )
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_matches_drf_parser(self):
+        body = '{"description": "Pão", "value": 1000, "items": [1.5, null, true]}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{invalid"))
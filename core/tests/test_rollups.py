@@ -0,0 +1,149 @@
+"""Rollup mensal (core/rollups.py): manutenção incremental igual à reconstrução."""
+import datetime
+
+from django.db import transaction
+from django.db.models import Sum
+from django.test import TestCase
+
+from core import rollups
+from core.models import Transaction, TransactionRollup
+
+from .utils import api_client, create_account, create_catalog, create_category, create_transaction, create_user
+
+def rollup_rows():
+    # Linhas repetidas da mesma chave são toleradas; o que vale é a soma por chave
+    return {
+        tuple(row[field] for field in rollups.KEY_FIELDS): (row["rollupTotal"], row["rollupCount"])
+        for row in (
+            TransactionRollup.objects.values(*rollups.KEY_FIELDS)
+            .annotate(rollupTotal=Sum("total"), rollupCount=Sum("count"))
+            .filter(rollupCount__gt=0)
+            .order_by()
+        )
+    }
+
+class IncrementalRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog, other_catalog = create_catalog(), create_catalog()
+        cls.user = create_user()
+        cls.other = create_user("other")
+        cls.account = create_account(cls.user, catalog)
+        cls.foreign_account = create_account(cls.user, other_catalog, name="Conta em dólar")
+        cls.market = create_category(cls.user, catalog)
+        cls.salary = create_category(cls.user, catalog, description="Salário")
+
+    def setUp(self):
+        self.api = api_client(self.user)
+
+    def assertMatchesRebuild(self):
+        incremental = rollup_rows()
+        self.assertTrue(incremental)
+        with transaction.atomic():
+            rollups.rebuild()
+        self.assertEqual(incremental, rollup_rows())
+
+    def test_model_writes(self):
+        first = create_transaction(self.user, bankAccount=self.account, category=self.market)
+        second = create_transaction(self.user, bankAccount=self.foreign_account, category=self.market, value=300)
+        create_transaction(self.user, bankAccount=self.account, category=self.salary, type=4, value=9000)
+        create_transaction(self.user, bankAccount=self.account, category=self.market, paid=0)
+        create_transaction(self.user, date=None, value=123)
+        create_transaction(self.other, value=50)
+        self.assertMatchesRebuild()
+
+        first.value = 2500
+        first.category = self.salary
+        first.date = first.date.replace(month=11)
+        first.save()
+        second.paid = 0
+        second.bankAccount = None
+        second.save()
+        self.assertMatchesRebuild()
+
+        second.date = None
+        second.save()
+        first.delete()
+        self.assertMatchesRebuild()
+
+    def test_bulk_endpoint(self):
+        existing = [
+            create_transaction(self.user, bankAccount=self.account, category=self.market, value=100 * (index + 1))
+            for index in range(3)
+        ]
+        item = {"userId": str(self.user.pk), "type": 3, "isTransfer": 0, "isCreditCardTransaction": 0, "paid": 1}
+        response = self.api.post("/api/v1/transactions/bulk/", {
+            "create": [
+                {**item, "value": 700, "date": "2024-10-20T12:00:00.000Z", "bankAccountId": str(self.account.pk)},
+                {**item, "value": 800, "date": "2024-12-01T00:00:00.000Z", "categoryId": str(self.salary.pk)},
+            ],
+            "update": [
+                {"id": str(existing[0].pk), "value": 900, "date": "2025-01-15T10:00:00.000Z"},
+                {"id": str(existing[1].pk), "categoryId": str(self.salary.pk), "paid": 0},
+            ],
+            "delete": [str(existing[2].pk)],
+        }, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertMatchesRebuild()
+
+    def test_series_and_following(self):
+        response = self.api.post("/api/v1/transactions/series/", {
+            "transaction": {
+                "userId": str(self.user.pk), "value": 1000, "originalValue": 1000, "type": 3, "isTransfer": 0,
+                "isCreditCardTransaction": 0, "paid": 0, "date": "2024-11-30T12:00:00.000Z",
+                "bankAccountId": str(self.account.pk), "categoryId": str(self.market.pk),
+            },
+            "count": 3,
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertMatchesRebuild()
+
+        series = sorted(response.json(), key=lambda row: row["invoiceNumber"])
+        response = self.api.patch(
+            f"/api/v1/transactions/{series[1]['id']}/following/",
+            {"categoryId": str(self.salary.pk), "paid": 1, "value": 400}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertMatchesRebuild()
+
+        response = self.api.delete(f"/api/v1/transactions/{series[2]['id']}/following/")
+        self.assertEqual(response.json(), {"deleted": 1})
+        self.assertMatchesRebuild()
+
+    def test_account_delete(self):
+        create_transaction(self.user, bankAccount=self.account, category=self.market)
+        create_transaction(self.user, bankAccount=self.foreign_account, category=self.market)
+        create_transaction(self.user, category=self.market, value=10)
+        self.account.delete()
+        self.assertMatchesRebuild()
+
+class SummarySourceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.account = create_account(cls.user, catalog)
+        cls.category = create_category(cls.user, catalog)
+        create_transaction(cls.user, bankAccount=cls.account, category=cls.category, value=1000)
+        create_transaction(cls.user, bankAccount=cls.account, value=300)
+        create_transaction(cls.user, bankAccount=cls.account, type=4, value=5000)
+        # Rollup propositalmente diferente das transações para saber de onde veio o resumo
+        TransactionRollup.objects.update(total=1)
+
+    def summary(self, **params):
+        response = api_client(self.user).get("/api/v1/transactions/", {"date__year": 2024, "date__month": 10, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["summary"]
+
+    def test_month_listing_reads_the_rollup(self):
+        rollup = {"totalIncome": 1, "totalExpense": 2, "balance": -1}
+        self.assertEqual(self.summary(), rollup)
+        self.assertEqual(self.summary(ordering="-value", page_size=1, user=str(self.user.pk)), rollup)
+        self.assertEqual(self.summary(cursor=""), rollup)
+
+    def test_other_filters_sum_the_transactions(self):
+        self.assertEqual(self.summary(category=str(self.category.pk)), {
+            "totalIncome": 0, "totalExpense": 1000, "balance": -1000,
+        })
+        self.assertEqual(self.summary(type=4), {"totalIncome": 5000, "totalExpense": 0, "balance": 5000})
+        self.assertEqual(self.summary(search="Mercado")["totalIncome"], 0)
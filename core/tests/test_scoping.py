@@ -0,0 +1,99 @@
+"""Ids de FK e viewsets restritos às linhas do usuário da requisição."""
+from django.test import TestCase
+
+from core.base import OWNERS
+from core.models import Person, User
+from core.urls import router
+
+from .utils import (
+    api_client, create_account, create_card, create_catalog, create_category, create_user,
+)
+
+class RelatedIdScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.catalog = create_catalog()
+        cls.user = create_user()
+        cls.other = create_user("other")
+        cls.account = create_account(cls.user, cls.catalog)
+        cls.other_account = create_account(cls.other, cls.catalog)
+        cls.other_card = create_card(cls.other, cls.other_account, cls.catalog)
+        cls.shared_category = create_category(None, cls.catalog, description="Padrão")
+        cls.other_category = create_category(cls.other, cls.catalog)
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def test_other_users_ids_are_rejected(self):
+        response = self.client.post("/api/v1/credit-cards/", {
+            "name": "Cartão", "limitValue": 1000, "closingDay": 5, "dueDate": 12, "created": "x", "modified": "x",
+            "bankAccountId": str(self.other_account.pk),
+            "creditCardFlagId": str(self.catalog["flag"].pk),
+            "userId": str(self.other.pk),
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"bankAccountId", "userId"})
+
+    def test_shared_rows_are_accepted(self):
+        response = self.client.post("/api/v1/subcategories/", {
+            "description": "Feira",
+            "categoryId": str(self.shared_category.pk),
+            "iconId": str(self.catalog["icon"].pk),
+            "colorId": str(self.catalog["color"].pk),
+            "userId": str(self.user.pk),
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+        response = self.client.post("/api/v1/subcategories/", {
+            "description": "Feira",
+            "categoryId": str(self.other_category.pk),
+            "iconId": str(self.catalog["icon"].pk),
+            "colorId": str(self.catalog["color"].pk),
+            "userId": str(self.user.pk),
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"categoryId"})
+
+    def test_series_credit_card(self):
+        response = self.client.post("/api/v1/transactions/series/", {
+            "transaction": {
+                "userId": str(self.user.pk), "value": 1000, "type": 3, "isTransfer": 0,
+                "isCreditCardTransaction": 1, "date": "2024-10-10",
+            },
+            "count": 2,
+            "creditCardId": str(self.other_card.pk),
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"creditCardId"})
+
+class UserViewSetScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+        cls.other = create_user("other")
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def test_users(self):
+        response = self.client.get("/api/v1/users/")
+        self.assertEqual([row["id"] for row in response.json()["results"]], [str(self.user.pk)])
+        self.assertEqual(self.client.get(f"/api/v1/users/{self.other.pk}/").status_code, 404)
+        self.assertEqual(self.client.patch(f"/api/v1/users/{self.other.pk}/", {"email": "x@example.com"}).status_code, 404)
+        self.assertEqual(User.objects.get(pk=self.other.pk).email, "other@example.com")
+
+    def test_people(self):
+        response = self.client.get("/api/v1/people/")
+        self.assertEqual([row["id"] for row in response.json()["results"]], [str(self.user.person_id)])
+        self.assertEqual(self.client.delete(f"/api/v1/people/{self.other.person_id}/").status_code, 404)
+        self.assertTrue(Person.objects.filter(pk=self.other.person_id).exists())
+
+class OwnersTests(TestCase):
+    def test_viewsets_match_owners(self):
+        # base.OWNERS acompanha o owner_field/owner_shared de cada viewset
+        for prefix, viewset, _ in router.registry:
+            owner_field = getattr(viewset, "owner_field", None)
+            if getattr(viewset, "queryset", None) is None or owner_field is None:
+                continue
+            with self.subTest(prefix):
+                self.assertEqual(OWNERS[viewset.queryset.model], (owner_field, viewset.owner_shared))
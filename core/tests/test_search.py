@@ -0,0 +1,59 @@
+"""Busca textual de transações (core/search.py)."""
+from django.db import connection
+from django.test import TestCase
+
+from core import search
+from core.models import Transaction
+
+from .utils import create_catalog, create_category, create_transaction, create_user
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        cls.category = create_category(cls.user, catalog, description="Farmácia")
+
+    def found(self, term):
+        return list(search.search(Transaction.objects.filter(user=self.user), term).values_list("pk", flat=True))
+
+    def test_document_and_matching(self):
+        transaction = create_transaction(self.user, description="Remédio", category=self.category)
+        self.assertEqual(transaction.searchDocument, "remedio farmacia")
+        self.assertEqual(self.found("FARMÁCIA"), [transaction.pk])
+        self.assertEqual(self.found("ab"), [])
+
+    def test_update_and_delete_keep_index_in_sync(self):
+        transaction = create_transaction(self.user, description="Padaria")
+        transaction.description = "Açougue"
+        transaction.save()
+        self.assertEqual(self.found("padaria"), [])
+        self.assertEqual(self.found("acougue"), [transaction.pk])
+
+        transaction.delete()
+        self.assertEqual(self.found("acougue"), [])
+
+    def test_fts_rows_are_keyed_by_rowid(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("FTS5 só no SQLite")
+        transaction = create_transaction(self.user, description="Livraria")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"EXPLAIN QUERY PLAN DELETE FROM {search.SQLITE_TABLE} WHERE rowid = {search._ROWID}",
+                [transaction.pk.hex],
+            )
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+            cursor.execute(f"SELECT COUNT(*) FROM {search.SQLITE_KEY_TABLE}")
+            keys = cursor.fetchone()[0]
+        # Busca da linha pelo rowid (idxStr "="), sem varrer a tabela FTS5
+        self.assertIn("VIRTUAL TABLE INDEX 0:=", plan)
+        self.assertEqual(keys, 1)
+
+        # A consulta parte do MATCH, e não das transações do usuário
+        plan = search.search(Transaction.objects.filter(user=self.user), "livraria").explain()
+        self.assertIn("SCAN core_transaction_search VIRTUAL TABLE", plan.splitlines()[0])
+
+        transaction.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.SQLITE_KEY_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 0)
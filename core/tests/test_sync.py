@@ -0,0 +1,52 @@
+"""Carga completa paginada do /sync/."""
+from django.test import TestCase, override_settings
+
+from .utils import api_client, create_account, create_catalog, create_category, create_transaction, create_user
+
+URL = "/api/v1/sync/"
+
+def ids(changes):
+    return {key: sorted(row["id"] for row in rows) for key, rows in changes.items()}
+
+@override_settings(SYNC={"SETTLE_SECONDS": 0, "MAX_CHANGES": 3})
+class FullSnapshotPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        catalog = create_catalog()
+        cls.user = create_user()
+        account = create_account(cls.user, catalog)
+        category = create_category(cls.user, catalog)
+        for _ in range(7):
+            create_transaction(cls.user, bankAccount=account, category=category)
+
+    def setUp(self):
+        self.client = api_client(self.user)
+
+    def test_pages_add_up_to_the_full_snapshot(self):
+        pages, params = [], {}
+        while True:
+            body = self.client.get(URL, params).json()
+            pages.append(body)
+            self.assertTrue(body["full"])
+            self.assertLessEqual(sum(len(rows) for rows in body["changes"].values()), 3)
+            if not body["hasMore"]:
+                break
+            params = {"snapshot": body["snapshot"]}
+        self.assertGreater(len(pages), 3)
+        self.assertEqual({page["cursor"] for page in pages}, {pages[0]["cursor"]})
+        self.assertIsNone(pages[-1]["snapshot"])
+
+        merged = {}
+        for page in pages:
+            for key, rows in ids(page["changes"]).items():
+                merged.setdefault(key, []).extend(rows)
+        with self.settings(SYNC={"SETTLE_SECONDS": 0, "MAX_CHANGES": 1000}):
+            single = self.client.get(URL).json()
+        self.assertFalse(single["hasMore"])
+        self.assertEqual({key: sorted(rows) for key, rows in merged.items()}, ids(single["changes"]))
+        self.assertEqual(len(merged["transactions"]), 7)
+
+    def test_invalid_continuation(self):
+        response = self.client.get(URL, {"snapshot": "não-é-base64"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"snapshot"})
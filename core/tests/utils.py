@@ -0,0 +1,84 @@
+"""Criação dos registros mínimos usados pelos testes."""
+import datetime
+
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import (
+    Bank, BankAccount, Category, Color, CreditCard, CreditCardFlag, Currency, Goal, Icon, Invoice,
+    Person, Planning, Subcategory, Transaction, User,
+)
+
+def create_catalog():
+    """Catálogos globais: moeda, cor, ícone, banco e bandeira."""
+    return {
+        "currency": Currency.objects.get_or_create(image="brl.png", defaults={"code": "BRL", "symbol": "R$"})[0],
+        "color": Color.objects.create(description="Azul"),
+        "icon": Icon.objects.create(name="icon", set="test"),
+        "bank": Bank.objects.create(name="Banco"),
+        "flag": CreditCardFlag.objects.create(name="Visa"),
+    }
+
+def create_user(username="user"):
+    person = Person.objects.create(fullName=username)
+    return User.objects.create(username=username, email=f"{username}@example.com", person=person)
+
+def create_account(user, catalog, **fields):
+    fields = {"name": "Conta", "type": 1, "initialBalance": 0, "created": "x", "modified": "x", **fields}
+    return BankAccount.objects.create(
+        user=user, color=catalog["color"], currency=catalog["currency"], bank=catalog["bank"], **fields,
+    )
+
+def create_category(user, catalog, description="Mercado", **fields):
+    return Category.objects.create(
+        description=description, type=1, icon=catalog["icon"], color=catalog["color"], user=user, **fields,
+    )
+
+def create_subcategory(category, description="Sub"):
+    return Subcategory.objects.create(
+        description=description, category=category, icon=category.icon, color=category.color, user=category.user,
+    )
+
+def create_card(user, account, catalog):
+    return CreditCard.objects.create(
+        created="x", modified="x", name="Cartão", limitValue=100_000, closingDay=5, dueDate=12,
+        bankAccount=account, creditCardFlag=catalog["flag"], user=user,
+    )
+
+def create_invoice(card, date=datetime.date(2024, 10, 5)):
+    return Invoice.objects.create(
+        created="x", modified="x", status=1, closingDate=date, dueDate=date + datetime.timedelta(days=7),
+        creditCard=card, user=card.user,
+    )
+
+def create_planning(user, catalog, year=2024, month=10):
+    return Planning.objects.create(month=month, year=year, monthlyIncome=500_000, user=user, currency=catalog["currency"])
+
+def create_goal(user, account, **fields):
+    fields = {
+        "completionDate": "2030-01-01", "type": 1, "description": "Meta", "aimValue": 100_000, **fields,
+    }
+    return Goal.objects.create(user=user, bankAccount=account, **fields)
+
+def create_transaction(user, **fields):
+    fields = {
+        "date": datetime.date(2024, 10, 10), "value": 1000, "isTransfer": 0, "isCreditCardTransaction": 0,
+        "paid": 1, "type": 3, **fields,
+    }
+    # Datas de calendário viram a meia-noite do dia no fuso do projeto
+    for name in ("date", "paymentDate", "originalDate"):
+        if type(fields.get(name)) is datetime.date:
+            fields[name] = timezone.make_aware(datetime.datetime.combine(fields[name], datetime.time()))
+    return Transaction.objects.create(user=user, **fields)
+
+def api_client(user=None, token=False):
+    """APIClient autenticado: por force_authenticate ou, com `token`, por um access token real."""
+    client = APIClient()
+    if user is not None:
+        if token:
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        else:
+            client.force_authenticate(user)
+    return client
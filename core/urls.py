@@ -10,7 +10,7 @@ from .views import (
     LoanViewSet, TransactionViewSet, GoalViewSet, GoalTransactionViewSet, AlertViewSet,
     SocialLoginViewSet, LoginViewSet
 )
-from .views import PlanningSummaryView, PlanningCategoriesView
+from .views import PlanningSummaryView, PlanningCategoriesView, SyncView
 
 router = DefaultRouter()
 router.register(r"people", PersonViewSet, basename="person")
@@ -46,6 +46,9 @@ urlpatterns = [
     path("plannings/summary/", PlanningSummaryView.as_view(), name="planningSummary"),
     path("plannings/categories/", PlanningCategoriesView.as_view(), name="planningCategories"),
 
+    # Sincronização incremental
+    path("sync/", SyncView.as_view(), name="sync"),
+
     # Public signup and admin create
     path("", include(router.urls)),
 ]
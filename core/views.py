@@ -1,9 +1,10 @@
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from .serializers import (
     RegistrationSerializer, LogoutSerializer, SocialLoginSerializer, 
@@ -11,7 +12,6 @@ from .serializers import (
 )
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiExample, OpenApiParameter, OpenApiTypes
 
-import requests
 
 from .models import (
     Person, Color, Icon, Bank, Currency, BankAccount, BankAccountLimit,
@@ -22,26 +22,72 @@ from .serializers import (
     PersonSerializer, UserSerializer, ColorSerializer, IconSerializer,
     BankSerializer, CurrencySerializer, BankAccountSerializer, BankAccountLimitSerializer,
     CreditCardFlagSerializer, CreditCardSerializer, InvoiceSerializer, CategorySerializer,
+    BankAccountBalanceSerializer, RunningBalanceSerializer,
     SubcategorySerializer, PlanningSerializer, BudgetSerializer, LoanSerializer,
-    TransactionSerializer, GoalSerializer, GoalTransactionSerializer, AlertSerializer,
+    TransactionSerializer, TransactionSeriesSerializer, GoalSerializer, GoalTransactionSerializer, AlertSerializer,
     RegistrationSerializer, PlanningSummaryResponseSerializer, PlanningCategoryItemSerializer
 )
+from .authentication import RefreshToken
 from .base import OptionalPaginationViewSet, BaseModelViewSet
+from .cache import CatalogCacheMixin
+from .fastpath import compile_serializer
+from .bulk import BulkTransactionWriter
+from . import installments
+from . import balances, goals, identity, rollups, sync
+from . import search as search_index
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.db.models import Sum
 import calendar
+import datetime
 
 User = get_user_model()
 
-class PersonViewSet(viewsets.ModelViewSet):
-    queryset = Person.objects.all()
+def parse_month(year, month, year_param="year", month_param="month"):
+    """(ano, mês) dos parâmetros da query string; valores inválidos viram um 400."""
+    errors = {}
+    try:
+        year = int(year)
+        # O fim do intervalo (início do mês seguinte) precisa caber em um date
+        if not datetime.MINYEAR <= year < datetime.MAXYEAR:
+            raise ValueError(year)
+    except (TypeError, ValueError):
+        errors[year_param] = ["Ano inválido."]
+    try:
+        month = int(month)
+        if not 1 <= month <= 12:
+            raise ValueError(month)
+    except (TypeError, ValueError):
+        errors[month_param] = ["Mês inválido."]
+    if errors:
+        raise ValidationError(errors)
+    return year, month
+
+def month_range(year, month, year_param="year", month_param="month"):
+    year, month = parse_month(year, month, year_param, month_param)
+    start = datetime.date(year, month, 1)
+    end = datetime.date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return rollups.day_start(start), rollups.day_start(end)
+
+class PersonViewSet(BaseModelViewSet):
+    queryset = Person.objects.order_by("fullName")
     serializer_class = PersonSerializer
     http_method_names = ['get', 'put', 'patch', 'delete']
-
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    # Só a pessoa do próprio usuário
+    owner_field = "users"
+    filterset_fields = ["firstName", "lastName", "fullName"]
+    ordering_fields = ["fullName"]
+    # Fora do registro de mudanças (core/sync.py) que versiona os ETags
+    conditional_actions = ()
+
+class UserViewSet(BaseModelViewSet):
+    queryset = User.objects.order_by("username")
     serializer_class = UserSerializer
+    # Só o próprio usuário
+    owner_field = "pk"
+    filterset_fields = ["username", "email"]
+    ordering_fields = ["username"]
+    conditional_actions = ()
 
     @extend_schema(
     request=RegistrationSerializer,
@@ -87,33 +133,71 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Logout realizado com sucesso"}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ColorViewSet(OptionalPaginationViewSet):
+class ColorViewSet(CatalogCacheMixin, OptionalPaginationViewSet):
     queryset = Color.objects.all()
     serializer_class = ColorSerializer
+    # Registros sem usuário são do catálogo padrão, visíveis para todos
+    owner_shared = True
 
-class IconViewSet(OptionalPaginationViewSet):
+class IconViewSet(CatalogCacheMixin, OptionalPaginationViewSet):
     queryset = Icon.objects.all()
     serializer_class = IconSerializer
+    owner_field = None
 
-class BankViewSet(OptionalPaginationViewSet):
+class BankViewSet(CatalogCacheMixin, OptionalPaginationViewSet):
     queryset = Bank.objects.all()
     serializer_class = BankSerializer
+    owner_field = None
 
-class CurrencyViewSet(OptionalPaginationViewSet):
+class CurrencyViewSet(CatalogCacheMixin, OptionalPaginationViewSet):
     queryset = Currency.objects.all()
     serializer_class = CurrencySerializer
+    owner_field = None
 
 class BankAccountViewSet(OptionalPaginationViewSet):
     queryset = BankAccount.objects.all()
-    serializer_class = BankAccountSerializer
+    serializer_class = BankAccountBalanceSerializer
+
+    def get_queryset(self):
+        # Saldo atual via subquery no próprio SELECT da listagem
+        return balances.annotate_current_balance(super().get_queryset())
+
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            raise ValidationError({name: ["Data inválida, use AAAA-MM-DD."]})
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='from', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Data inicial (opcional)", required=False),
+            OpenApiParameter(name='to', type=OpenApiTypes.DATE, location=OpenApiParameter.QUERY, description="Data final (opcional)", required=False),
+        ],
+        responses=RunningBalanceSerializer(many=True),
+        description="Movimentações da conta em ordem cronológica com o saldo após cada uma.",
+    )
+    @action(detail=True, methods=["get"], url_path="running-balance")
+    def running_balance(self, request, pk=None):
+        account = self.get_object()
+        queryset = balances.running_balance(account, self._date_param("from"), self._date_param("to"))
+
+        if "page" in request.query_params:
+            page = self.paginate_queryset(queryset)
+            return self.get_paginated_response(RunningBalanceSerializer(page, many=True).data)
+        return Response(RunningBalanceSerializer(queryset, many=True).data)
 
 class BankAccountLimitViewSet(BaseModelViewSet):
     queryset = BankAccountLimit.objects.all()
     serializer_class = BankAccountLimitSerializer
+    owner_field = "bankAccount__user"
 
-class CreditCardFlagViewSet(OptionalPaginationViewSet):
+class CreditCardFlagViewSet(CatalogCacheMixin, OptionalPaginationViewSet):
     queryset = CreditCardFlag.objects.all()
     serializer_class = CreditCardFlagSerializer
+    owner_field = None
 
 class CreditCardViewSet(OptionalPaginationViewSet):
     queryset = CreditCard.objects.all()
@@ -126,10 +210,14 @@ class InvoiceViewSet(OptionalPaginationViewSet):
 class CategoryViewSet(OptionalPaginationViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    # Registros sem usuário são do catálogo padrão, visíveis para todos
+    owner_shared = True
 
 class SubcategoryViewSet(OptionalPaginationViewSet):
     queryset = Subcategory.objects.all()
     serializer_class = SubcategorySerializer
+    # Registros sem usuário são do catálogo padrão, visíveis para todos
+    owner_shared = True
 
 class PlanningViewSet(OptionalPaginationViewSet):
     queryset = Planning.objects.all()
@@ -138,35 +226,37 @@ class PlanningViewSet(OptionalPaginationViewSet):
 class BudgetViewSet(OptionalPaginationViewSet):
     queryset = Budget.objects.all()
     serializer_class = BudgetSerializer
+    owner_field = "planning__user"
 
 class PlanningSummaryView(APIView):
     """
-    Retorna o resumo do planejamento do mês com filtro opcional de moeda.
-    Exemplo: /api/planning/summary/?user={user_id}&month=10&year=2024&currency=uuid
+    Retorna o resumo do planejamento do mês do usuário autenticado, com filtro
+    opcional de moeda.
+    Exemplo: /api/planning/summary/?month=10&year=2024&currency=uuid
     """
 
     @extend_schema(
         description="Retorna o resumo do planejamento mensal, com filtro opcional por moeda.",
         parameters=[
-            OpenApiParameter(name='user', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="ID do usuário", required=True),
             OpenApiParameter(name='month', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Mês (1–12)", required=True),
             OpenApiParameter(name='year', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Ano", required=True),
             OpenApiParameter(name='currency', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="UUID da moeda (opcional)", required=False),
         ],
         responses={
             200: PlanningSummaryResponseSerializer,
-            400: OpenApiResponse(description="Parâmetros obrigatórios ausentes"),
+            400: OpenApiResponse(description="Parâmetros obrigatórios ausentes ou inválidos"),
             404: OpenApiResponse(description="Planejamento não encontrado")
         }
     )
     def get(self, request):
-        user_id = request.query_params.get("user")
+        user_id = request.user.pk
         month = request.query_params.get("month")
         year = request.query_params.get("year")
         currency_id = request.query_params.get("currency", None)
 
-        if not all([user_id, month, year]):
-            return Response({"detail": "Parâmetros obrigatórios: user, month, year"}, status=status.HTTP_400_BAD_REQUEST)
+        if not all([month, year]):
+            return Response({"detail": "Parâmetros obrigatórios: month, year"}, status=status.HTTP_400_BAD_REQUEST)
+        year, month = parse_month(year, month)
 
         planning = (
             Planning.objects
@@ -182,37 +272,24 @@ class PlanningSummaryView(APIView):
         INCOME_TYPES = [2]       # receita
         EXPENSE_TYPES = [3, 5]   # despesa, despesa de cartão
 
-        base_filter = {
-            "user_id": user_id,
-            "date__startswith": f"{year}-{int(month):02d}",
-        }
-        if currency_id:
-            base_filter["bankAccount__currency_id"] = currency_id
+        rollup = rollups.rollup_queryset(user_id, year, month, currency_id)
 
         planned_total = planning.monthlyIncome or 0
 
-        executed_total = (
-            Transaction.objects
-            .filter(**base_filter, type__in=EXPENSE_TYPES, paid=1)
-            .aggregate(total=Sum("value"))["total"] or 0
-        )
-
-        pending_total = (
-            Transaction.objects
-            .filter(**base_filter, type__in=EXPENSE_TYPES, paid=0)
-            .aggregate(total=Sum("value"))["total"] or 0
-        )
-
-        monthly_income = (
-            Transaction.objects
-            .filter(**base_filter, type__in=INCOME_TYPES)
-            .aggregate(total=Sum("value"))["total"] or 0
+        # Um único aggregate com somas condicionais
+        totals = rollup.aggregate(
+            executed=Sum("total", filter=Q(type__in=EXPENSE_TYPES, paid=1)),
+            pending=Sum("total", filter=Q(type__in=EXPENSE_TYPES, paid=0)),
+            income=Sum("total", filter=Q(type__in=INCOME_TYPES)),
         )
+        executed_total = totals["executed"] or 0
+        pending_total = totals["pending"] or 0
+        monthly_income = totals["income"] or 0
 
         currency_data = CurrencySerializer(planning.currency).data if planning.currency else None
 
         remaining = planned_total - executed_total
-        days_in_month = calendar.monthrange(int(year), int(month))[1]
+        days_in_month = calendar.monthrange(year, month)[1]
         available_per_day = remaining // days_in_month if days_in_month > 0 else 0
 
         response_data = {
@@ -230,32 +307,33 @@ class PlanningSummaryView(APIView):
 
 class PlanningCategoriesView(APIView):
     """
-    Retorna o detalhamento do planejamento por categoria com filtro opcional de moeda.
-    Exemplo: /api/planning/categories/?user={user_id}&month=10&year=2024&currency=uuid
+    Retorna o detalhamento do planejamento do usuário autenticado por categoria,
+    com filtro opcional de moeda.
+    Exemplo: /api/planning/categories/?month=10&year=2024&currency=uuid
     """
 
     @extend_schema(
         description="Retorna o detalhamento do planejamento por categoria, com filtro opcional por moeda.",
         parameters=[
-            OpenApiParameter(name='user', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="ID do usuário", required=True),
             OpenApiParameter(name='month', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Mês (1–12)", required=True),
             OpenApiParameter(name='year', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Ano", required=True),
             OpenApiParameter(name='currency', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="UUID da moeda (opcional)", required=False),
         ],
         responses={
             200: PlanningCategoryItemSerializer(many=True),
-            400: OpenApiResponse(description="Parâmetros obrigatórios ausentes"),
+            400: OpenApiResponse(description="Parâmetros obrigatórios ausentes ou inválidos"),
             404: OpenApiResponse(description="Planejamento não encontrado")
         }
     )
     def get(self, request):
-        user_id = request.query_params.get("user")
+        user_id = request.user.pk
         month = request.query_params.get("month")
         year = request.query_params.get("year")
         currency_id = request.query_params.get("currency")
 
-        if not all([user_id, month, year]):
-            return Response({"detail": "Parâmetros obrigatórios: user, month, year"}, status=400)
+        if not all([month, year]):
+            return Response({"detail": "Parâmetros obrigatórios: month, year"}, status=400)
+        year, month = parse_month(year, month)
 
         planning = (
             Planning.objects
@@ -271,48 +349,54 @@ class PlanningCategoriesView(APIView):
         if currency_id:
             budget_filter["planning__currency_id"] = currency_id
 
+        # Árvore das categorias carregada de uma vez (cor, ícone e subcategorias)
         budgets = (
             Budget.objects
             .filter(**budget_filter)
-            .select_related("category", "category__icon")
+            .select_related("category__color", "category__icon")
+            .prefetch_related(
+                Prefetch(
+                    "category__subcategories",
+                    queryset=Subcategory.objects.select_related("color", "icon"),
+                )
+            )
         )
 
         # Tipos de transação de despesa
         expense_types = [3, 5]  # expense, creditCardExpense
 
-        data = []
-        for b in budgets:
-            # Filtro base de transações da categoria
-            transaction_filter = {
-                "user_id": user_id,
-                "category_id": b.category_id,
-                "date__startswith": f"{year}-{int(month):02d}",
-                "type__in": expense_types,
+        # Executado e pendente de todas as categorias em um único GROUP BY
+        totals_by_category = {
+            row["category_id"]: row
+            for row in (
+                rollups.rollup_queryset(user_id, year, month, currency_id)
+                .filter(type__in=expense_types)
+                .values("category_id")
+                .annotate(
+                    executed=Sum("total", filter=Q(paid=1)),
+                    pending=Sum("total", filter=Q(paid=0)),
+                )
+                .order_by()
+            )
+        }
+
+        # Objeto da moeda do planejamento
+        planning_currency = None
+        if planning.currency:
+            planning_currency = {
+                "id": str(planning.currency.id),
+                "code": planning.currency.code,
+                "symbol": planning.currency.symbol,
+                "minorUnit": planning.currency.minorUnit,
             }
-            if currency_id:
-                transaction_filter["bankAccount__currency_id"] = currency_id
 
-            # Somatórios separados
-            executed = (
-                Transaction.objects.filter(**transaction_filter, paid=1)
-                .aggregate(total=Sum("value"))["total"] or 0
-            )
-            pending = (
-                Transaction.objects.filter(**transaction_filter, paid=0)
-                .aggregate(total=Sum("value"))["total"] or 0
-            )
+        data = []
+        for b in budgets:
+            totals = totals_by_category.get(b.category_id, {})
+            executed = totals.get("executed") or 0
+            pending = totals.get("pending") or 0
             total_spent = executed + pending
 
-            # Objeto da moeda do planejamento
-            planning_currency = None
-            if planning.currency:
-                planning_currency = {
-                    "id": str(planning.currency.id),
-                    "code": planning.currency.code,
-                    "symbol": planning.currency.symbol,
-                    "minorUnit": planning.currency.minorUnit,
-                }
-
             data.append({
                 "id": str(b.id),
                 "planningId": str(planning.id),
@@ -326,78 +410,224 @@ class PlanningCategoriesView(APIView):
 
         return Response(data)
 
+class SyncView(APIView):
+    """
+    Mudanças desde o cursor para clientes offline (ver core/sync.py).
+    Exemplo: /api/v1/sync/?since=1234
+    """
+
+    @extend_schema(
+        description=(
+            "Linhas alteradas e ids excluídos desde o cursor, com o próximo cursor. Sem `since`, carga "
+            "completa, paginada: enquanto hasMore, repita com `snapshot`."
+        ),
+        parameters=[
+            OpenApiParameter(name="since", type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Cursor devolvido pela sincronização anterior", required=False),
+            OpenApiParameter(name="snapshot", type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Continuação da carga completa", required=False),
+        ],
+        responses={200: OpenApiTypes.OBJECT, 400: OpenApiResponse(description="Cursor ou continuação inválidos")},
+    )
+    def get(self, request):
+        snapshot = request.query_params.get("snapshot")
+        if snapshot:
+            try:
+                position = sync.decode_snapshot(snapshot)
+            except ValueError:
+                raise ValidationError({"snapshot": ["Continuação inválida."]})
+            return Response(sync.full_snapshot(request.user.pk, {"request": request}, position))
+
+        since = request.query_params.get("since") or 0
+        try:
+            since = int(since)
+        except (TypeError, ValueError):
+            raise ValidationError({"since": ["Cursor inválido."]})
+        if since < 0:
+            raise ValidationError({"since": ["Cursor inválido."]})
+        return Response(sync.changes_since(request.user.pk, since, {"request": request}))
+
 class LoanViewSet(BaseModelViewSet):
     queryset = Loan.objects.all()
     serializer_class = LoanSerializer
 
 class TransactionViewSet(OptionalPaginationViewSet):
     serializer_class = TransactionSerializer
+    # ?cursor= percorre a linha do tempo por (date, id), sem COUNT nem OFFSET
+    keyset_pagination_field = "date"
+    # Listagens somente-leitura usam a projeção compilada do TransactionSerializer
+    fast_serializer = compile_serializer(TransactionSerializer)
+    queryset = Transaction.objects.all()
 
     def get_queryset(self):
-        queryset = Transaction.objects.all()
+        queryset = super().get_queryset()
 
         user_id = self.request.query_params.get("user")
         search = self.request.query_params.get("search")
         month = self.request.query_params.get("date__month")
         year = self.request.query_params.get("date__year")
-        ordering = self.request.query_params.get("ordering", "-date")
+        ordering = self.request.query_params.get("ordering")
 
         if user_id:
             queryset = queryset.filter(user_id=user_id)
 
-        if search:
-            queryset = queryset.filter(
-                Q(description__icontains=search)
-                | Q(observation__icontains=search)
-                | Q(category__description__icontains=search)
-                | Q(subcategory__description__icontains=search)
-            )
+        if search and search_index.normalize(search):
+            # Documento de busca indexado; sem ordenação explícita, os mais relevantes primeiro
+            queryset = search_index.search(queryset, search)
+            if not ordering:
+                queryset = queryset.order_by("-searchRank", "-date")
+        elif not ordering:
+            ordering = "-date"
 
         if month and year:
-            prefix = f"{year}-{int(month):02d}"
-            queryset = queryset.filter(date__startswith=prefix)
+            # Intervalo semiaberto [início do mês, início do mês seguinte) usa o índice (user_id, date)
+            start, end = month_range(year, month, "date__year", "date__month")
+            queryset = queryset.filter(date__gte=start, date__lt=end)
 
         if ordering:
             queryset = queryset.order_by(ordering)
 
         return queryset
 
+    # Parâmetros que não alteram o conjunto somado no resumo
+    ROLLUP_SUMMARY_PARAMS = {"user", "date__month", "date__year", "ordering", "page", "page_size", "cursor", "stream"}
+
+    def get_summary_source(self, queryset):
+        """
+        Retorna (queryset, campo) a ser somado no resumo. Quando a listagem é
+        apenas o mês do usuário, o rollup mensal responde sem varrer transações.
+        """
+        params = self.request.query_params
+        user_id = str(self.request.user.pk)
+        if (
+            params.get("user", user_id) == user_id
+            and params.get("date__month")
+            and params.get("date__year")
+            and set(params.keys()) <= self.ROLLUP_SUMMARY_PARAMS
+        ):
+            rollup = rollups.rollup_queryset(user_id, params["date__year"], params["date__month"])
+            return rollup, "total"
+        return queryset, "value"
+
+    def get_summary(self, queryset):
+        summary_source, summary_field = self.get_summary_source(queryset)
+        total_income = summary_source.filter(type__in=[4]).aggregate(total=Sum(summary_field))["total"] or 0
+        total_expense = summary_source.filter(type__in=[3, 5]).aggregate(total=Sum(summary_field))["total"] or 0
+        total_balance = total_income - total_expense
+        return {
+            "totalIncome": total_income,
+            "totalExpense": total_expense,
+            "balance": total_balance
+        }
+
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
 
-        total_income = queryset.filter(type__in=[4]).aggregate(total=Sum("value"))["total"] or 0
-        total_expense = queryset.filter(type__in=[3, 5]).aggregate(total=Sum("value"))["total"] or 0
-        total_balance = total_income - total_expense
+        if "page" not in request.query_params and not self.use_keyset_pagination() and self.use_streaming():
+            # Exportação completa: linhas em streaming, resumo no final
+            return self.streaming_list_response(
+                queryset, extra=lambda: {"summary": self.get_summary(queryset)}
+            )
+
+        summary = self.get_summary(queryset)
 
-        page = self.paginate_queryset(queryset)
+        page = self.paginate_queryset(self.get_page_queryset(queryset))
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
+            paginated_response = self.get_paginated_response(self.serialize_list(page))
 
-            paginated_response.data["summary"] = {
-                "totalIncome": total_income,
-                "totalExpense": total_expense,
-                "balance": total_balance
-            }
+            paginated_response.data["summary"] = summary
             return paginated_response
 
-        serializer = self.get_serializer(queryset, many=True)
         return Response({
-            "results": serializer.data,
-            "summary": {
-                "totalIncome": total_income,
-                "totalExpense": total_expense,
-                "balance": total_balance
-            }
+            "results": self.serialize_list(queryset),
+            "summary": summary
         })
 
+    @extend_schema(
+        description=(
+            "Cria, atualiza (parcial, com \"id\") e exclui transações em lote, numa única transação. "
+            "Se algum item for inválido nada é gravado e a resposta traz os erros por item, "
+            "na mesma posição do envio."
+        ),
+        examples=[
+            OpenApiExample(
+                "Lote",
+                value={
+                    "create": [{"userId": "uuid-user", "value": 1000, "type": 3, "isTransfer": 0, "isCreditCardTransaction": 1}],
+                    "update": [{"id": "uuid-transaction", "paid": 1}],
+                    "delete": ["uuid-transaction"],
+                },
+                request_only=True,
+            )
+        ],
+    )
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        writer = BulkTransactionWriter(self.get_serializer_class(), self.get_serializer_context(), self.get_queryset())
+        if not writer.validate(request.data):
+            return Response(writer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated, deleted = writer.save()
+        return Response({
+            "created": self.fast_serializer.serialize(created),
+            "updated": self.fast_serializer.serialize(updated),
+            "deleted": deleted,
+        })
+
+    @extend_schema(
+        request=TransactionSeriesSerializer,
+        responses=TransactionSerializer(many=True),
+        description=(
+            "Gera no servidor as parcelas (originalValue dividido entre os itens) ou as recorrências "
+            "(fixed=1) de uma transação, com count itens ou até a data until. Com creditCardId, "
+            "cada parcela é lançada na fatura correspondente do cartão."
+        ),
+    )
+    @action(detail=False, methods=["post"])
+    def series(self, request):
+        serializer = TransactionSeriesSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        created = installments.create_series(
+            serializer.validated_data["transaction"],
+            serializer.validated_data["count"],
+            card=serializer.validated_data.get("creditCard"),
+        )
+        return Response(self.fast_serializer.serialize(created), status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        description=(
+            "PATCH altera e DELETE exclui esta transação e as seguintes da mesma série (groupingId). "
+            "Campos de posição na série (datas, fatura, invoiceNumber, groupingId, usuário) não podem ser alterados."
+        ),
+    )
+    @action(detail=True, methods=["patch", "delete"])
+    def following(self, request, pk=None):
+        instance = self.get_object()
+        if request.method == "DELETE":
+            return Response({"deleted": installments.delete_following(instance)})
+
+        serializer = self.get_serializer(instance, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        locked = [name for name in serializer.validated_data if name in installments.SERIES_FIELDS]
+        if locked:
+            return Response(
+                {name: ["Não pode ser alterado em toda a série."] for name in locked},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"updated": installments.update_following(instance, serializer.validated_data)})
+
 class GoalViewSet(OptionalPaginationViewSet):
     queryset = Goal.objects.all()
     serializer_class = GoalSerializer
+    # O progresso soma as transações ligadas à meta
+    version_dependencies = (GoalTransaction, Transaction)
+
+    def get_queryset(self):
+        # Aportes somados na mesma consulta das metas
+        return goals.annotate_progress(super().get_queryset())
 
 class GoalTransactionViewSet(BaseModelViewSet):
     queryset = GoalTransaction.objects.all()
     serializer_class = GoalTransactionSerializer
+    owner_field = "goal__user"
 
 class AlertViewSet(BaseModelViewSet):
     queryset = Alert.objects.all()
@@ -405,24 +635,37 @@ class AlertViewSet(BaseModelViewSet):
 
 class SocialLoginViewSet(viewsets.ViewSet):
     """
-    ViewSet para login social com Google e Apple
+    ViewSet para login social com Google e Apple. Os ID tokens são validados
+    localmente contra as chaves públicas dos provedores (ver core/identity.py).
     """
+    permission_classes = [AllowAny]
 
     def create(self, request):
         serializer = SocialLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         provider = serializer.validated_data["provider"]
-        token = serializer.validated_data["token"]
+        token = serializer.validated_data["id_token"]
 
-        if provider == "google":
-            user_info = self._validate_google_token(token)
-        elif provider == "apple":
-            user_info = self._validate_apple_token(token)
-        else:
+        try:
+            if provider == "google":
+                user_info = self._validate_google_token(token)
+            elif provider == "apple":
+                user_info = self._validate_apple_token(token)
+            else:
+                return Response(
+                    {"error": "Provedor inválido"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        except identity.KeysUnavailable:
             return Response(
-                {"error": "Provedor inválido"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"error": "Provedor de identidade indisponível"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except ImproperlyConfigured:
+            return Response(
+                {"error": "Login social não configurado"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
         if not user_info:
@@ -452,29 +695,11 @@ class SocialLoginViewSet(viewsets.ViewSet):
         )
 
     def _validate_google_token(self, token):
-        response = requests.get(
-            "https://oauth2.googleapis.com/tokeninfo",
-            params={"id_token": token},
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return {"email": data["email"], "name": data.get("name")}
-        return None
+        return identity.verify("google", token)
 
     def _validate_apple_token(self, token):
-        # Aqui pode usar pyjwt para verificar o JWT da Apple
-        # ou consultar o endpoint da Apple
-        # Exemplo simplificado:
-        try:
-            import jwt
+        return identity.verify("apple", token)
 
-            # você precisará buscar a chave pública da Apple:
-            # https://appleid.apple.com/auth/keys
-            decoded = jwt.decode(token, options={"verify_signature": False})
-            return {"email": decoded.get("email")}
-        except Exception:
-            return None
-        
 class LoginViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
 
@@ -0,0 +1,51 @@
+"""
+Perfil de produção do gunicorn, configurado por variáveis de ambiente.
+
+GUNICORN_WORKER_MODEL escolhe o modelo de workers:
+- "threads" (padrão): WSGI (afinpe_project.wsgi) com workers gthread. Cada
+  thread atende uma requisição e mantém a sua conexão persistente com o banco
+  (DB_CONN_MAX_AGE), então o número de conexões é workers x threads;
+- "asgi": ASGI (afinpe_project.asgi) com UvicornWorker. As views do DRF são
+  síncronas e rodam em uma thread por worker, então o ganho aparece só em
+  código assíncrono (ex.: identity.averify); use com o pool (DB_POOL_MAX_SIZE).
+
+Com preload (GUNICORN_PRELOAD) a aplicação é importada uma vez no master e os
+workers nascem por fork, compartilhando a memória do código já carregado.
+"""
+import multiprocessing
+import os
+
+worker_model = os.getenv("GUNICORN_WORKER_MODEL", "threads")
+cpus = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+if worker_model == "asgi":
+    wsgi_app = "afinpe_project.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.getenv("WEB_CONCURRENCY", cpus))
+elif worker_model == "threads":
+    wsgi_app = "afinpe_project.wsgi:application"
+    worker_class = "gthread"
+    # As requisições esperam o banco boa parte do tempo: poucos processos por
+    # CPU, com threads cobrindo a espera
+    workers = int(os.getenv("WEB_CONCURRENCY", max(2, cpus)))
+    threads = int(os.getenv("GUNICORN_THREADS", "4"))
+else:
+    raise ValueError(f"GUNICORN_WORKER_MODEL inválido: {worker_model}")
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = timeout
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recicla os workers periodicamente (com jitter, para não reiniciarem juntos)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+def post_fork(server, worker):
+    # Conexões abertas no master durante o preload não podem ser compartilhadas
+    if preload_app:
+        from django.db import connections
+        connections.close_all()